@@ -3,8 +3,7 @@ import pandas as pd
 import folium
 from streamlit_folium import st_folium
 from folium.plugins import MarkerCluster
-from geopy.geocoders import Nominatim
-from backendLogic import recommend_places, create_itinerary
+from backendLogic import recommend_places, create_itinerary, geocode  # honours WANDERWISE_OFFLINE
 from datetime import datetime
 import time
 
@@ -979,18 +978,17 @@ elif st.session_state.page == 'planner':
                     progress_bar.progress(i + 1)
                 
                 try:
-                    geolocator = Nominatim(user_agent="wanderwise_app")
-                    location = geolocator.geocode(user_text)
+                    coords = geocode(user_text)
                     
-                    if location is None:
+                    if coords is None:
                         st.error("❌ Could not find location. Please enter a valid city name.")
                     else:
-                        coords = (location.latitude, location.longitude)
+                        budget_value = {"Free": 0, "Regular": 300, "Moderate": 500, "Premium": 800}[budget]
                         tourist_df, food_df = recommend_places(
                             user_text=user_text,
                             location_coords=coords,
                             moods=moods,
-                            budget={"Free": 0, "Regular": 300, "Moderate": 500, "Premium": 800}[budget],
+                            budget=budget_value,
                             time_hr=hours
                         )
                         
@@ -1000,7 +998,8 @@ elif st.session_state.page == 'planner':
                             st.warning("😲 No recommendations found. Try adjusting your preferences.")
                         else:
                             # Display itinerary
-                            itinerary = create_itinerary(coords, tourist_df, food_df, total_time_hr=hours)
+                            itinerary = create_itinerary(coords, tourist_df, food_df, total_time_hr=hours,
+                                                         budget=budget_value)
                             
                             st.markdown("### 🗓️ Your Personalized Itinerary")
                             
@@ -1114,13 +1113,11 @@ elif st.session_state.page == 'recommendations':
                     progress_bar.progress(i + 1)
                 
                 try:
-                    geolocator = Nominatim(user_agent="wanderwise_app")
-                    location = geolocator.geocode(user_text)
+                    coords = geocode(user_text)
                     
-                    if location is None:
+                    if coords is None:
                         st.error("❌ Could not find location. Please enter a valid city name.")
                     else:
-                        coords = (location.latitude, location.longitude)
                         tourist_df, food_df = recommend_places(
                             user_text=user_text,
                             location_coords=coords,
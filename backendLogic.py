@@ -1,15 +1,38 @@
 # backendLogic.py
+#
+# Importing this module is cheap: nothing is downloaded, read or fitted until
+# the first recommendation is requested (or `engine.load()` / `engine.warmup()`
+# is called explicitly). Set WANDERWISE_OFFLINE=1 to never touch the network.
+# Models come from the registry's active version (model_registry.py) when one
+# was published; newer versions are swapped in while serving, see
+# "Model Versions".
+
+import contextvars
+import functools
+import itertools
+import time
+_import_started = time.perf_counter()
 
 import os
-import gdown
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 import joblib
-from geopy.distance import geodesic
-from sklearn.metrics.pairwise import cosine_similarity
 from datetime import timedelta, datetime
+from geo_distance import distances_km, distance_matrix_km
+from geocoding import get_geocode_cache
+from cache_utils import LRUCache
+from topk import top_k_by_category
+from orienteering import min_travel_route, solve_orienteering
+from candidate_pool import CandidatePool
+from geo_clustering import weighted_kmeans, nearest_center
+from travel_time import ROAD_GRAPH_PATH, RoadGraphTravel, StraightLineTravel
 
 # --------- Model Downloader ---------
 def download_models():
+    import gdown
+
     model_folder = "models"
     os.makedirs(model_folder, exist_ok=True)
 
@@ -24,144 +47,1031 @@ def download_models():
             print(f"Downloading {fname}...")
             gdown.download(f"https://drive.google.com/uc?id={fid}", path, quiet=False)
 
-download_models()
+# --------- Settings ---------
+DATA_PATH = "cleaned_tourism_dataset.csv"
+VECTORIZER_PATH = "models/tfidf_vectorizer.pkl"
+MOOD_MODEL_PATH = "models/mood_classifier.pkl"
+BUDGET_MODEL_PATH = "models/budget_predictor.pkl"
+DISTILLED_BUDGET_PATH = "models/budget_distilled.pkl"
+STORE_META_PATH = os.path.join("data", "places", "meta.json")
+COMPACT_DIR = os.path.join("models", "compact")
+COMPACT_MANIFEST_PATH = os.path.join(COMPACT_DIR, "manifest.json")
+DISTANCE_METHOD = "haversine"  # or "ellipsoidal", see geo_distance.py
+TRAVEL_SPEED_KMH = 30
+TRAVEL_BACKEND = "straight"  # or "road": itinerary travel times from ROAD_GRAPH_PATH (python travel_time.py)
+STAY_HR = 1
+LEGACY_ATTRACTION_ROWS = 523  # the stock CSV has no place_category: its attractions come first, then food places
+RESULT_SIZES = {"attraction": 20, "food": 10}
+SIMILAR_PLACES = 10  # default number of results from similar_places
+OFFLINE = os.environ.get("WANDERWISE_OFFLINE", "") == "1"
+ITINERARY_MODE = "optimized"  # or "fast": visit the places nearest the start first, ignoring scores
+ITINERARY_DEADLINE_S = 0.25  # wall-clock cap on the "optimized" search
+LUNCH_WINDOW = (12, 15)  # lunch is added after a stop that ends between 12:00 and 14:59
+LUNCH_STOPS = 2
+DETOUR_WEIGHT = 0.5  # lunch value (see _lunch_choice) given up per hour of detour
+NEIGHBOR_LUNCH_VALUE = 0.5  # value of a 5-star nearby food place that recommend_places did not score
+TRIP_WORKERS = 4  # days planned concurrently by plan_trip
+SEMANTIC_SEARCH = "index"  # or "exact": mood similarity against every reachable place
+SEMANTIC_DEPTH = 500  # reachable postings read per mood term (ann_index.py); higher = better recall
+SEMANTIC_MIN_CANDIDATES = 2000  # fewer reachable places than this are always scored exactly
+USE_DATASET_STORE = True  # map data/places (python dataset_store.py) when it is fresh, else parse the CSV
+BUDGET_MODEL = "forest"  # or "distilled": linear model fitted to the forest (benchmarks/bench_budget_model.py)
+MODEL_FORMAT = "compact"  # or "pickle"; compact needs a fresh models/compact (python train_models.py --export)
+MOOD_VECTOR_CACHE_SIZE = 256  # TF-IDF rows of recent mood label combinations
+USE_MODEL_REGISTRY = True  # serve the registry's active model version (model_registry.py) when there is one
+MODEL_RELOAD = "auto"  # or "manual": only reload_models() switches to a newly activated version
 
 # --------- Load Data and Models ---------
-DATA_PATH = "cleaned_tourism_dataset.csv"
-df = pd.read_csv(DATA_PATH)
-df.fillna("", inplace=True)
-df.columns = df.columns.str.strip()
+def read_dataset(path=DATA_PATH):
+    df = pd.read_csv(path)
+    df.fillna("", inplace=True)
+    df.columns = df.columns.str.strip()
+    if "place_category" not in df.columns:
+        # Derived here, never written back to the source file; the dataset
+        # store keeps the result as its own category column
+        df["place_category"] = np.where(np.arange(len(df)) < LEGACY_ATTRACTION_ROWS, "attraction", "food")
+    df["combined"] = df["description"]
+    return df
+
+def build_place_index(data_path, vectorizer):
+    # CSV path: parse, vectorize every description, index. Returns (df, PlaceIndex).
+    from place_index import PlaceIndex
+
+    df = read_dataset(data_path)
+    # Row-aligned table + TF-IDF rows + norms + radius index; requests slice it by position
+    return df, PlaceIndex.from_frame(df, vectorizer.transform(df["combined"]))
+
+_engine_generations = itertools.count(1)
+
+class RecommenderEngine:
+    """Dataset, models and place index, loaded on first use.
+
+    `timings` records how long each load stage took (seconds); `load()` is
+    idempotent and thread-safe, `warmup()` also exercises every model once.
+    `version` is the registry version served, resolved to the active one on
+    load; None serves the files in models/. `generation` tells engines apart
+    even when they serve the same version.
+    """
+
+    def __init__(self, data_path=DATA_PATH, offline=OFFLINE, use_store=USE_DATASET_STORE, version=None,
+                 use_registry=USE_MODEL_REGISTRY):
+        self.data_path = data_path
+        self.offline = offline
+        self.use_store = use_store
+        self.version = version
+        self.use_registry = use_registry
+        self.generation = next(_engine_generations)
+        self.source = None  # "store" or "csv" once loaded
+        self.model_format = None  # "compact" or "pickle" once loaded
+        self.timings = {}
+        self.loaded = False
+        self._lock = threading.Lock()
+        self._df = None
+        self.vectorizer = None
+        self.mood_model = None
+        self.budget_model = None
+        self.tfidf_matrix = None
+        self.place_index = None
+        self.mood_classifier = None  # mood from shared TF-IDF rows, see _shared_mood_classifier
+        self.mood_vectors = LRUCache(maxsize=MOOD_VECTOR_CACHE_SIZE)
+
+    def _timed(self, stage, fn, *args):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        self.timings[stage] = time.perf_counter() - t0
+        return result
+
+    def _model_paths(self):
+        # vectorizer, mood, budget, distilled budget pickles and compact dir of this engine's models
+        paths = (VECTORIZER_PATH, MOOD_MODEL_PATH, BUDGET_MODEL_PATH, DISTILLED_BUDGET_PATH)
+        if self.version is None:
+            return paths + (COMPACT_DIR,)
+        from model_registry import version_dir
+
+        root = version_dir(self.version)
+        return tuple(os.path.join(root, os.path.basename(p)) for p in paths) + (os.path.join(root, "compact"),)
+
+    def _store_usable(self):
+        from dataset_store import store_status
+
+        if not self.use_store:
+            return False
+        status = store_status()
+        if status == "fresh" and self.version is not None and not self._store_matches_version():
+            # the store's TF-IDF rows come from another vectorizer
+            status = "stale"
+        if status == "stale" and not os.path.exists(self.data_path):
+            raise RuntimeError("Dataset store is stale and the CSV to rebuild it is missing")
+        return status == "fresh"
+
+    def _store_matches_version(self):
+        # A fresh store was built from the vectorizer now in models/; it fits
+        # this version if that file is the version's vectorizer
+        from model_registry import file_sha256, version_info
+
+        expected = version_info(self.version)["files"]["tfidf_vectorizer.pkl"]
+        return os.path.exists(VECTORIZER_PATH) and file_sha256(VECTORIZER_PATH) == expected
+
+    def _compact_usable(self):
+        from compact_models import compact_status, read_manifest
+
+        if MODEL_FORMAT != "compact":
+            return False
+        compact_dir = self._model_paths()[4]
+        if self.version is not None:
+            # published only when fresh, and never changed afterwards
+            return read_manifest(compact_dir) is not None
+        return compact_status(compact_dir) == "fresh"
+
+    def _shared_mood_classifier(self):
+        # predict(TF-IDF rows) of the mood model when it was trained on the
+        # shared vocabulary (train_models.py), so a query is tokenized once;
+        # None for mood models that carry their own vectorizer
+        if self.model_format == "compact":
+            return self.mood_model.predict_features if self.mood_model.vectorizer is self.vectorizer else None
+        steps = getattr(self.mood_model, "steps", None)
+        if steps and len(steps) == 2 and joblib.hash(steps[0][1]) == joblib.hash(self.vectorizer):
+            return steps[1][1].predict
+        return None
+
+    def load(self):
+        if self.loaded:
+            return self
+        with self._lock:
+            if self.loaded:
+                return self
+            t0 = time.perf_counter()
+            if self.version is None and self.use_registry:
+                from model_registry import active_version
+
+                self.version = active_version()
+            if self.version is not None:
+                from model_registry import verify
+
+                self._timed("verify_models", verify, self.version)
+            vectorizer_path, mood_path, budget_path, distilled_path, compact_dir = self._model_paths()
+            use_store = self._store_usable()
+            use_compact = self._compact_usable()
+            required = [] if use_compact else [vectorizer_path, mood_path, budget_path]
+            if not use_store:
+                required.append(self.data_path)
+            if self.offline:
+                missing = [p for p in required if not os.path.exists(p)]
+                if missing:
+                    raise FileNotFoundError(f"Offline mode and missing files: {', '.join(missing)}")
+            elif not use_compact and self.version is None:
+                self._timed("download_models", download_models)
+
+            if use_compact:
+                from compact_models import load_compact
+
+                self.vectorizer, self.mood_model, self.budget_model = self._timed(
+                    "map_compact_models", load_compact, compact_dir, True, BUDGET_MODEL
+                )
+                self.model_format = "compact"
+            else:
+                self.vectorizer = self._timed("load_vectorizer", joblib.load, vectorizer_path)
+                self.mood_model = self._timed("load_mood_model", joblib.load, mood_path)
+                if BUDGET_MODEL == "distilled" and os.path.exists(distilled_path):
+                    budget_path = distilled_path
+                self.budget_model = self._timed("load_budget_model", joblib.load, budget_path)
+                self.model_format = "pickle"
+            self.mood_classifier = self._shared_mood_classifier()
+
+            if use_store:
+                from dataset_store import load_place_index
+
+                self.place_index = self._timed("map_dataset_store", load_place_index)
+                self.source = "store"
+            else:
+                self._df, self.place_index = self._timed(
+                    "build_from_csv", build_place_index, self.data_path, self.vectorizer
+                )
+                self.source = "csv"
+            self.tfidf_matrix = self.place_index.matrix
+            self.timings["load_total"] = time.perf_counter() - t0
+            self.loaded = True
+        return self
+
+    @property
+    def df(self):
+        # Full DataFrame for old callers; built on demand when serving from the store
+        if self._df is None and self.place_index is not None:
+            self._df = self.place_index.to_frame()
+        return self._df
+
+    def warmup(self, sample_text="quiet temple garden"):
+        # First calls into sklearn/scipy pay one-off costs; take them here instead of in a request
+        self.load()
+        t0 = time.perf_counter()
+        features = self.vectorizer.transform([sample_text])
+        self.mood_model.predict([sample_text])
+        self.budget_model.predict(features)
+        valid = self.place_index.spatial.positions
+        if len(valid):
+            origin = self.place_index.coords[valid[0]]
+            positions = self.place_index.within(origin, 30)
+            self.place_index.cosine_scores(features, positions)
+        self.place_index.semantic_index
+        self.place_index.tag_index
+        self.timings["warmup"] = time.perf_counter() - t0
+        return self
+
+
+engine = RecommenderEngine()
+_request_engine = contextvars.ContextVar("request_engine", default=None)
 
-vectorizer = joblib.load("models/tfidf_vectorizer.pkl")
-mood_model = joblib.load("models/mood_classifier.pkl")
-budget_model = joblib.load("models/budget_predictor.pkl")
+def get_engine():
+    pinned = _request_engine.get()
+    return pinned if pinned is not None else engine.load()
 
-df["combined"] = df["description"]
-tfidf_matrix = vectorizer.transform(df["combined"])
+def _serving(fn):
+    # The whole call uses one engine, even if a model swap happens meanwhile
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _request_engine.get() is not None:
+            return fn(*args, **kwargs)
+        token = _request_engine.set(engine.load())
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _request_engine.reset(token)
+    return wrapper
+
+def __getattr__(name):
+    # Old module-level globals (df, vectorizer, tfidf_matrix, ...) load the engine on access
+    if name in ("df", "vectorizer", "mood_model", "budget_model", "tfidf_matrix", "place_index"):
+        return getattr(get_engine(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # --------- Helper Functions ---------
+def max_reach_km(time_hr):
+    # Farthest place that still leaves time for one stay at TRAVEL_SPEED_KMH
+    return (time_hr - STAY_HR) * TRAVEL_SPEED_KMH
+
+@_serving
 def predict_mood(text):
-    return mood_model.predict([text])[0]
+    return predict_moods([text])[0]
 
+@_serving
 def predict_budget(text):
-    return budget_model.predict(vectorizer.transform([text]))[0]
+    return get_engine().budget_model.predict(featurize([text]))[0]
+
+# --------- Query Featurization ---------
+# A query text is tokenized once: its TF-IDF row (featurize) feeds both the
+# mood classifier, when it was trained on the shared vocabulary, and the
+# budget model. Mood strings come from a handful of labels, so their vectors
+# for the similarity search are cached.
+
+def featurize(texts):
+    """TF-IDF rows of `texts`: the single tokenization pass behind mood and budget."""
+    return get_engine().vectorizer.transform(list(texts))
+
+def predict_moods(texts, features=None):
+    # `features`, when given, are featurize(texts)
+    eng = get_engine()
+    if eng.mood_classifier is None:
+        return eng.mood_model.predict(list(texts))
+    return eng.mood_classifier(featurize(texts) if features is None else features)
+
+def mood_vector(moods):
+    """(1, n_features) TF-IDF row of the mood labels joined with spaces."""
+    eng = get_engine()
+    text = " ".join(moods)
+    vector = eng.mood_vectors.get(text)
+    if vector is None:
+        vector = eng.vectorizer.transform([text])
+        eng.mood_vectors.put(text, vector)
+    return vector
+
+def geocode(text):
+    return get_geocode_cache().geocode(text, allow_network=not engine.offline)
 
 # --------- Recommender Logic ---------
-def recommend_places(user_text, location_coords=None, moods=None, budget=None, time_hr=4):
-    from geopy.geocoders import Nominatim
+def _empty_result():
+    return pd.DataFrame(), pd.DataFrame()
 
+def _resolve_query(user_text, location_coords, moods, budget):
     if location_coords is None:
-        geolocator = Nominatim(user_agent="smart_tourism_app", timeout=10)
-        loc = geolocator.geocode(user_text)
-        if loc is None:
-            return pd.DataFrame(), pd.DataFrame()
-        location_coords = (loc.latitude, loc.longitude)
-
-    if not moods:
-        moods = [predict_mood(user_text)]
-    if not budget:
-        budget = predict_budget(user_text)
+        location_coords = geocode(user_text)
+        if location_coords is None:
+            return None
+    if not moods or not budget:
+        features = None
+        if not budget or get_engine().mood_classifier is not None:
+            features = featurize([user_text])
+        if not moods:
+            moods = [predict_moods([user_text], features)[0]]
+        if not budget:
+            budget = get_engine().budget_model.predict(features)[0]
+    return location_coords, moods, budget
+
+@_serving
+def recommend_places(user_text, location_coords=None, moods=None, budget=None, time_hr=4):
+    query = _resolve_query(user_text, location_coords, moods, budget)
+    if query is None:
+        return _empty_result()
+    location_coords, moods, budget = query
+
+    _check_artifacts()
+    key = _result_key(location_coords, moods, budget, time_hr)
+    result = result_cache.get(key)
+    if result is None:
+        result = _recommend(location_coords, moods, budget, time_hr)
+        result_cache.put(key, result)
+    # callers (create_itinerary among them) may modify what they get back
+    return result[0].copy(), result[1].copy()
+
+def _recommend(location_coords, moods, budget, time_hr):
+    eng = get_engine()
+    place_index = eng.place_index
+    positions = place_index.within(location_coords, max_reach_km(time_hr))
+    distances = distances_km(location_coords, place_index.coords[positions], method=DISTANCE_METHOD)
+    keep = distances / TRAVEL_SPEED_KMH + STAY_HR <= time_hr
+    if not keep.any():
+        return _empty_result()
+    positions = positions[keep]
+
+    user_vector = mood_vector(moods)
+    mask = _semantic_mask(user_vector, positions)
+    if mask is None:
+        sim_scores = place_index.cosine_scores(user_vector, positions)
+    else:
+        sim_scores = np.zeros(len(positions))
+        sim_scores[mask] = place_index.cosine_scores(user_vector, positions[mask])
+    return _result_frames(_rank_candidates(positions, distances[keep], sim_scores, budget))
+
+def _semantic_mask(user_vector, positions):
+    # Which reachable places to score against the mood; None means all of them.
+    # Large reach: only the places the semantic index returns, the rest score 0.
+    # The depth is scaled by the reachable share of the catalogue, so about
+    # SEMANTIC_DEPTH of each term's top postings fall inside the reach.
+    if SEMANTIC_SEARCH != "index" or len(positions) < SEMANTIC_MIN_CANDIDATES:
+        return None
+    place_index = get_engine().place_index
+    depth = int(np.ceil(SEMANTIC_DEPTH * len(place_index) / len(positions)))
+    return np.isin(positions, place_index.semantic_index.candidates(user_vector, depth), assume_unique=True)
+
+def _within_budget(ratings, budget):
+    # The budget cut: pricier places are assumed to rate higher
+    return ratings * 100 <= budget + 200
+
+def _rank_candidates(positions, distances, sim_scores, budget):
+    # Scores the reachable places, applies the budget cut and picks the top
+    # rows per category: {category: (positions, {column: values})}, best first.
+    place_index = get_engine().place_index
+    travel_times = distances / TRAVEL_SPEED_KMH
+    total_times = travel_times + STAY_HR
+    final_scores = sim_scores / (1 + total_times + distances)
+
+    ok = _within_budget(place_index.ratings[positions], budget)
+    columns = {
+        "distance_km": distances[ok],
+        "travel_time_hr": travel_times[ok],
+        "total_time_hr": total_times[ok],
+        "similarity_score": sim_scores[ok],
+        "final_score": final_scores[ok],
+    }
+    positions = positions[ok]
+
+    picked = select_by_category(columns["final_score"], place_index.category_codes[positions], RESULT_SIZES)
+    return {
+        name: (positions[idx], {col: values[idx] for col, values in columns.items()})
+        for name, idx in picked.items()
+    }
+
+def _result_frames(ranked):
+    # Only the selected rows ever become DataFrames
+    place_index = get_engine().place_index
+    frames = {name: place_index.rows(positions, columns) for name, (positions, columns) in ranked.items()}
+    return frames["attraction"], frames["food"]
+
+def _result_frames_many(ranked_list):
+    # One DataFrame for every selected row of every query, then cheap row slices
+    place_index = get_engine().place_index
+    parts = [part for ranked in ranked_list for part in ranked.values()]
+    if not parts:
+        return []
+    positions = np.concatenate([p for p, _ in parts])
+    columns = {col: np.concatenate([c[col] for _, c in parts]) for col in parts[0][1]}
+    combined = place_index.rows(positions, columns)
+
+    out, offset = [], 0
+    for ranked in ranked_list:
+        frames = {}
+        for name, (p, _) in ranked.items():
+            frames[name] = combined.iloc[offset:offset + len(p)]
+            offset += len(p)
+        out.append((frames["attraction"], frames["food"]))
+    return out
+
+def select_by_category(scores, codes, sizes):
+    # {category: indices of its best k scores} for every (category, k) in sizes
+    place_index = get_engine().place_index
+    known = {name: place_index.category_code(name) for name in sizes if name in place_index.categories}
+    picked = top_k_by_category(scores, codes, {known[name]: sizes[name] for name in known})
+    return {
+        name: picked[known[name]] if name in known else np.empty(0, dtype=np.int64)
+        for name in sizes
+    }
+
+# --------- Result Memoization ---------
+# Popular (city, mood, budget, hours) combinations are served from an LRU.
+# Coordinates are quantized so requests within ~100 m share an entry, and the
+# whole cache is dropped when the dataset or a model file changes on disk.
+RESULT_CACHE_SIZE = 1024
+RESULT_CACHE_TTL = 15 * 60  # seconds
+COORD_DECIMALS = 3
+ARTIFACT_CHECK_INTERVAL = 5  # seconds between stat() calls on the artifacts
+
+result_cache = LRUCache(maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL)
+_artifact_state = {"fingerprint": None, "checked_at": 0.0, "invalidations": 0}
+
+def _result_key(location_coords, moods, budget, time_hr):
+    # The serving engine is part of the key: a request pinned to the engine
+    # being swapped out may still put() after the swap cleared the cache
+    current = get_engine()
+    lat, lng = (round(float(c), COORD_DECIMALS) for c in location_coords)
+    return (lat, lng, tuple(sorted(set(moods))), float(budget), float(time_hr), DISTANCE_METHOD,
+            current.version, current.generation)
+
+def _artifact_fingerprint():
+    state = []
+    for path in (engine.data_path, STORE_META_PATH, COMPACT_MANIFEST_PATH, VECTORIZER_PATH, MOOD_MODEL_PATH,
+                 BUDGET_MODEL_PATH, DISTILLED_BUDGET_PATH):
+        try:
+            st = os.stat(path)
+            state.append((path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            state.append((path, None, None))
+    return tuple(state)
 
-    df_loc = df.copy()
-    df_loc = df_loc[(df_loc["lat"] != 0) & (df_loc["lng"] != 0)]
+def _check_artifacts():
+    now = time.monotonic()
+    if now - _artifact_state["checked_at"] < ARTIFACT_CHECK_INTERVAL:
+        return
+    _artifact_state["checked_at"] = now
+    fingerprint = _artifact_fingerprint()
+    if _artifact_state["fingerprint"] is not None and fingerprint != _artifact_state["fingerprint"]:
+        result_cache.clear()
+        _artifact_state["invalidations"] += 1
+    _artifact_state["fingerprint"] = fingerprint
+    _check_model_version()
 
-    coords = df_loc[["lat", "lng"]].values
-    distances = [geodesic(location_coords, (lat, lng)).km for lat, lng in coords]
-    travel_times = [d / 30 for d in distances]
-    total_times = [t + 1 for t in travel_times]
+def result_cache_stats():
+    stats = result_cache.stats()
+    stats["invalidations"] = _artifact_state["invalidations"]
+    return stats
 
-    df_loc["distance_km"] = distances
-    df_loc["travel_time_hr"] = travel_times
-    df_loc["total_time_hr"] = total_times
+# --------- Model Versions ---------
+# A new model version is loaded and warmed up on a background thread while
+# requests keep using the current engine, then replaces it in a single
+# assignment: nothing waits on the load. Requests already running finish on
+# the engine they started with (_serving). The replaced engine stays in
+# memory, so rollback_models() is instant. With MODEL_RELOAD = "auto" the
+# artifact check also polls the registry for a newly activated version.
+_swap_lock = threading.Lock()
+_model_state = {"previous": None, "loading": None, "errors": {}, "swaps": 0}
 
-    df_loc = df_loc[df_loc["total_time_hr"] <= time_hr]
-    if df_loc.empty:
-        return pd.DataFrame(), pd.DataFrame()
+def _swap_engine(new):
+    global engine
+    with _swap_lock:
+        old, engine = engine, new
+        _model_state["previous"] = old if old.loaded else None
+        _model_state["swaps"] += 1
+        if _model_state["loading"] == new.version:
+            _model_state["loading"] = None
+    result_cache.clear()
+    return old
 
-    user_vector = vectorizer.transform([" ".join(moods)])
-    place_vectors = vectorizer.transform(df_loc["combined"])
-    sim_scores = cosine_similarity(user_vector, place_vectors).flatten()
+def _load_version(version):
+    new = RecommenderEngine(version=version)
+    try:
+        new.warmup()
+    except Exception as exc:  # keep serving the current version
+        _model_state["errors"][version] = repr(exc)
+        _model_state["loading"] = None
+        return
+    _swap_engine(new)
 
-    df_loc["similarity_score"] = sim_scores
-    df_loc["final_score"] = df_loc["similarity_score"] / (1 + df_loc["total_time_hr"] + df_loc["distance_km"])
-    df_loc = df_loc[df_loc['rating'] * 100 <= budget + 200]
+def reload_models(version=None, wait=False):
+    """Switch to `version` (default: the registry's active one) once it is loaded and warmed up.
 
-    tourist_df = df_loc.iloc[:523].sort_values("final_score", ascending=False).head(20)
-    food_df = df_loc.iloc[523:].sort_values("final_score", ascending=False).head(10)
+    Returns the background loader thread, or None when that version is
+    already served or loading. wait=True blocks until the switch and raises
+    if the version failed to load.
+    """
+    from model_registry import active_version
 
-    return tourist_df, food_df
+    version = version or active_version()
+    if version is None:
+        raise RuntimeError("No model version published; run python train_models.py")
+    with _swap_lock:
+        if version in (engine.version, _model_state["loading"]):
+            return None
+        _model_state["loading"] = version
+        _model_state["errors"].pop(version, None)
+    loader = threading.Thread(target=_load_version, args=(version,), name=f"load-models-{version}", daemon=True)
+    loader.start()
+    if wait:
+        loader.join()
+        if version in _model_state["errors"]:
+            raise RuntimeError(f"Model version {version} failed to load: {_model_state['errors'][version]}")
+    return loader
+
+def rollback_models():
+    """Serve the engine that was replaced last, and make its version active in the registry."""
+    previous = _model_state["previous"]
+    if previous is None:
+        raise RuntimeError("No previous model version in memory")
+    _swap_engine(previous)
+    if previous.version is not None:
+        from model_registry import activate
+
+        activate(previous.version)  # so the registry poll doesn't switch straight back
+    return previous.version
+
+def model_versions():
+    previous = _model_state["previous"]
+    return {"serving": engine.version, "previous": None if previous is None else previous.version,
+            "loading": _model_state["loading"], "errors": dict(_model_state["errors"]),
+            "swaps": _model_state["swaps"]}
+
+def _check_model_version():
+    from model_registry import active_version
+
+    if not USE_MODEL_REGISTRY or MODEL_RELOAD != "auto" or not engine.loaded:
+        return
+    active = active_version()
+    if active is not None and active != engine.version and active not in _model_state["errors"]:
+        reload_models(active)
+
+# --------- Similar Places ---------
+@_serving
+def similar_places(place, k=SIMILAR_PLACES, category=None):
+    """Places whose descriptions share the most tags with `place`, best first.
+
+    `place` is a catalogue position (the index of recommend_places' frames)
+    or a place name; `category` ("attraction" or "food") restricts the
+    results. Rows come back with a "similarity" column: cosine over the
+    pruned tag vocabulary (tag_index.py), read from the place's postings only.
+    """
+    place_index = get_engine().place_index
+    position = place_index.position_of(place) if isinstance(place, str) else int(place)
+    positions, scores = place_index.similar_places(position, k, category)
+    return place_index.rows(positions, {"similarity": scores})
+
+# --------- Batch Recommendations ---------
+BATCH_CHUNK = 256  # distinct query locations per distance-matrix block
+
+def _parse_batch_query(query):
+    # Accepts (coords, moods, budget, time_hr) tuples or recommend_places kwargs
+    if isinstance(query, dict):
+        return (query.get("user_text", ""), query.get("location_coords"), query.get("moods"),
+                query.get("budget"), query.get("time_hr", 4))
+    coords, moods, budget, time_hr = query
+    return "", coords, moods, budget, time_hr
+
+@_serving
+def recommend_places_batch(queries, chunk_size=BATCH_CHUNK):
+    """recommend_places for many queries at once; returns a list of (tourist_df, food_df).
+
+    Distances are computed as a (locations x places) matrix over the places
+    reachable from a block of query locations, and mood similarities as one
+    sparse product per block. Results match recommend_places exactly.
+    """
+    eng = get_engine()
+    place_index, vectorizer = eng.place_index, eng.vectorizer
+    parsed = [_parse_batch_query(q) for q in queries]
+    results = [_empty_result() for _ in parsed]
+
+    # Resolve missing pieces; every text is tokenized once and the mood and
+    # budget models run once over the texts that need them
+    need_mood = [i for i, q in enumerate(parsed) if not q[2]]
+    need_budget = [i for i, q in enumerate(parsed) if not q[3]]
+    moods = [q[2] for q in parsed]
+    budgets = [q[3] for q in parsed]
+    need = sorted(set(need_mood) | set(need_budget))
+    row = {i: r for r, i in enumerate(need)}
+    features = None
+    if need_budget or (need_mood and eng.mood_classifier is not None):
+        features = featurize([parsed[i][0] for i in need])
+    if need_mood:
+        rows = [row[i] for i in need_mood]
+        predicted = predict_moods([parsed[i][0] for i in need_mood], None if features is None else features[rows])
+        for i, mood in zip(need_mood, predicted):
+            moods[i] = [mood]
+    if need_budget:
+        for i, value in zip(need_budget, eng.budget_model.predict(features[[row[i] for i in need_budget]])):
+            budgets[i] = value
+
+    # Group queries by location and by mood text
+    origin_ids, origins, origin_time = {}, [], []
+    mood_ids, mood_texts = {}, []
+    jobs = []  # (query index, origin id, mood id)
+    for i, (user_text, coords, _, _, time_hr) in enumerate(parsed):
+        if coords is None:
+            coords = geocode(user_text)
+            if coords is None:
+                continue
+        key = (float(coords[0]), float(coords[1]))
+        if key not in origin_ids:
+            origin_ids[key] = len(origins)
+            origins.append(key)
+            origin_time.append(time_hr)
+        o = origin_ids[key]
+        origin_time[o] = max(origin_time[o], time_hr)
+        text = " ".join(moods[i])
+        if text not in mood_ids:
+            mood_ids[text] = len(mood_texts)
+            mood_texts.append(text)
+        jobs.append((i, o, mood_ids[text]))
+    if not jobs:
+        return results
+
+    mood_vectors = vectorizer.transform(mood_texts)
+    origins = np.asarray(origins)
+    ranked = {}
+    jobs_by_origin = {}
+    for job in jobs:
+        jobs_by_origin.setdefault(job[1], []).append(job)
+
+    for start in range(0, len(origins), chunk_size):
+        block = range(start, min(start + chunk_size, len(origins)))
+        reach = [place_index.within(origins[o], max_reach_km(origin_time[o])) for o in block]
+        cols = np.unique(np.concatenate(reach))
+        if len(cols) == 0:
+            continue
+        dist_matrix = distance_matrix_km(origins[block.start:block.stop], place_index.coords[cols], method=DISTANCE_METHOD)
+        block_jobs = [job for o in block for job in jobs_by_origin.get(o, [])]
+        block_moods = sorted({m for _, _, m in block_jobs})
+        mood_col = {m: j for j, m in enumerate(block_moods)}
+        sim_matrix = place_index.cosine_score_matrix(mood_vectors[block_moods], cols)
+
+        for i, o, m in block_jobs:
+            time_hr = parsed[i][4]
+            distances = dist_matrix[o - block.start]
+            keep = distances / TRAVEL_SPEED_KMH + STAY_HR <= time_hr
+            if keep.any():
+                sims = sim_matrix[keep, mood_col[m]]
+                mask = _semantic_mask(mood_vectors[m], cols[keep])
+                if mask is not None:
+                    sims = np.where(mask, sims, 0.0)
+                ranked[i] = _rank_candidates(cols[keep], distances[keep], sims, budgets[i])
+
+    hits = sorted(ranked)
+    for i, frames in zip(hits, _result_frames_many([ranked[i] for i in hits])):
+        results[i] = frames
+    return results
 
 # --------- Itinerary Generator ---------
-def create_itinerary(user_location, tourist_df, food_df, total_time_hr=4, start_time="10:00"):
-    itinerary = []
-    current_location = user_location
-    current_time = datetime.strptime(start_time, "%H:%M")
-    end_time = current_time + timedelta(hours=total_time_hr)
+_travel_model = None
+_travel_lock = threading.Lock()
+
+def get_travel_model():
+    # The road graph is loaded once when configured and built; the
+    # straight-line model is built per call so it follows the settings above
+    global _travel_model
+    if _travel_model is not None:
+        return _travel_model
+    straight = StraightLineTravel(TRAVEL_SPEED_KMH, DISTANCE_METHOD)
+    if TRAVEL_BACKEND == "road" and os.path.exists(ROAD_GRAPH_PATH):
+        with _travel_lock:
+            if _travel_model is None:
+                _travel_model = RoadGraphTravel.load(ROAD_GRAPH_PATH, fallback=straight)
+        return _travel_model
+    return straight
+
+def set_travel_model(model):
+    global _travel_model
+    _travel_model = model
+
+def travel_matrix(points, limit_hr=None):
+    # Travel hours between every pair of (lat, lng) points, in one call
+    return get_travel_model().matrix(points, limit_hr=limit_hr)
+
+def _lunch_applies(start, end, total_time_hr):
+    window_start = start.replace(hour=LUNCH_WINDOW[0], minute=0)
+    window_end = start.replace(hour=LUNCH_WINDOW[1] - 1, minute=59)
+    return total_time_hr > 4 and start <= window_end and end >= window_start
+
+def _best_route(travel, nodes, stay, scores, budget, deadline_s):
+    # Orienteering over the given matrix nodes; returns positions into `nodes`
+    sub = np.ix_(np.r_[0, nodes], np.r_[0, nodes])
+    route = solve_orienteering(travel[sub], np.r_[0.0, stay], np.r_[0.0, scores], budget, deadline_s=deadline_s)
+    return np.asarray(route, dtype=np.int64) - 1
+
+def _tourist_order(mode, travel, tourist, budget, deadline_s):
+    # Visiting order (pool rows) over the tourist nodes of the travel matrix
+    if mode == "fast":
+        return np.argsort(travel[0, tourist.nodes], kind="stable")
+    if mode == "optimized":
+        stay = np.full(len(tourist), STAY_HR, dtype=float)
+        return _best_route(travel, tourist.nodes, stay, tourist.scores, budget, deadline_s)
+    raise ValueError(f"Unknown itinerary mode {mode!r}, expected 'fast' or 'optimized'")
+
+def _catalogue_for(*frames):
+    # The loaded place index when every frame is a slice of it (indexed by
+    # catalogue position, as recommend_places returns them), else None
+    if not engine.loaded:
+        return None
+    index = engine.place_index
+    for frame in frames:
+        ids = frame.index.to_numpy()
+        if not len(ids):
+            continue
+        if ids.dtype.kind not in "iu" or ids.min() < 0 or ids.max() >= len(index):
+            return None
+        names = np.asarray(index.columns["name"][ids], dtype=object)
+        if not np.array_equal(names, frame["name"].to_numpy(dtype=object)):
+            return None
+    return index
+
+def _itinerary_inputs(user_location, tourist_df, food_df, total_time_hr, budget=None):
+    # Node 0 is the start, then every tourist row, then every food row; all
+    # scheduling is a lookup into this matrix
+    tourist = CandidatePool.from_frame(tourist_df, first_node=1)
+    food = CandidatePool.from_frame(food_df, first_node=1 + len(tourist))
+    points = np.vstack([
+        np.asarray(user_location, dtype=float).reshape(1, 2),
+        np.column_stack([tourist.columns["lat"], tourist.columns["lng"]]).astype(float),
+        np.column_stack([food.columns["lat"], food.columns["lng"]]).astype(float),
+    ])
+    if not budget:
+        # unset, as in recommend_places. Every recommended food place passed
+        # the budget cut, so the query's budget allows at least the best-rated
+        budget = food.ratings.max() * 100 - 200 if len(food) else None
+    trip = {"points": points, "catalogue": _catalogue_for(tourist_df, food_df), "budget": budget}
+    return tourist, food, travel_matrix(points, limit_hr=total_time_hr), trip
+
+def _route_budget(food, start, end, total_time_hr):
+    if len(food) and _lunch_applies(start, end, total_time_hr):
+        # keep room for the lunch stops the schedule will add
+        return total_time_hr - LUNCH_STOPS
+    return total_time_hr
+
+def _lunch_choice(here, next_node, food, travel, trip, taken, time_left):
+    """Best lunch stop from `here` = (matrix node or -1, (lat, lng), catalogue position or -1).
 
-    remaining = tourist_df.copy()
-    remaining["distance"] = remaining.apply(
-        lambda row: geodesic(current_location, (row["lat"], row["lng"])).km, axis=1
-    )
-    remaining.sort_values("distance", inplace=True)
+    Candidates are the remaining recommended food places plus those of the
+    catalogue's precomputed nearest food places to the current stop (an O(1)
+    table lookup) that pass the query's budget cut. Recommended places are
+    valued by their final_score relative to the best recommended food; the
+    neighbours were never mood-scored and count NEIGHBOR_LUNCH_VALUE *
+    rating / 5. DETOUR_WEIGHT per hour of detour on the way to the next stop
+    is taken off either. Returns (pool, row, travel hours) or None.
+    """
+    node, coord, pos = here
+    points, catalogue = trip["points"], trip["catalogue"]
 
-    food_added = 0
-    food_inserted = False
+    def hours_from_here(targets):
+        if node >= 0:
+            return travel[node, targets]
+        # off the trip matrix (after a catalogue lunch): ask the travel model;
+        # nothing farther than the time left can be used
+        return travel_matrix(np.vstack([coord, points[targets]]), limit_hr=time_left)[0, 1:]
 
-    while not remaining.empty:
-        next_place = remaining.iloc[0]
-        travel_time = geodesic(current_location, (next_place["lat"], next_place["lng"])).km / 30
-        arrival = current_time + timedelta(hours=travel_time)
-        stay = 1
+    base = hours_from_here(np.array([next_node]))[0] if next_node is not None else 0.0
+    options = []  # (value, pool, row, hours)
 
+    rows = np.flatnonzero(food.alive)
+    if len(rows):
+        to = hours_from_here(food.nodes[rows])
+        back = travel[food.nodes[rows], next_node] if next_node is not None else 0.0
+        top = food.scores.max()
+        quality = food.scores[rows] / top if top > 0 else food.ratings[rows] / 5
+        value = quality - DETOUR_WEIGHT * (to + back - base)
+        value[to + 1 > time_left] = -np.inf
+        best = int(value.argmax())
+        if np.isfinite(value[best]):
+            options.append((value[best], food, rows[best], to[best]))
+
+    if catalogue is not None and pos >= 0 and trip["budget"] is not None:
+        neighbors, _ = catalogue.food_neighbors
+        cand = np.asarray(neighbors[pos])
+        usable = (cand >= 0) & ~np.isin(cand, food.ids) & ~np.isin(cand, list(taken))
+        cand = cand[usable]
+        cand = cand[_within_budget(catalogue.ratings[cand], trip["budget"])]
+        if len(cand):
+            legs = [np.asarray(coord, dtype=float).reshape(1, 2), catalogue.coords[cand]]
+            if next_node is not None:
+                legs.append(points[next_node:next_node + 1])
+            hours = travel_matrix(np.vstack(legs), limit_hr=time_left)
+            to = hours[0, 1:len(cand) + 1]
+            back = hours[1:len(cand) + 1, -1] if next_node is not None else 0.0
+            value = NEIGHBOR_LUNCH_VALUE * catalogue.ratings[cand] / 5 - DETOUR_WEIGHT * (to + back - base)
+            value[to + 1 > time_left] = -np.inf
+            best = int(value.argmax())
+            if np.isfinite(value[best]):
+                extra = CandidatePool.from_frame(catalogue.rows(cand[best:best + 1]), first_node=-1)
+                options.append((value[best], extra, 0, to[best]))
+
+    if not options:
+        return None
+    _, pool, row, hours = max(options, key=lambda o: o[0])
+    return pool, row, hours
+
+def _schedule(stops, food, travel, trip, start_time, total_time_hr, lunch=True):
+    """Timed stops for `stops`, a sequence of (pool, row, type) visited in order.
+
+    Stops that would end after the day are cut, and up to LUNCH_STOPS food
+    stops (see _lunch_choice) are inserted after the first stop that ends
+    inside LUNCH_WINDOW.
+    """
+    current_time = datetime.strptime(start_time, "%H:%M")
+    end_time = current_time + timedelta(hours=total_time_hr)
+    catalogue = trip["catalogue"]
+    food = food.fresh()
+    taken = set()
+    schedule = []  # (pool, row, type, arrival, stay)
+    # where we are: (matrix node or -1, (lat, lng), catalogue position or -1)
+    here = (0, trip["points"][0], -1)
+    food_inserted = not lunch
+
+    for i, (pool, row, kind) in enumerate(stops):
+        node = pool.nodes[row]
+        if here[0] >= 0:
+            hop = travel[here[0], node]
+        else:
+            hours_left = (end_time - current_time).total_seconds() / 3600
+            hop = travel_matrix(np.vstack([here[1], trip["points"][node]]), limit_hr=hours_left)[0, 1]
+        arrival = current_time + timedelta(hours=hop)
+        stay = STAY_HR if kind == "place" else 1
         if arrival + timedelta(hours=stay) > end_time:
             break
 
-        itinerary.append({
-            "type": "place",
-            "name": next_place["name"],
-            "desc": next_place["description"],
-            "address": next_place["address"],
-            "arrival": arrival,
-            "stay_duration_hr": stay,
-            "lat": next_place["lat"],
-            "lng": next_place["lng"],
-            "rating": next_place["rating"],
-            "reviews": next_place["reviews"]
-        })
-
+        schedule.append((pool, row, kind, arrival, stay))
+        if kind == "food":
+            food.take(row)
         current_time = arrival + timedelta(hours=stay)
-        current_location = (next_place["lat"], next_place["lng"])
-        remaining.drop(index=next_place.name, inplace=True)
-
-        if total_time_hr > 4 and not food_inserted and 12 <= current_time.hour <= 14 and not food_df.empty:
-            top_food = food_df.sort_values("final_score", ascending=False).head(2 - food_added)
-            for _, food_place in top_food.iterrows():
-                travel = geodesic(current_location, (food_place["lat"], food_place["lng"])).km / 30
-                arrival_food = current_time + timedelta(hours=travel)
-
-                if arrival_food + timedelta(hours=1) > end_time:
-                    continue
-
-                itinerary.append({
-                    "type": "food",
-                    "name": food_place["name"],
-                    "desc": food_place["description"],
-                    "address": food_place["address"],
-                    "arrival": arrival_food,
-                    "stay_duration_hr": 1,
-                    "lat": food_place["lat"],
-                    "lng": food_place["lng"],
-                    "rating": food_place["rating"],
-                    "reviews": food_place["reviews"]
-                })
+        here = (node, trip["points"][node], pool.ids[row] if catalogue is not None else -1)
 
-                current_time = arrival_food + timedelta(hours=1)
-                current_location = (food_place["lat"], food_place["lng"])
-                food_df.drop(index=food_place.name, inplace=True)
-                food_added += 1
-
-                if food_added >= 2:
+        if total_time_hr > 4 and not food_inserted and LUNCH_WINDOW[0] <= current_time.hour < LUNCH_WINDOW[1]:
+            next_node = stops[i + 1][0].nodes[stops[i + 1][1]] if i + 1 < len(stops) else None
+            for _ in range(LUNCH_STOPS):
+                time_left = (end_time - current_time).total_seconds() / 3600
+                choice = _lunch_choice(here, next_node, food, travel, trip, taken, time_left)
+                if choice is None:
                     break
+                f_pool, f_row, hours = choice
+                arrival_food = current_time + timedelta(hours=hours)
+                schedule.append((f_pool, f_row, "food", arrival_food, 1))
+                if f_pool is food:
+                    food.take(f_row)
+                    here = (food.nodes[f_row], trip["points"][food.nodes[f_row]], food.ids[f_row] if catalogue is not None else -1)
+                else:
+                    taken.add(int(f_pool.ids[f_row]))
+                    here = (-1, (f_pool.columns["lat"][f_row], f_pool.columns["lng"][f_row]), int(f_pool.ids[f_row]))
+                current_time = arrival_food + timedelta(hours=1)
             food_inserted = True
 
-    return itinerary
+    return [pool.stop(row, kind, arrival, stay) for pool, row, kind, arrival, stay in schedule]
+
+def create_itinerary(user_location, tourist_df, food_df, total_time_hr=4, start_time="10:00",
+                     mode=None, deadline_s=ITINERARY_DEADLINE_S, budget=None):
+    """Timed list of stops.
+
+    mode "fast" visits places in order of distance from the start; "optimized"
+    picks and orders them to maximize the summed final_score that fits in
+    `total_time_hr` (see orienteering.py), spending at most `deadline_s`
+    seconds on the search. Defaults to ITINERARY_MODE. `budget` is the
+    recommend_places budget; lunch places from outside the recommendations
+    must pass its cut. The input frames are not modified.
+    """
+    mode = mode or ITINERARY_MODE
+    tourist, food, travel, trip = _itinerary_inputs(user_location, tourist_df, food_df, total_time_hr, budget)
+    start = datetime.strptime(start_time, "%H:%M")
+    route_hours = _route_budget(food, start, start + timedelta(hours=total_time_hr), total_time_hr)
+    order = _tourist_order(mode, travel, tourist, route_hours, deadline_s)
+    return _schedule([(tourist, t, "place") for t in order], food, travel, trip, start_time, total_time_hr)
+
+# --------- Alternative Itineraries ---------
+ITINERARY_VARIANTS = ("best-match", "best-rated", "shortest-walking", "food-heavy")
+VARIANT_SIMILARITY = 0.8  # plans sharing this share of their stops count as duplicates
+
+def _variant_stops(variant, tourist, food, travel, budget, deadline_s, routes):
+    # (stops, apply the lunch rule) for one named variant; `routes` keeps the
+    # best-match route of one request for the variants built on it
+    place_stay = np.full(len(tourist), STAY_HR, dtype=float)
+    started = time.perf_counter()
+
+    def best_match(seconds):
+        if "best-match" not in routes:
+            routes["best-match"] = _best_route(travel, tourist.nodes, place_stay, tourist.scores, budget, seconds)
+        return routes["best-match"]
+
+    if variant == "best-match":
+        route = best_match(deadline_s)
+    elif variant == "best-rated":
+        route = _best_route(travel, tourist.nodes, place_stay, tourist.ratings / 5, budget, deadline_s)
+    elif variant == "shortest-walking":
+        # as many stops as the best-match plan, chosen and ordered for the least travel
+        stops = len(best_match(deadline_s / 2))
+        sub = np.ix_(np.r_[0, tourist.nodes], np.r_[0, tourist.nodes])
+        left = max(0.0, deadline_s - (time.perf_counter() - started))
+        route = np.asarray(min_travel_route(travel[sub], np.r_[0.0, place_stay], stops, budget,
+                                            deadline_s=left), dtype=np.int64) - 1
+    elif variant == "food-heavy":
+        # food places compete with attractions all day, on top of lunch
+        nodes = np.r_[tourist.nodes, food.nodes]
+        stay = np.r_[place_stay, np.ones(len(food))]
+        route = _best_route(travel, nodes, stay, np.r_[tourist.scores, food.scores], budget, deadline_s)
+        return [(tourist, i, "place") if i < len(tourist) else (food, i - len(tourist), "food")
+                for i in route], True
+    else:
+        raise ValueError(f"Unknown itinerary variant {variant!r}, expected one of {ITINERARY_VARIANTS}")
+    return [(tourist, t, "place") for t in route], True
+
+def _similar(a, b):
+    a = {(s["type"], s["name"]) for s in a}
+    b = {(s["type"], s["name"]) for s in b}
+    return len(a & b) >= VARIANT_SIMILARITY * max(len(a | b), 1)
+
+def create_itinerary_variants(user_location, tourist_df, food_df, total_time_hr=4, start_time="10:00",
+                              variants=("best-rated", "shortest-walking", "food-heavy"),
+                              deadline_s=ITINERARY_DEADLINE_S, budget=None):
+    """Several differently-optimized itineraries from one recommend_places result.
+
+    All variants share one travel matrix and one wall-clock deadline: they
+    run one after another, each searching for at most an equal share of the
+    time left, so the search time of the whole call is `deadline_s`, as for
+    a single optimized itinerary. Plans that repeat an earlier variant's
+    stops are dropped. `budget` is as for create_itinerary. Returns a list
+    of {"variant", "itinerary"} dicts.
+    """
+    tourist, food, travel, trip = _itinerary_inputs(user_location, tourist_df, food_df, total_time_hr, budget)
+    start = datetime.strptime(start_time, "%H:%M")
+    route_hours = _route_budget(food, start, start + timedelta(hours=total_time_hr), total_time_hr)
+
+    stop_at = time.perf_counter() + deadline_s
+    routes, plans = {}, []
+    for i, variant in enumerate(variants):
+        share = max(0.0, stop_at - time.perf_counter()) / (len(variants) - i)
+        stops, lunch = _variant_stops(variant, tourist, food, travel, route_hours, share, routes)
+        plans.append(_schedule(stops, food, travel, trip, start_time, total_time_hr, lunch=lunch))
+
+    result = []
+    for variant, itinerary in zip(variants, plans):
+        if itinerary and not any(_similar(itinerary, kept["itinerary"]) for kept in result):
+            result.append({"variant": variant, "itinerary": itinerary})
+    return result
+
+# --------- Multi-day Planner ---------
+def _day_frames(tourist_df, food_df, days):
+    # One (tourist, food) pair per day: attractions split by weighted k-means
+    # (fewer days when there are fewer distinct places), food places go to the
+    # nearest day centre. A day short of LUNCH_STOPS takes the nearest food
+    # places from days that have more than they need; no place is on two days.
+    coords = tourist_df[["lat", "lng"]].to_numpy(dtype=float)
+    weights = tourist_df["final_score"].to_numpy(dtype=float) if "final_score" in tourist_df else None
+    labels, centers = weighted_kmeans(coords, days, weights=weights)
+
+    food_coords = food_df[["lat", "lng"]].to_numpy(dtype=float)
+    food_labels = nearest_center(food_coords, centers)
+    counts = np.bincount(food_labels, minlength=len(centers))
+    for day in np.flatnonzero(counts < LUNCH_STOPS):
+        for row in np.argsort(distances_km(centers[day], food_coords), kind="stable"):
+            if counts[day] >= LUNCH_STOPS:
+                break
+            owner = food_labels[row]
+            if owner != day and counts[owner] > LUNCH_STOPS:
+                food_labels[row] = day
+                counts[owner] -= 1
+                counts[day] += 1
+    return [
+        (centers[day], tourist_df.iloc[np.flatnonzero(labels == day)], food_df.iloc[np.flatnonzero(food_labels == day)])
+        for day in range(len(centers))
+    ]
+
+def plan_trip(user_location, tourist_df, food_df, days, hours_per_day=8, start_time="10:00",
+              mode=None, deadline_s=ITINERARY_DEADLINE_S, workers=TRIP_WORKERS, budget=None):
+    """Multi-day plan: one geographic group of candidates per day.
+
+    Returns a list of {"day", "center", "itinerary"} dicts, one per day (fewer
+    when there are fewer distinct attraction locations than days), each
+    itinerary built by create_itinerary (lunch rules apply per day) from
+    `user_location`. Days are planned concurrently; cost grows with
+    n * days for the split plus the per-day matrices, never with n^2.
+    """
+    if days < 1:
+        raise ValueError("days must be at least 1")
+    if tourist_df.empty:
+        return []
+    groups = _day_frames(tourist_df, food_df, days)
+
+    def plan(group):
+        _, tourist, food = group
+        return create_itinerary(user_location, tourist, food, total_time_hr=hours_per_day,
+                                start_time=start_time, mode=mode, deadline_s=deadline_s, budget=budget)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(groups)))) as pool:
+        itineraries = list(pool.map(plan, groups))
+
+    # Closest day first, so the trip starts near the start point
+    order = np.argsort(distances_km(user_location, np.array([g[0] for g in groups])), kind="stable")
+    return [
+        {"day": day + 1, "center": tuple(float(x) for x in groups[i][0]), "itinerary": itineraries[i]}
+        for day, i in enumerate(order)
+    ]
+
+IMPORT_TIME = time.perf_counter() - _import_started
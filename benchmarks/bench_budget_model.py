@@ -0,0 +1,82 @@
+# benchmarks/bench_budget_model.py
+# Evaluation of the distilled linear budget model against the random forest
+# it was fitted to: agreement with the forest, error against the training
+# labels (in-sample for both), and per-query latency, single and batched.
+# Use it to pick BUDGET_MODEL in backendLogic.
+#
+#   python train_models.py && python benchmarks/bench_budget_model.py [models_dir] [data.csv]
+#
+# "places" are the training descriptions; "queries" are short made-up texts
+# from the same vocabulary, closer to what predict_budget sees.
+
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from common import best_of
+from compact_models import load_compact
+from train_models import DATA_PATH, budget_map, prepare
+
+TIERS = np.array(sorted(budget_map.values()), dtype=float)
+N_QUERIES = 500
+
+
+def tier(values):
+    return TIERS[np.abs(np.asarray(values)[:, None] - TIERS[None, :]).argmin(axis=1)]
+
+
+def agreement(name, forest, student, labels=None):
+    mae = np.abs(forest - student).mean()
+    r2 = 1 - ((forest - student) ** 2).sum() / max(((forest - forest.mean()) ** 2).sum(), 1e-12)
+    line = (f"{name:>8}: MAE vs forest {mae:7.1f}  R^2 {r2:6.3f}  "
+            f"same budget tier {np.mean(tier(forest) == tier(student)):6.1%}")
+    if labels is not None:
+        line += (f"  label MAE forest {np.abs(forest - labels).mean():6.1f} /"
+                 f" distilled {np.abs(student - labels).mean():6.1f}")
+    print(line)
+
+
+def per_call_ms(fn, inputs):
+    t0 = time.perf_counter()
+    for x in inputs:
+        fn(x)
+    return (time.perf_counter() - t0) / len(inputs) * 1000
+
+
+def main():
+    models_dir = sys.argv[1] if len(sys.argv) > 1 else "models"
+    data_path = sys.argv[2] if len(sys.argv) > 2 else DATA_PATH
+    vectorizer = joblib.load(os.path.join(models_dir, "tfidf_vectorizer.pkl"))
+    forest = joblib.load(os.path.join(models_dir, "budget_predictor.pkl"))
+    distilled = joblib.load(os.path.join(models_dir, "budget_distilled.pkl"))
+    compact_dir = os.path.join(models_dir, "compact")
+    _, _, compact_forest = load_compact(compact_dir)
+    _, _, compact_distilled = load_compact(compact_dir, budget_model="distilled")
+
+    df = prepare(pd.read_csv(data_path), np.random.RandomState(42))
+    places = vectorizer.transform(df['combined'])
+    rng = np.random.default_rng(0)
+    vocab = vectorizer.get_feature_names_out()
+    texts = [" ".join(rng.choice(vocab, rng.integers(2, 7))) for _ in range(N_QUERIES)]
+    queries = vectorizer.transform(texts)
+
+    print(f"{len(df):,} places, {N_QUERIES} queries, {len(forest.estimators_)} trees")
+    agreement("places", forest.predict(places), distilled.predict(places), df['budget_numeric'].to_numpy(float))
+    agreement("queries", forest.predict(queries), distilled.predict(queries))
+
+    rows = [queries[i] for i in range(100)]
+    batch = queries[:N_QUERIES]
+    print(f"\n{'model':>28} {'single query':>13} {'batch of ' + str(N_QUERIES):>14}")
+    for name, model in (("forest (scikit-learn)", forest), ("forest (compact)", compact_forest),
+                        ("distilled (scikit-learn)", distilled), ("distilled (compact)", compact_distilled)):
+        single = per_call_ms(model.predict, rows)
+        batched = best_of(lambda: model.predict(batch)) / N_QUERIES * 1000
+        print(f"{name:>28} {single:>11.3f}ms {batched:>10.4f}ms/q")
+
+
+if __name__ == "__main__":
+    main()
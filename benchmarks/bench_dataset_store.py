@@ -0,0 +1,84 @@
+# benchmarks/bench_dataset_store.py
+# Load time and resident memory of the place index: parsing the CSV and
+# vectorizing every description versus memory-mapping the dataset store.
+# Each measurement runs in a fresh interpreter; RSS is private (anonymous)
+# memory, since mapped store pages are shared page cache across workers.
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import joblib
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from common import ROOT, synthetic_places
+
+LOAD_SCRIPT = r"""
+import json, os, sys, time
+sys.path.insert(0, {root!r})
+import joblib
+from backendLogic import build_place_index
+from dataset_store import load_place_index
+
+def rss_mb():
+    # private (anonymous) memory; mapped file pages are shared page cache
+    with open("/proc/self/status") as fh:
+        for line in fh:
+            if line.startswith("RssAnon:"):
+                return int(line.split()[1]) / 1024
+
+mode, workdir = sys.argv[1], sys.argv[2]
+vectorizer = joblib.load(os.path.join(workdir, "vectorizer.pkl"))
+before = rss_mb()
+t0 = time.perf_counter()
+if mode == "csv":
+    _, index = build_place_index(os.path.join(workdir, "places.csv"), vectorizer)
+else:
+    index = load_place_index(os.path.join(workdir, "store"))
+load_s = time.perf_counter() - t0
+load_rss = rss_mb() - before
+
+# one request's worth of work
+t0 = time.perf_counter()
+origin = index.coords[index.spatial.positions[0]]
+positions = index.within(origin, 90)
+index.cosine_scores(vectorizer.transform(["w3 w17"]), positions)
+index.rows(positions[:30])
+request_s = time.perf_counter() - t0
+print(json.dumps({{"load_s": load_s, "request_s": request_s, "rss_mb": load_rss, "request_rss_mb": rss_mb() - before}}))
+"""
+
+
+def measure(mode, workdir):
+    out = subprocess.run(
+        [sys.executable, "-c", LOAD_SCRIPT.format(root=ROOT), mode, workdir],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout)
+
+
+def main():
+    from backendLogic import build_place_index
+    from dataset_store import save_place_index
+
+    print(f"{'places':>9} {'csv load':>10} {'csv RSS':>10} {'store load':>11} {'store RSS':>10} "
+          f"{'1st request csv/store':>22} {'RSS after request csv/store':>28}")
+    for n in (20_000, 100_000, 400_000):
+        with tempfile.TemporaryDirectory() as workdir:
+            frame = synthetic_places(n)
+            frame.to_csv(os.path.join(workdir, "places.csv"), index=False)
+            vectorizer = TfidfVectorizer(stop_words="english").fit(frame["description"])
+            joblib.dump(vectorizer, os.path.join(workdir, "vectorizer.pkl"))
+            _, index = build_place_index(os.path.join(workdir, "places.csv"), vectorizer)
+            save_place_index(index, os.path.join(workdir, "store"))
+
+            csv, store = measure("csv", workdir), measure("store", workdir)
+            print(f"{n:>9,} {csv['load_s']:>9.2f}s {csv['rss_mb']:>8.1f}MB {store['load_s'] * 1000:>9.1f}ms "
+                  f"{store['rss_mb']:>8.1f}MB {csv['request_s'] * 1000:>10.1f}ms / {store['request_s'] * 1000:>5.1f}ms "
+                  f"{csv['request_rss_mb']:>15.1f}MB / {store['request_rss_mb']:.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# benchmarks/bench_distance.py
+# geopy.geodesic per-row loop (what recommend_places used to do) against the
+# vectorized geo_distance module at 10k, 100k and 1M places.
+
+import numpy as np
+from geopy.distance import geodesic
+
+from common import best_of, synthetic_coords
+from geo_distance import distances_km
+
+ORIGIN = (23.02, 72.57)
+GEOPY_SAMPLE = 10_000  # the loop is timed on a sample and scaled linearly
+
+
+def geopy_loop(coords):
+    return [geodesic(ORIGIN, (lat, lng)).km for lat, lng in coords]
+
+
+def main():
+    coords = synthetic_coords(GEOPY_SAMPLE)
+    ref = np.array(geopy_loop(coords))
+    for method in ("haversine", "ellipsoidal"):
+        err = np.abs(distances_km(ORIGIN, coords, method=method) - ref)
+        print(f"{method:<12} max abs error vs geopy: {err.max() * 1000:.4f} m, "
+              f"max rel error: {(err / ref).max():.2e}")
+    print()
+
+    per_row = best_of(lambda: geopy_loop(coords), repeat=1) / GEOPY_SAMPLE
+    print(f"{'places':>10} {'geopy loop':>12} {'haversine':>12} {'speedup':>9} {'ellipsoidal':>12} {'speedup':>9}")
+    for n in (10_000, 100_000, 1_000_000):
+        coords = synthetic_coords(n)
+        t_geopy = per_row * n
+        t_hav = best_of(lambda: distances_km(ORIGIN, coords))
+        t_ell = best_of(lambda: distances_km(ORIGIN, coords, method="ellipsoidal"))
+        est = "" if n == GEOPY_SAMPLE else "~"
+        print(f"{n:>10,} {est + f'{t_geopy:.3f}s':>12} {t_hav * 1000:>10.2f}ms {t_geopy / t_hav:>8.0f}x "
+              f"{t_ell * 1000:>10.2f}ms {t_geopy / t_ell:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
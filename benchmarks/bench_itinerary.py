@@ -0,0 +1,130 @@
+# benchmarks/bench_itinerary.py
+# create_itinerary before and after the precomputed travel matrix: the old
+# builder called geopy's geodesic once per candidate (row-wise apply) and
+# again for every scheduled hop; the new one computes every pairwise travel
+# time in one vectorized pass and only does lookups while scheduling.
+# The second table compares the "fast" (nearest first) and "optimized"
+# (orienteering) modes on total score, stops and wall time; the third times
+# plan_trip for week-long trips over hundreds of candidates; the last one
+# compares three alternative itineraries against a single optimized one.
+
+from datetime import datetime, timedelta
+
+import numpy as np
+from geopy.distance import geodesic
+
+from common import best_of, synthetic_places
+from backendLogic import create_itinerary, create_itinerary_variants, plan_trip
+
+START = (23.02, 72.57)
+
+
+def old_create_itinerary(user_location, tourist_df, food_df, total_time_hr=4, start_time="10:00"):
+    # The pre-matrix scheduling loop, kept here for comparison
+    itinerary = []
+    current_location = user_location
+    current_time = datetime.strptime(start_time, "%H:%M")
+    end_time = current_time + timedelta(hours=total_time_hr)
+
+    remaining = tourist_df.copy()
+    remaining["distance"] = remaining.apply(
+        lambda row: geodesic(current_location, (row["lat"], row["lng"])).km, axis=1
+    )
+    remaining.sort_values("distance", inplace=True)
+
+    food_added = 0
+    food_inserted = False
+    while not remaining.empty:
+        next_place = remaining.iloc[0]
+        travel_time = geodesic(current_location, (next_place["lat"], next_place["lng"])).km / 30
+        arrival = current_time + timedelta(hours=travel_time)
+        if arrival + timedelta(hours=1) > end_time:
+            break
+        itinerary.append({"type": "place", "name": next_place["name"], "arrival": arrival})
+        current_time = arrival + timedelta(hours=1)
+        current_location = (next_place["lat"], next_place["lng"])
+        remaining.drop(index=next_place.name, inplace=True)
+
+        if total_time_hr > 4 and not food_inserted and 12 <= current_time.hour <= 14 and not food_df.empty:
+            top_food = food_df.sort_values("final_score", ascending=False).head(2 - food_added)
+            for _, food_place in top_food.iterrows():
+                travel = geodesic(current_location, (food_place["lat"], food_place["lng"])).km / 30
+                arrival_food = current_time + timedelta(hours=travel)
+                if arrival_food + timedelta(hours=1) > end_time:
+                    continue
+                itinerary.append({"type": "food", "name": food_place["name"], "arrival": arrival_food})
+                current_time = arrival_food + timedelta(hours=1)
+                current_location = (food_place["lat"], food_place["lng"])
+                food_df.drop(index=food_place.name, inplace=True)
+                food_added += 1
+                if food_added >= 2:
+                    break
+            food_inserted = True
+    return itinerary
+
+
+def candidates(n, seed):
+    frame = synthetic_places(n, center=START, spread_deg=0.05, seed=seed)
+    frame["final_score"] = np.random.default_rng(seed).random(n)
+    return frame
+
+
+def main():
+    print(f"{'stops':>6} {'old':>10} {'new':>10} {'speedup':>8} {'scheduled':>10}")
+    for n in (20, 200, 2000):
+        tourist = candidates(n, seed=1)
+        food = candidates(max(n // 2, 1), seed=2)
+        food.index += n  # catalogue rows never collide
+
+        old = old_create_itinerary(START, tourist, food.copy(), total_time_hr=10)
+        before = food.copy()
+        new = create_itinerary(START, tourist, food, total_time_hr=10, mode="fast")
+        assert food.equals(before)  # inputs are left alone
+        # same stops up to lunch; lunch itself is now detour-aware
+        first_food = next((i for i, s in enumerate(old) if s["type"] == "food"), len(old))
+        assert [s["name"] for s in old[:first_food]] == [s["name"] for s in new[:first_food]]
+
+        t_old = best_of(lambda: old_create_itinerary(START, tourist, food.copy(), total_time_hr=10))
+        t_new = best_of(lambda: create_itinerary(START, tourist, food.copy(), total_time_hr=10, mode="fast"))
+        print(f"{n + len(food):>6} {t_old * 1000:>8.1f}ms {t_new * 1000:>8.2f}ms "
+              f"{t_old / t_new:>7.1f}x {len(new):>10}")
+
+    print(f"\n{'stops':>6} {'mode':>10} {'score':>7} {'places':>7} {'time':>9}")
+    for n in (20, 200, 2000):
+        tourist = candidates(n, seed=3)
+        tourist[["lat", "lng"]] = synthetic_places(n, center=START, spread_deg=0.3, seed=3)[["lat", "lng"]]
+        food = candidates(max(n // 2, 1), seed=4)
+        food.index += n
+        score = tourist.set_index("name")["final_score"]
+        for mode in ("fast", "optimized"):
+            plan = create_itinerary(START, tourist, food.copy(), total_time_hr=10, mode=mode)
+            t = best_of(lambda: create_itinerary(START, tourist, food.copy(), total_time_hr=10, mode=mode))
+            places = [s["name"] for s in plan if s["type"] == "place"]
+            print(f"{n:>6} {mode:>10} {score[places].sum():>7.2f} {len(places):>7} {t * 1000:>7.1f}ms")
+
+    print(f"\n{'stops':>6} {'days':>5} {'places':>7} {'time':>9}")
+    for n in (200, 800):
+        tourist = candidates(n, seed=5)
+        tourist[["lat", "lng"]] = synthetic_places(n, center=START, spread_deg=0.5, seed=5)[["lat", "lng"]]
+        food = candidates(n // 2, seed=6)
+        food.index += n
+        for days in (1, 3, 7):
+            plan = plan_trip(START, tourist, food, days, hours_per_day=9)
+            t = best_of(lambda: plan_trip(START, tourist, food, days, hours_per_day=9))
+            places = sum(s["type"] == "place" for d in plan for s in d["itinerary"])
+            print(f"{n:>6} {days:>5} {places:>7} {t * 1000:>7.1f}ms")
+
+    print(f"\n{'stops':>6} {'single':>9} {'variants':>9} {'kept':>5}")
+    for n in (20, 200, 2000):
+        tourist = candidates(n, seed=7)
+        tourist[["lat", "lng"]] = synthetic_places(n, center=START, spread_deg=0.3, seed=7)[["lat", "lng"]]
+        food = candidates(max(n // 2, 1), seed=8)
+        food.index += n
+        kept = create_itinerary_variants(START, tourist, food, total_time_hr=9)
+        t_one = best_of(lambda: create_itinerary(START, tourist, food, total_time_hr=9, mode="optimized"))
+        t_all = best_of(lambda: create_itinerary_variants(START, tourist, food, total_time_hr=9))
+        print(f"{n:>6} {t_one * 1000:>7.1f}ms {t_all * 1000:>7.1f}ms {len(kept):>5}")
+
+
+if __name__ == "__main__":
+    main()
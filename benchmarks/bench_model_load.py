@@ -0,0 +1,112 @@
+# benchmarks/bench_model_load.py
+# Start-up cost of the serving models: unpickling the joblib files versus
+# mapping the compact export (compact_models.py). Each measurement runs in a
+# fresh interpreter and includes the library imports the format needs; RSS
+# is private (anonymous) memory, as in bench_dataset_store.py.
+#
+#   python benchmarks/bench_model_load.py           small synthetic models
+#   python benchmarks/bench_model_load.py models/   the pickles in a models dir
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import joblib
+import numpy as np
+
+from common import ROOT, synthetic_places
+
+LOAD_SCRIPT = r"""
+import json, os, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {root!r})
+
+def rss_mb():
+    with open("/proc/self/status") as fh:
+        for line in fh:
+            if line.startswith("RssAnon:"):
+                return int(line.split()[1]) / 1024
+
+mode, models_dir = sys.argv[1], sys.argv[2]
+before = rss_mb()
+if mode == "pickle":
+    import joblib
+    vectorizer = joblib.load(os.path.join(models_dir, "tfidf_vectorizer.pkl"))
+    mood_model = joblib.load(os.path.join(models_dir, "mood_classifier.pkl"))
+    budget_model = joblib.load(os.path.join(models_dir, "budget_predictor.pkl"))
+else:
+    from compact_models import load_compact
+    vectorizer, mood_model, budget_model = load_compact(os.path.join(models_dir, "compact"))
+load_s = time.perf_counter() - t0
+load_rss = rss_mb() - before
+
+text = "quiet temple garden with a lake view"
+t0 = time.perf_counter()
+mood = str(mood_model.predict([text])[0])
+budget = float(budget_model.predict(vectorizer.transform([text]))[0])
+query_s = time.perf_counter() - t0
+print(json.dumps({{"load_s": load_s, "rss_mb": load_rss, "query_s": query_s,
+                   "query_rss_mb": rss_mb() - before, "mood": mood, "budget": budget}}))
+"""
+
+
+def measure(mode, models_dir):
+    out = subprocess.run(
+        [sys.executable, "-c", LOAD_SCRIPT.format(root=ROOT), mode, models_dir],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout)
+
+
+def train_synthetic(models_dir, n=3000):
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.pipeline import make_pipeline
+
+    frame = synthetic_places(n)
+    rng = np.random.default_rng(0)
+    vectorizer = TfidfVectorizer(stop_words="english").fit(frame["description"])
+    mood = make_pipeline(TfidfVectorizer(), MultinomialNB()).fit(
+        frame["description"], rng.choice(["Relaxing", "Cultural", "Romantic"], n))
+    budget = RandomForestRegressor(n_estimators=100, random_state=0, n_jobs=-1).fit(
+        vectorizer.transform(frame["description"]), rng.choice([0, 300, 500, 800], n))
+    for name, model in (("tfidf_vectorizer", vectorizer), ("mood_classifier", mood), ("budget_predictor", budget)):
+        joblib.dump(model, os.path.join(models_dir, f"{name}.pkl"))
+
+
+def dir_mb(path, names=None):
+    names = names or os.listdir(path)
+    return sum(os.path.getsize(os.path.join(path, f)) for f in names) / 2**20
+
+
+def main():
+    from compact_models import export_compact
+
+    with tempfile.TemporaryDirectory() as workdir:
+        models_dir = workdir
+        if len(sys.argv) > 1:
+            for name in ("tfidf_vectorizer", "mood_classifier", "budget_predictor"):
+                os.symlink(os.path.abspath(os.path.join(sys.argv[1], f"{name}.pkl")),
+                           os.path.join(workdir, f"{name}.pkl"))
+        else:
+            train_synthetic(models_dir)
+        export_compact(models_dir, os.path.join(models_dir, "compact"))
+
+        pickle_mb = dir_mb(models_dir, [f for f in os.listdir(models_dir) if f.endswith(".pkl")])
+        compact_mb = dir_mb(os.path.join(models_dir, "compact"))
+        results = {mode: measure(mode, models_dir) for mode in ("pickle", "compact")}
+        assert results["pickle"]["mood"] == results["compact"]["mood"]
+        assert abs(results["pickle"]["budget"] - results["compact"]["budget"]) < 1e-3
+
+    print(f"on disk: pickles {pickle_mb:.1f}MB, compact {compact_mb:.1f}MB")
+    print(f"{'format':>8} {'start-up':>10} {'RSS':>9} {'1st query':>10} {'RSS after query':>16}")
+    for mode, r in results.items():
+        print(f"{mode:>8} {r['load_s'] * 1000:>8.0f}ms {r['rss_mb']:>7.1f}MB {r['query_s'] * 1000:>8.1f}ms "
+              f"{r['query_rss_mb']:>14.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
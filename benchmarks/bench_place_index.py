@@ -0,0 +1,60 @@
+# benchmarks/bench_place_index.py
+# Per-request text processing before and after PlaceIndex: the old path
+# re-vectorized every candidate description, the new one slices precomputed
+# TF-IDF rows and only tokenizes the mood query.
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from common import best_of, synthetic_places
+from place_index import PlaceIndex
+
+MOODS = "w3 w17 w250"
+
+
+class CountingVectorizer:
+    """Wraps a fitted vectorizer and counts the documents it tokenizes."""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.docs = 0
+
+    def transform(self, docs):
+        docs = list(docs)
+        self.docs += len(docs)
+        return self.inner.transform(docs)
+
+
+def old_path(vec, frame, positions):
+    user_vector = vec.transform([MOODS])
+    place_vectors = vec.transform(frame["description"].iloc[positions])
+    return cosine_similarity(user_vector, place_vectors).ravel()
+
+
+def new_path(vec, index, positions):
+    return index.cosine_scores(vec.transform([MOODS]), positions)
+
+
+def main():
+    frame = synthetic_places(200_000)
+    frame["place_category"] = "attraction"
+    fitted = TfidfVectorizer(stop_words="english").fit(frame["description"])
+    index = PlaceIndex.from_frame(frame, fitted.transform(frame["description"]))
+    rng = np.random.default_rng(1)
+
+    print(f"{'candidates':>10} {'old':>10} {'new':>10} {'speedup':>8} {'docs tokenized old/new':>24}")
+    for n in (1_000, 10_000, 50_000, 200_000):
+        positions = np.sort(rng.choice(len(frame), n, replace=False))
+        vec_old, vec_new = CountingVectorizer(fitted), CountingVectorizer(fitted)
+        old = old_path(vec_old, frame, positions)
+        new = new_path(vec_new, index, positions)
+        assert np.allclose(old, new)
+        t_old = best_of(lambda: old_path(fitted, frame, positions))
+        t_new = best_of(lambda: new_path(fitted, index, positions))
+        print(f"{n:>10,} {t_old * 1000:>8.1f}ms {t_new * 1000:>8.2f}ms {t_old / t_new:>7.0f}x "
+              f"{f'{vec_old.docs} / {vec_new.docs}':>24}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/bench_semantic_index.py
+# Top-k mood matches from the impact-ordered semantic index (ann_index.py)
+# versus brute-force cosine over every place: recall@k and per-query latency
+# for a range of depths. Recall counts ties at the k-th score as hits, since
+# random descriptions produce many equal similarities.
+
+import time
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from common import best_of, synthetic_places
+from ann_index import ImpactIndex
+from place_index import PlaceIndex
+from topk import top_k
+
+N_PLACES = 200_000
+N_QUERIES = 100
+KS = (10, 20)
+DEPTHS = (20, 100, 500, 2000, None)
+
+
+def brute_force(index, query_vector, k):
+    scores = index.cosine_scores(query_vector, np.arange(len(index)))
+    best = top_k(scores, k)
+    return best, scores[best]
+
+
+def main():
+    frame = synthetic_places(N_PLACES)
+    frame["place_category"] = "attraction"
+    fitted = TfidfVectorizer(stop_words="english").fit(frame["description"])
+    index = PlaceIndex.from_frame(frame, fitted.transform(frame["description"]))
+
+    t0 = time.perf_counter()
+    index._semantic_index = ImpactIndex.build(index.matrix, index.norms)
+    print(f"index build: {time.perf_counter() - t0:.2f}s for {N_PLACES:,} places")
+
+    # mood-like queries: one to three of the more common words
+    rng = np.random.default_rng(7)
+    vocab = fitted.get_feature_names_out()[:300]
+    queries = [fitted.transform([" ".join(rng.choice(vocab, rng.integers(1, 4)))]) for _ in range(N_QUERIES)]
+    truth = {k: [brute_force(index, q, k)[1][-1] for q in queries] for k in KS}
+    t_brute = best_of(lambda: [brute_force(index, q, max(KS)) for q in queries]) / N_QUERIES
+
+    print(f"{'depth':>7} " + " ".join(f"{f'recall@{k}':>10}" for k in KS) + f" {'latency':>10} {'speedup':>8}")
+    print(f"{'brute':>7} " + " ".join(f"{1.0:>10.3f}" for _ in KS) + f" {t_brute * 1000:>8.2f}ms {1:>7.0f}x")
+    for depth in DEPTHS:
+        recalls = []
+        for k in KS:
+            hits = [(index.semantic_top_k(q, k, depth)[1] >= kth - 1e-12).sum() / k
+                    for q, kth in zip(queries, truth[k])]
+            recalls.append(float(np.mean(np.minimum(hits, 1.0))))
+        t = best_of(lambda: [index.semantic_top_k(q, max(KS), depth) for q in queries]) / N_QUERIES
+        label = "all" if depth is None else depth
+        print(f"{label:>7} " + " ".join(f"{r:>10.3f}" for r in recalls)
+              + f" {t * 1000:>8.2f}ms {t_brute / t:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
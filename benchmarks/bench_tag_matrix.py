@@ -0,0 +1,117 @@
+# benchmarks/bench_tag_matrix.py
+# Memory and latency of the tag ("collaborative") similarity path, before
+# and after tag_index.py:
+#   before  dense MultiLabelBinarizer matrix over every distinct word, cosine
+#           NearestNeighbors fitted on it, kneighbors per query
+#   after   sparse tag matrix over the pruned vocabulary: the same KNN fit
+#           (training) and the TagIndex behind similar_places (serving)
+# Memory is the peak traced allocation while building (tracemalloc sees
+# numpy and scipy buffers) plus the bytes the fitted matrices keep. The
+# catalogue's vocabulary grows with its size, as real descriptions do.
+# "agreement" is the share of the pruned top-10 that also scores at least
+# the 10th best similarity over the full vocabulary. The second table sweeps
+# the pruning thresholds (TAG_MIN_DF / TAG_MAX_DF) on the largest catalogue.
+# Synthetic words are drawn at random, so the frequent ones carry as much
+# signal as any other. In real descriptions they are stop words, so treat
+# agreement at low max_df as a lower bound.
+
+import time
+import tracemalloc
+
+import numpy as np
+
+from common import synthetic_places
+from tag_index import TAG_MAX_DF, TAG_MIN_DF, TagIndex, place_tags, tag_matrix
+
+SIZES = (2_000, 5_000, 10_000)
+K = 10
+N_QUERIES = 200
+PRUNING = ((1, 1.0), (2, 1.0), (2, 0.5), (2, 0.2), (2, 0.1))  # (min_df, max_df)
+
+
+def traced(fn):
+    # (result, peak MB allocated while it ran)
+    tracemalloc.start()
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, peak / 2**20
+
+
+def nbytes(*matrices):
+    total = 0
+    for m in matrices:
+        total += m.nbytes if isinstance(m, np.ndarray) else m.data.nbytes + m.indices.nbytes + m.indptr.nbytes
+    return total / 2**20
+
+
+def dense_knn(tags):
+    from sklearn.neighbors import NearestNeighbors
+    from sklearn.preprocessing import MultiLabelBinarizer
+
+    matrix = MultiLabelBinarizer().fit_transform(tags)
+    return matrix, NearestNeighbors(metric="cosine", algorithm="brute").fit(matrix)
+
+
+def sparse_knn(tags):
+    from sklearn.neighbors import NearestNeighbors
+
+    matrix, vocabulary = tag_matrix(tags)
+    return matrix, NearestNeighbors(metric="cosine", algorithm="brute").fit(matrix)
+
+
+def per_query_ms(fn, queries):
+    t0 = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - t0) / len(queries) * 1000
+
+
+def agreement(index, full, queries):
+    hits = []
+    for q in queries:
+        positions, _ = index.similar(q, K)
+        _, reference = full.similar(q, K)
+        if len(reference) == 0:
+            continue
+        scores = (full.matrix[q] @ full.matrix[positions].T).toarray().ravel()
+        hits.append(np.sum(scores >= reference[-1] - 1e-6) / min(K, len(reference)))
+    return float(np.mean(np.minimum(hits, 1.0)))
+
+
+def main():
+    print(f"{'places':>7} {'path':>18} {'vocab':>7} {'build peak':>11} {'kept':>9} {'query':>9}")
+    for n in SIZES:
+        texts = synthetic_places(n, vocab_size=n)["description"].tolist()
+        tags = [place_tags(t) for t in texts]
+        queries = np.random.default_rng(0).choice(n, N_QUERIES, replace=False)
+
+        (matrix, knn), peak = traced(lambda: dense_knn(tags))
+        ms = per_query_ms(lambda q: knn.kneighbors(matrix[q:q + 1], K + 1), queries)
+        print(f"{n:>7} {'dense KNN':>18} {matrix.shape[1]:>7} {peak:>9.1f}MB "
+              f"{nbytes(knn._fit_X):>7.1f}MB {ms:>7.2f}ms")
+        del matrix, knn
+
+        (matrix, knn), peak = traced(lambda: sparse_knn(tags))
+        ms = per_query_ms(lambda q: knn.kneighbors(matrix[q], K + 1), queries)
+        print(f"{n:>7} {'sparse KNN':>18} {matrix.shape[1]:>7} {peak:>9.1f}MB "
+              f"{nbytes(knn._fit_X):>7.1f}MB {ms:>7.2f}ms")
+
+        index, peak = traced(lambda: TagIndex.build(texts))
+        ms = per_query_ms(lambda q: index.similar(q, K), queries)
+        full = TagIndex.build(texts, min_df=1, max_df=1.0)
+        print(f"{n:>7} {'TagIndex.similar':>18} {index.n_tags:>7} {peak:>9.1f}MB "
+              f"{nbytes(index.matrix, index.inverted):>7.1f}MB {ms:>7.3f}ms"
+              f"  agreement {agreement(index, full, queries):.3f}")
+
+    print(f"\npruning sweep, {n:,} places (default min_df={TAG_MIN_DF}, max_df={TAG_MAX_DF})")
+    print(f"{'min_df':>7} {'max_df':>7} {'vocab':>7} {'kept':>9} {'query':>9} {'agreement':>10}")
+    for min_df, max_df in PRUNING:
+        index = TagIndex.build(texts, min_df, max_df)
+        ms = per_query_ms(lambda q: index.similar(q, K), queries)
+        print(f"{min_df:>7} {max_df:>7} {index.n_tags:>7} {nbytes(index.matrix, index.inverted):>7.2f}MB "
+              f"{ms:>7.3f}ms {agreement(index, full, queries):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
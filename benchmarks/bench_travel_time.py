@@ -0,0 +1,80 @@
+# benchmarks/bench_travel_time.py
+# Many-to-many travel-time matrices for an itinerary-sized set of places:
+# straight line vs the road graph, with one unbounded Dijkstra per place
+# (the naive way) vs the landmark-bounded searches RoadGraphTravel runs,
+# without a time limit and with the itinerary's (LIMIT_HR). Uses a
+# synthetic 300 x 300 street grid (90k nodes) with some fast and one-way
+# streets.
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+from scipy.sparse.csgraph import dijkstra
+
+from common import best_of
+from travel_time import RoadGraphTravel, StraightLineTravel, build_graph
+
+ORIGIN = (22.8, 72.35)
+STEP_DEG = 0.0015
+LIMIT_HR = 1.0
+
+
+def grid_graph(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    ii, jj = np.meshgrid(np.arange(n), np.arange(n), indexing="ij")
+    nodes = pd.DataFrame({"id": (ii * n + jj).ravel(),
+                          "lat": ORIGIN[0] + ii.ravel() * STEP_DEG,
+                          "lng": ORIGIN[1] + jj.ravel() * STEP_DEG})
+    right = (ii[:, :-1] * n + jj[:, :-1]).ravel()
+    down = (ii[:-1] * n + jj[:-1]).ravel()
+    edges = pd.DataFrame({"u": np.r_[right, down], "v": np.r_[right + 1, down + n]})
+    edges["length_m"] = 165.0
+    edges["speed_kmh"] = np.where(rng.random(len(edges)) < 0.1, 50, 20)
+    edges["oneway"] = rng.random(len(edges)) < 0.05
+    return nodes, edges
+
+
+def naive_matrix(graph, points):
+    nodes, snap_km = graph.snap(points)
+    access = snap_km / graph.access_speed_kmh
+    m = np.array([dijkstra(graph.graph, indices=int(n))[nodes] for n in nodes])
+    m += access[:, None] + access[None, :]
+    np.fill_diagonal(m, 0.0)
+    return m
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "road_graph.npz")
+        t_build = best_of(lambda: build_graph(*grid_graph(), out_path=path), repeat=1)
+        graph = RoadGraphTravel.load(path)
+    print(f"build incl. {len(graph.landmark_from)} landmarks: {t_build:.1f}s")
+    straight = StraightLineTravel()
+    rng = np.random.default_rng(1)
+
+    print(f"{'area':>12} {'straight':>9} {'naive':>9} {'bounded':>9} {f'{LIMIT_HR:g}h limit':>9} "
+          f"{'road/straight':>14}")
+    for span_deg in (0.02, 0.05, 0.1, 0.3):
+        lo = np.array([22.9, 72.45])
+        points = rng.uniform(lo, lo + span_deg, (31, 2))
+        naive = naive_matrix(graph, points)
+        bounded = graph.matrix(points)
+        assert np.allclose(bounded, naive)
+        limited = graph.matrix(points, limit_hr=LIMIT_HR)
+        within = naive < LIMIT_HR
+        assert np.allclose(limited[within], naive[within]) and (limited[~within] >= LIMIT_HR).all()
+        t_line = best_of(lambda: straight.matrix(points))
+        t_naive = best_of(lambda: naive_matrix(graph, points))
+        t_bounded = best_of(lambda: graph.matrix(points))
+        t_limited = best_of(lambda: graph.matrix(points, limit_hr=LIMIT_HR))
+        off = ~np.eye(len(points), dtype=bool)
+        ratio = np.median(bounded[off] / straight.matrix(points)[off])
+        km = span_deg * 111
+        print(f"{f'{km:.0f} x {km:.0f} km':>12} {t_line * 1000:>7.2f}ms {t_naive * 1000:>7.0f}ms "
+              f"{t_bounded * 1000:>7.0f}ms {t_limited * 1000:>7.0f}ms {ratio:>13.2f}x")
+
+
+if __name__ == "__main__":
+    main()
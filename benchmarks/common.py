@@ -0,0 +1,53 @@
+# benchmarks/common.py
+# Small helpers shared by the benchmark scripts. Run any benchmark from the
+# repository root, e.g. `python benchmarks/bench_distance.py`.
+
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def best_of(fn, repeat=3):
+    """Best wall-clock time of `repeat` calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def synthetic_coords(n, center=(23.02, 72.57), spread_deg=2.0, seed=0):
+    """(n, 2) lat/lng array scattered around a city centre."""
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        center[0] + rng.uniform(-spread_deg, spread_deg, n),
+        center[1] + rng.uniform(-spread_deg, spread_deg, n),
+    ])
+
+
+def synthetic_places(n, center=(23.02, 72.57), spread_deg=2.0, vocab_size=1500, seed=0):
+    """Place table shaped like cleaned_tourism_dataset.csv with random descriptions."""
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    vocab = np.array([f"w{i}" for i in range(vocab_size)])
+    # Zipf-ish word frequencies, like real descriptions
+    p = 1.0 / np.arange(1, vocab_size + 1)
+    p /= p.sum()
+    coords = synthetic_coords(n, center=center, spread_deg=spread_deg, seed=seed)
+    return pd.DataFrame({
+        "name": [f"Place {i}" for i in range(n)],
+        "rating": np.round(rng.uniform(1, 5, n), 1),
+        "reviews": rng.integers(0, 5000, n),
+        "address": [f"{i % 97} Main Road, City{i % 7}, India" for i in range(n)],
+        "description": [" ".join(rng.choice(vocab, rng.integers(4, 12), p=p)) for _ in range(n)],
+        "lat": coords[:, 0],
+        "lng": coords[:, 1],
+    })
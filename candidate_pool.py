@@ -0,0 +1,59 @@
+# candidate_pool.py
+# Struct-of-arrays view of itinerary candidates.
+#
+# create_itinerary used to walk a DataFrame, dropping rows and re-sorting the
+# food table at every step. A CandidatePool copies the few columns a stop
+# needs into plain arrays once, tracks which candidates are still available
+# with a boolean mask, and only builds the output dicts for the stops that
+# were actually scheduled. The caller's frame is never modified.
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ("name", "description", "address", "lat", "lng", "rating", "reviews")
+
+
+class CandidatePool:
+    def __init__(self, columns, scores, nodes, ids=None):
+        self.columns = columns
+        self.scores = scores
+        self.nodes = nodes
+        self.ids = np.arange(len(nodes)) if ids is None else ids
+        self.alive = np.ones(len(nodes), dtype=bool)
+        self.ratings = pd.to_numeric(pd.Series(columns["rating"]), errors="coerce").fillna(0).to_numpy(dtype=float)
+
+    @classmethod
+    def from_frame(cls, frame, first_node=0):
+        """Pool over `frame`'s rows; row i is node `first_node + i` of the travel matrix."""
+        columns = {col: frame[col].to_numpy() for col in COLUMNS}
+        if "final_score" in frame.columns:
+            scores = frame["final_score"].to_numpy(dtype=float)
+        else:
+            scores = np.zeros(len(frame))
+        nodes = np.arange(first_node, first_node + len(frame))
+        return cls(columns, scores, nodes, ids=frame.index.to_numpy())
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def fresh(self):
+        """The same candidates with none taken; shares the column arrays."""
+        return CandidatePool(self.columns, self.scores, self.nodes, self.ids)
+
+    def take(self, i):
+        self.alive[i] = False
+
+    def stop(self, i, kind, arrival, stay):
+        c = self.columns
+        return {
+            "type": kind,
+            "name": c["name"][i],
+            "desc": c["description"][i],
+            "address": c["address"][i],
+            "arrival": arrival,
+            "stay_duration_hr": stay,
+            "lat": c["lat"][i],
+            "lng": c["lng"][i],
+            "rating": c["rating"][i],
+            "reviews": c["reviews"][i]
+        }
@@ -0,0 +1,425 @@
+# compact_models.py
+# Pickle-free copies of the trained models.
+#
+# `python train_models.py` (or `--export` on its own) writes models/compact/:
+# plain .npy arrays plus a manifest.json, no Python objects. The serving
+# models are rebuilt from arrays alone:
+#   vectorizer    vocabulary (UTF-8 terms, one per line) and IDF weights
+#   mood model    the naive Bayes log-probabilities, over the vectorizer's
+#                 vocabulary when it was trained on it, else its own copy
+#   budget model  the forest's trees as flat node arrays (int32 children and
+#                 features, in a layout built for sparse rows, see
+#                 CompactForest), or a linear model's raw weights; the
+#                 linear model distilled from the forest likewise
+# The loader memory-maps every array, so start-up is a few small reads and
+# only the pages that queries touch become resident; nothing depends on the
+# scikit-learn version that trained the models (serving does not even import
+# it, except for hashing vectorizers from --streaming). The KNN matrices are
+# exported too, as .npz CSR files with int32 indices and float32 data.
+#
+# The transforms reproduce scikit-learn's default word analyzer (lowercase,
+# token pattern, stop words, unigram counts) and TF-IDF weighting exactly.
+#
+# An export is written to a staging directory and renamed over
+# models/compact (dataset_store.replace_dir), never written in place:
+# serving processes map these arrays.
+
+import json
+import os
+import re
+import shutil
+
+import numpy as np
+import scipy.sparse as sp
+
+from dataset_store import file_fingerprint, replace_dir
+
+COMPACT_DIR = os.path.join("models", "compact")
+FORMAT_VERSION = 1
+SOURCES = {
+    "vectorizer": "tfidf_vectorizer.pkl",
+    "mood_model": "mood_classifier.pkl",
+    "budget_model": "budget_predictor.pkl",
+    "budget_distilled": "budget_distilled.pkl",
+    "content_knn": "content_knn_model.pkl",
+    "collab_knn": "collab_knn_model.pkl",
+    "tags": "multilabel_binarizer.pkl",
+}
+# analyzer settings the compact transform reproduces; anything else can't be exported
+_ANALYZER_DEFAULTS = {"analyzer": "word", "ngram_range": (1, 1), "strip_accents": None, "preprocessor": None,
+                      "tokenizer": None, "binary": False, "sublinear_tf": False}
+_FOREST_BLOCK = 1 << 21   # (row, tree, row term) triples per forest prediction block
+
+
+# --------- Serving Models ---------
+class CompactVectorizer:
+    """TfidfVectorizer / HashingVectorizer(+TF-IDF) transform from plain arrays."""
+
+    def __init__(self, spec, terms=None, idf=None):
+        self.spec = spec
+        self.n_features = spec["n_features"]
+        self.lowercase = spec["lowercase"]
+        self.token_re = re.compile(spec["token_pattern"])
+        self.stop_words = frozenset(spec["stop_words"] or ())
+        self.vocabulary = None if terms is None else {t: i for i, t in enumerate(terms)}
+        self.idf = idf
+        self.norm = spec["norm"]
+        self._hasher = None
+
+    def _counts(self, texts):
+        if self.vocabulary is None:
+            if self._hasher is None:
+                from sklearn.feature_extraction.text import HashingVectorizer
+
+                self._hasher = HashingVectorizer(
+                    n_features=self.n_features, lowercase=self.lowercase,
+                    token_pattern=self.spec["token_pattern"],
+                    stop_words=sorted(self.stop_words) or None, alternate_sign=False, norm=None,
+                )
+            return sp.csr_matrix(self._hasher.transform(texts), dtype=np.float64)
+
+        indptr, indices, data = [0], [], []
+        for text in texts:
+            counts = {}
+            for token in self.token_re.findall(text.lower() if self.lowercase else text):
+                if token in self.stop_words:
+                    continue
+                j = self.vocabulary.get(token)
+                if j is not None:
+                    counts[j] = counts.get(j, 0) + 1
+            for j in sorted(counts):
+                indices.append(j)
+                data.append(counts[j])
+            indptr.append(len(indices))
+        return sp.csr_matrix(
+            (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+            shape=(len(texts), self.n_features),
+        )
+
+    def transform(self, texts):
+        X = self._counts(list(texts))
+        if self.idf is not None:
+            X.data *= self.idf[X.indices]
+        if self.norm == "l2" and X.nnz:
+            sq = np.add.reduceat(X.data ** 2, X.indptr[:-1][np.diff(X.indptr) > 0])
+            norms = np.zeros(X.shape[0])
+            norms[np.diff(X.indptr) > 0] = np.sqrt(sq)
+            X.data /= np.repeat(np.where(norms > 0, norms, 1.0), np.diff(X.indptr))
+        return X
+
+
+class CompactNaiveBayes:
+    """make_pipeline(vectorizer, MultinomialNB()).predict from arrays."""
+
+    def __init__(self, vectorizer, log_prob, log_prior, classes):
+        self.vectorizer = vectorizer
+        self.log_prob = log_prob
+        self.log_prior = log_prior
+        self.classes = np.asarray(classes, dtype=object)
+
+    def predict(self, texts):
+        return self.predict_features(self.vectorizer.transform(texts))
+
+    def predict_features(self, X):
+        """Predict from rows `self.vectorizer` already produced."""
+        jll = np.asarray(X @ self.log_prob.T) + self.log_prior
+        return self.classes[jll.argmax(axis=1)]
+
+
+class CompactForest:
+    """RandomForestRegressor.predict over flat node arrays of all trees.
+
+    Nodes are laid out so that the child a feature value of 0 leads to is the
+    next node, which makes every run of "feature is 0" decisions a contiguous
+    chain ending at a leaf (`chain_end`). TF-IDF rows are almost all zeros, so
+    a query only stops at the nodes that test one of its own terms: every
+    internal node is also listed by (feature, node id) (`term_keys`), and one
+    binary search per row term finds the next such node of the chain, however
+    far ahead (the trees are hundreds of levels deep). `other` is the child
+    for the remaining values; leaves have feature -1. All rows and trees
+    advance together, so a batch costs a few numpy passes per decision level.
+    """
+
+    def __init__(self, roots, feature, threshold, other, chain_end, value):
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.other = other
+        self.chain_end = chain_end
+        self.value = value
+        self._term_keys = None
+
+    @property
+    def term_keys(self):
+        # feature * n_nodes + node for every internal node, sorted; built on first use
+        if self._term_keys is None:
+            internal = np.flatnonzero(np.asarray(self.feature) >= 0)
+            self._term_keys = np.sort(self.feature[internal].astype(np.int64) * len(self.feature) + internal)
+        return self._term_keys
+
+    def _predict_block(self, X):
+        # One state per (row, tree), one pair per (state, term of its row).
+        # Each step finds every pair's next node testing that term; the
+        # nearest one per state is decided exactly if it comes before the
+        # chain's leaf, else the state settles on that leaf.
+        keys, n_nodes = self.term_keys, len(self.feature)
+        n_rows, n_trees = X.shape[0], len(self.roots)
+        node = np.tile(np.asarray(self.roots, dtype=np.int64), n_rows)
+        row = np.repeat(np.arange(n_rows), n_trees)
+        leaf = np.empty(len(node), dtype=np.int64)
+        row_terms = np.diff(X.indptr)
+        data = X.data.astype(np.float32)  # the forest compares float32 values
+        active = np.flatnonzero(row_terms[row] > 0)
+        leaf[row_terms[row] == 0] = self.chain_end[node[row_terms[row] == 0]]
+        while len(active):
+            cur, r = node[active], row[active]
+            end = self.chain_end[cur].astype(np.int64)
+            counts = row_terms[r]
+            first = np.cumsum(counts) - counts
+            pair = np.repeat(X.indptr[r] - first, counts) + np.arange(counts.sum())
+            term = X.indices[pair].astype(np.int64) * n_nodes
+            pos = np.searchsorted(keys, term + np.repeat(cur, counts))
+            hit = keys[np.minimum(pos, len(keys) - 1)] - term
+            hit[(pos == len(keys)) | (hit >= n_nodes)] = n_nodes
+            nearest = np.minimum.reduceat(hit, first)
+            found = nearest < end
+            leaf[active[~found]] = end[~found]
+
+            won = hit == np.repeat(np.where(found, nearest, -1), counts)
+            j = nearest[found]
+            threshold = self.threshold[j]
+            zero_side = (data[pair[won]] <= threshold) == (0 <= threshold)
+            node[active[found]] = np.where(zero_side, j + 1, self.other[j])
+            active = active[found]
+        return self.value[leaf].reshape(n_rows, n_trees).astype(np.float64).mean(axis=1)
+
+    def predict(self, X):
+        X = sp.csr_matrix(X)
+        if not X.has_canonical_format:  # one pair per (row, term)
+            X = X.copy()
+            X.sum_duplicates()
+        if X.shape[0] == 0:
+            return np.empty(0)
+        per_row = len(self.roots) * max(X.nnz / X.shape[0], 1)
+        step = max(1, int(_FOREST_BLOCK // per_row))
+        return np.concatenate([self._predict_block(X[i:i + step]) for i in range(0, X.shape[0], step)])
+
+
+def _chain_layout(tree):
+    # Preorder with each node's zero-side child visited first, so it lands
+    # right after its parent. Returns (order, zero side is left per node).
+    left, right, threshold = tree.children_left, tree.children_right, tree.threshold
+    zero_left = 0 <= threshold
+    order, stack = [], [0]
+    while stack:
+        n = stack.pop()
+        order.append(n)
+        if left[n] >= 0:
+            zero, other = (left[n], right[n]) if zero_left[n] else (right[n], left[n])
+            stack.append(other)
+            stack.append(zero)
+    return np.asarray(order), zero_left
+
+
+class CompactLinear:
+    """Linear regression (e.g. SGDRegressor) as one sparse dot product."""
+
+    def __init__(self, coef, intercept):
+        self.coef = coef
+        self.intercept = intercept
+
+    def predict(self, X):
+        return np.asarray(sp.csr_matrix(X) @ self.coef, dtype=np.float64).ravel() + self.intercept
+
+
+# --------- Export ---------
+def _vectorizer_spec(vectorizer):
+    # -> (spec, terms or None, idf or None) for a TfidfVectorizer or a
+    # Pipeline(HashingVectorizer, TfidfTransformer) / bare HashingVectorizer
+    steps = [step for _, step in vectorizer.steps] if hasattr(vectorizer, "steps") else [vectorizer]
+    analyzer, transformer = steps[0], (steps[1] if len(steps) > 1 else None)
+    params = analyzer.get_params()
+    unsupported = {k: params[k] for k, v in _ANALYZER_DEFAULTS.items() if k in params and params[k] != v}
+    if unsupported:
+        raise ValueError(f"Cannot export a vectorizer with non-default settings: {unsupported}")
+
+    stop = analyzer.get_stop_words()
+    spec = {
+        "lowercase": bool(params["lowercase"]),
+        "token_pattern": params["token_pattern"],
+        "stop_words": sorted(stop) if stop else None,
+    }
+    if hasattr(analyzer, "vocabulary_"):
+        terms = np.empty(len(analyzer.vocabulary_), dtype=object)
+        for term, j in analyzer.vocabulary_.items():
+            terms[j] = term
+        spec.update(kind="vocabulary", n_features=len(terms), norm=params["norm"])
+        idf = analyzer.idf_ if getattr(analyzer, "use_idf", False) else None
+        return spec, terms, idf
+    spec.update(kind="hashing", n_features=params["n_features"],
+                norm=transformer.norm if transformer is not None else params["norm"])
+    idf = transformer.idf_ if transformer is not None and transformer.use_idf else None
+    return spec, None, idf
+
+
+def _save_csr(path, matrix):
+    m = sp.csr_matrix(matrix)
+    m = sp.csr_matrix((m.data.astype(np.float32), m.indices.astype(np.int32), m.indptr.astype(np.int32)),
+                      shape=m.shape)
+    sp.save_npz(path, m, compressed=False)
+
+
+def export_compact(models_dir="models", out_dir=COMPACT_DIR, force=False):
+    """Write the compact copy of the pickles in models_dir; False if it was already current."""
+    import joblib
+
+    sources = {name: os.path.join(models_dir, filename) for name, filename in SOURCES.items()}
+    fingerprints = {path: file_fingerprint(path) for path in sources.values()}
+    meta = read_manifest(out_dir)
+    if not force and meta is not None and meta["sources"] == fingerprints:
+        return False
+    out_dir = os.path.normpath(out_dir)
+    staged = out_dir + ".tmp"
+    shutil.rmtree(staged, ignore_errors=True)
+    os.makedirs(staged)
+
+    def put(name, array):
+        np.save(os.path.join(staged, f"{name}.npy"), np.ascontiguousarray(array))
+
+    def put_vectorizer(prefix, vectorizer):
+        spec, terms, idf = _vectorizer_spec(vectorizer)
+        if terms is not None:
+            put(f"{prefix}_terms", np.frombuffer("\n".join(terms).encode("utf-8"), dtype=np.uint8))
+        if idf is not None:
+            put(f"{prefix}_idf", np.asarray(idf, dtype=np.float64))
+        spec["has_idf"] = idf is not None
+        return spec
+
+    def put_regressor(prefix, model):
+        if not hasattr(model, "estimators_"):
+            put(f"{prefix}_coef", np.asarray(model.coef_, dtype=np.float32).ravel())
+            return {"type": "linear", "intercept": float(np.ravel(model.intercept_)[0])}
+        parts, offset = [], 0
+        for est in model.estimators_:
+            tree = est.tree_
+            order, zero_left = _chain_layout(tree)
+            new_id = np.empty(len(order), dtype=np.int64)
+            new_id[order] = np.arange(len(order))
+            internal = tree.children_left[order] >= 0
+            other = np.where(zero_left[order], tree.children_right[order], tree.children_left[order])
+            leaves = np.flatnonzero(~internal)
+            parts.append({
+                "feature": np.where(internal, tree.feature[order], -1),
+                "threshold": tree.threshold[order],
+                "other": np.where(internal, new_id[np.maximum(other, 0)] + offset, -1),
+                "chain_end": leaves[np.searchsorted(leaves, np.arange(len(order)))] + offset,
+                "value": tree.value[order, 0, 0],
+            })
+            offset += len(order)
+        put(f"{prefix}_roots", np.cumsum([0] + [len(p["value"]) for p in parts[:-1]]).astype(np.int64))
+        put(f"{prefix}_feature", np.concatenate([p["feature"] for p in parts]).astype(np.int32))
+        put(f"{prefix}_threshold", np.concatenate([p["threshold"] for p in parts]))
+        put(f"{prefix}_other", np.concatenate([p["other"] for p in parts]).astype(np.int32))
+        put(f"{prefix}_chain_end", np.concatenate([p["chain_end"] for p in parts]).astype(np.int32))
+        put(f"{prefix}_value", np.concatenate([p["value"] for p in parts]).astype(np.float32))
+        return {"type": "forest", "trees": len(parts), "nodes": offset}
+
+    manifest = {"format_version": FORMAT_VERSION, "sources": fingerprints}
+    vectorizer = joblib.load(sources["vectorizer"])
+    manifest["vectorizer"] = put_vectorizer("vectorizer", vectorizer)
+
+    mood = joblib.load(sources["mood_model"])
+    nb = mood.steps[-1][1]
+    mood_vectorizer = mood.steps[0][1] if len(mood.steps) == 2 else mood[:-1]
+    manifest["mood_model"] = {
+        # trained on the shared vocabulary: reuse the main vectorizer's arrays
+        "vectorizer": "shared" if joblib.hash(mood_vectorizer) == joblib.hash(vectorizer)
+        else put_vectorizer("mood", mood_vectorizer),
+        "classes": [str(c) for c in nb.classes_],
+    }
+    put("mood_log_prob", nb.feature_log_prob_)
+    put("mood_log_prior", nb.class_log_prior_)
+
+    manifest["budget_model"] = put_regressor("budget", joblib.load(sources["budget_model"]))
+    if os.path.exists(sources["budget_distilled"]):
+        manifest["budget_distilled"] = put_regressor("distilled", joblib.load(sources["budget_distilled"]))
+
+    # Not used for serving: kept so the fitted matrices survive without pickles
+    for name in ("content_knn", "collab_knn"):
+        if os.path.exists(sources[name]):
+            _save_csr(os.path.join(staged, f"{name}_matrix.npz"), joblib.load(sources[name])._fit_X)
+    if os.path.exists(sources["tags"]):
+        tags = [str(t) for t in joblib.load(sources["tags"]).classes_]
+        put("tags_terms", np.frombuffer("\n".join(tags).encode("utf-8"), dtype=np.uint8))
+
+    # manifest.json goes last: a directory without it is incomplete
+    with open(os.path.join(staged, "manifest.json"), "w") as fh:
+        json.dump(manifest, fh, indent=1)
+    replace_dir(staged, out_dir)
+    return True
+
+
+# --------- Load ---------
+def read_manifest(out_dir=COMPACT_DIR):
+    try:
+        with open(os.path.join(out_dir, "manifest.json")) as fh:
+            meta = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("format_version") == FORMAT_VERSION else None
+
+
+def compact_status(out_dir=COMPACT_DIR):
+    """"missing", "stale" (a pickle changed since the export) or "fresh".
+
+    Pickles that are not there don't make the export stale, so a deployment
+    can ship models/compact alone.
+    """
+    meta = read_manifest(out_dir)
+    if meta is None:
+        return "missing"
+    for path, fingerprint in meta["sources"].items():
+        current = file_fingerprint(path)
+        if current is not None and current != fingerprint:
+            return "stale"
+    return "fresh"
+
+
+def load_compact(out_dir=COMPACT_DIR, mmap=True, budget_model="forest"):
+    """(vectorizer, mood_model, budget_model) with the same predict/transform calls as the pickles.
+
+    budget_model="distilled" picks the linear model distilled from the
+    forest when the export has one (see train_models.py).
+    """
+    meta = read_manifest(out_dir)
+    if meta is None:
+        raise FileNotFoundError(f"No compact models in {out_dir}; run python train_models.py --export")
+    mode = "r" if mmap else None
+
+    def get(name):
+        return np.load(os.path.join(out_dir, f"{name}.npy"), mmap_mode=mode)
+
+    def get_vectorizer(prefix, spec):
+        terms = bytes(get(f"{prefix}_terms")).decode("utf-8").split("\n") if spec["kind"] == "vocabulary" else None
+        return CompactVectorizer(spec, terms, get(f"{prefix}_idf") if spec["has_idf"] else None)
+
+    def get_regressor(prefix, spec):
+        if spec["type"] == "forest":
+            return CompactForest(get(f"{prefix}_roots"), get(f"{prefix}_feature"), get(f"{prefix}_threshold"),
+                                 get(f"{prefix}_other"), get(f"{prefix}_chain_end"), get(f"{prefix}_value"))
+        return CompactLinear(get(f"{prefix}_coef"), spec["intercept"])
+
+    vectorizer = get_vectorizer("vectorizer", meta["vectorizer"])
+    mood = meta["mood_model"]
+    mood_vectorizer = vectorizer if mood["vectorizer"] == "shared" else get_vectorizer("mood", mood["vectorizer"])
+    mood_model = CompactNaiveBayes(mood_vectorizer, get("mood_log_prob"), get("mood_log_prior"), mood["classes"])
+    if budget_model == "distilled" and "budget_distilled" in meta:
+        budget = get_regressor("distilled", meta["budget_distilled"])
+    else:
+        budget = get_regressor("budget", meta["budget_model"])
+    return vectorizer, mood_model, budget
+
+
+def load_matrix(name, out_dir=COMPACT_DIR):
+    """An exported KNN matrix ("content_knn" or "collab_knn") as CSR."""
+    return sp.load_npz(os.path.join(out_dir, f"{name}_matrix.npz"))
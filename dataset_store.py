@@ -0,0 +1,238 @@
+# dataset_store.py
+# Typed, columnar, memory-mappable copy of the place catalogue.
+#
+# `python dataset_store.py` reads cleaned_tourism_dataset.csv once (same
+# cleaning as the runtime), vectorizes the descriptions and writes a directory
+# of .npy files: coordinates, numeric columns, category codes, UTF-8 text
+# blobs with offsets, the TF-IDF matrix in CSR parts, its row norms, the
+# spatial grid, each place's nearest food places (for lunch stops), the
+# semantic search index (ann_index.py) and the sparse tag matrix behind
+# similar places, with its transpose (tag_index.py). The runtime maps those
+# files instead of parsing the CSV, so load time and resident memory no
+# longer grow with the catalogue; only the pages a request touches are read.
+# meta.json records the source files' size/mtime so a stale store falls back
+# to the CSV.
+#
+# A rebuild never writes into the live directory: running engines may have
+# its files mapped, and truncating a mapped file crashes them (SIGBUS) or
+# hands them zeros. The new store is written next to it and swapped in by
+# renaming directories (replace_dir); the old files are unlinked, which
+# leaves existing mappings intact until those engines are dropped.
+#
+# place_category is stored as a column like any other: taken from the CSV
+# when it has one, else derived by backendLogic.read_dataset from the stock
+# CSV's layout. The source CSV itself is never modified.
+
+import json
+import os
+import shutil
+
+import numpy as np
+import scipy.sparse as sp
+
+from ann_index import ImpactIndex
+from place_index import CategoryColumn, PlaceIndex
+from spatial_index import GridIndex
+from tag_index import TagIndex
+
+STORE_DIR = os.path.join("data", "places")
+FORMAT_VERSION = 4
+
+
+def file_fingerprint(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def replace_dir(staged, target):
+    """Put the finished directory staged in place of target by renaming, never by rewriting files."""
+    old = f"{target}.old.{os.getpid()}"
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(target):
+        os.rename(target, old)
+    os.rename(staged, target)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+class TextColumn:
+    """Strings stored as one UTF-8 blob plus (n + 1) offsets, decoded on access."""
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def from_values(cls, values):
+        encoded = [str(v).encode("utf-8") for v in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, positions):
+        starts, stops = self.offsets[positions], self.offsets[np.asarray(positions) + 1]
+        return np.array(
+            [bytes(self.blob[a:b]).decode("utf-8") for a, b in zip(starts, stops)],
+            dtype=object,
+        )
+
+
+# --------- Write ---------
+def save_place_index(index, out_dir=STORE_DIR, sources=None):
+    out_dir = os.path.normpath(out_dir)
+    staged = out_dir + ".tmp"
+    shutil.rmtree(staged, ignore_errors=True)
+    os.makedirs(staged)
+
+    def put(name, array):
+        np.save(os.path.join(staged, f"{name}.npy"), np.ascontiguousarray(array))
+
+    columns, text_arrays = [], {}
+    for name, values in index.columns.items():
+        if name in ("lat", "lng"):
+            columns.append({"name": name, "kind": "coord", "axis": 0 if name == "lat" else 1})
+        elif isinstance(values, CategoryColumn):
+            put(f"col_{name}", values.codes)
+            columns.append({"name": name, "kind": "category", "categories": list(values.categories)})
+        elif isinstance(values, np.ndarray) and values.dtype.kind in "fiub":
+            put(f"col_{name}", values)
+            columns.append({"name": name, "kind": "numeric"})
+        else:
+            strings = np.asarray(values[np.arange(len(index))], dtype=object)
+            alias = next((other for other, s in text_arrays.items() if np.array_equal(s, strings)), None)
+            if alias is not None:
+                # e.g. "combined" is a copy of "description"
+                columns.append({"name": name, "kind": "alias", "of": alias})
+                continue
+            text = TextColumn.from_values(strings)
+            put(f"text_{name}", text.blob)
+            put(f"offsets_{name}", text.offsets)
+            text_arrays[name] = strings
+            columns.append({"name": name, "kind": "text"})
+
+    put("coords", np.asarray(index.coords, dtype=np.float64))
+    put("norms", index.norms)
+
+    matrix = index.matrix
+    index_dtype = np.int32 if matrix.nnz < np.iinfo(np.int32).max else np.int64
+    put("tfidf_data", matrix.data)
+    put("tfidf_indices", matrix.indices.astype(index_dtype))
+    put("tfidf_indptr", matrix.indptr.astype(index_dtype))
+
+    put("grid_keys", index.spatial.keys)
+    put("grid_positions", index.spatial.positions)
+
+    food_positions, food_km = index.food_neighbors
+    put("food_neighbors", food_positions)
+    put("food_neighbor_km", food_km)
+
+    semantic = index.semantic_index
+    put("semantic_indptr", semantic.indptr)
+    put("semantic_positions", semantic.positions)
+    put("semantic_impacts", semantic.impacts)
+
+    tags = index.tag_index
+    for name, m in (("tags", tags.matrix), ("tags_inverted", tags.inverted)):
+        put(f"{name}_data", m.data)
+        put(f"{name}_indices", m.indices)
+        put(f"{name}_indptr", m.indptr)
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "rows": len(index),
+        "n_features": matrix.shape[1],
+        "n_tags": tags.n_tags,
+        "columns": columns,
+        "grid_cell_deg": index.spatial.cell_deg,
+        "sources": {path: file_fingerprint(path) for path in (sources or [])},
+    }
+    # meta.json goes last: a store without it is incomplete
+    with open(os.path.join(staged, "meta.json"), "w") as fh:
+        json.dump(meta, fh, indent=2)
+    replace_dir(staged, out_dir)
+
+
+# --------- Read ---------
+def read_meta(store_dir=STORE_DIR):
+    try:
+        with open(os.path.join(store_dir, "meta.json")) as fh:
+            meta = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("format_version") == FORMAT_VERSION else None
+
+
+def store_status(store_dir=STORE_DIR):
+    """"missing", "stale" (a source file changed since the build) or "fresh".
+
+    Sources that no longer exist don't make the store stale, so a deployment
+    can ship the store without the CSV.
+    """
+    meta = read_meta(store_dir)
+    if meta is None:
+        return "missing"
+    for path, fingerprint in meta["sources"].items():
+        current = file_fingerprint(path)
+        if current is not None and current != fingerprint:
+            return "stale"
+    return "fresh"
+
+
+def load_place_index(store_dir=STORE_DIR, mmap=True):
+    meta = read_meta(store_dir)
+    if meta is None:
+        raise FileNotFoundError(f"No dataset store in {store_dir}; run python dataset_store.py")
+    mode = "r" if mmap else None
+
+    def get(name):
+        return np.load(os.path.join(store_dir, f"{name}.npy"), mmap_mode=mode)
+
+    coords = get("coords")
+    columns = {}
+    for col in meta["columns"]:
+        name, kind = col["name"], col["kind"]
+        if kind == "coord":
+            columns[name] = coords[:, col["axis"]]
+        elif kind == "category":
+            columns[name] = CategoryColumn(get(f"col_{name}"), col["categories"])
+        elif kind == "numeric":
+            columns[name] = get(f"col_{name}")
+        elif kind == "text":
+            columns[name] = TextColumn(get(f"text_{name}"), get(f"offsets_{name}"))
+        elif kind == "alias":
+            columns[name] = columns[col["of"]]
+
+    matrix = sp.csr_matrix(
+        (get("tfidf_data"), get("tfidf_indices"), get("tfidf_indptr")),
+        shape=(meta["rows"], meta["n_features"]),
+        copy=False,
+    )
+    spatial = GridIndex(coords, cell_deg=meta["grid_cell_deg"], keys=get("grid_keys"), positions=get("grid_positions"))
+    food_neighbors = (get("food_neighbors"), get("food_neighbor_km"))
+    semantic_index = ImpactIndex(get("semantic_indptr"), get("semantic_positions"), get("semantic_impacts"),
+                                 meta["rows"])
+    tags, tags_inverted = (
+        sp.csr_matrix((get(f"{name}_data"), get(f"{name}_indices"), get(f"{name}_indptr")), shape=shape, copy=False)
+        for name, shape in (("tags", (meta["rows"], meta["n_tags"])), ("tags_inverted", (meta["n_tags"], meta["rows"])))
+    )
+    return PlaceIndex(columns, matrix, coords, norms=get("norms"), spatial=spatial, food_neighbors=food_neighbors,
+                      semantic_index=semantic_index, tag_index=TagIndex(tags, tags_inverted))
+
+
+def build(store_dir=STORE_DIR):
+    import joblib
+    from backendLogic import DATA_PATH, VECTORIZER_PATH, build_place_index
+
+    _, index = build_place_index(DATA_PATH, joblib.load(VECTORIZER_PATH))
+    save_place_index(index, store_dir, sources=[DATA_PATH, VECTORIZER_PATH])
+    return index
+
+
+if __name__ == "__main__":
+    index = build()
+    print(f"Dataset store with {len(index)} places written to {STORE_DIR}")
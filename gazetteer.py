@@ -0,0 +1,163 @@
+# gazetteer.py
+# Offline place-name lookup built from the tourism dataset.
+#
+# Every address in cleaned_tourism_dataset.csv ends in "..., locality, city,
+# state PIN, India". The trailing components are collected, keyed the same
+# way as geocoding queries, and each name gets the median lat/lng of the
+# places that mention it, plus its usual level (state, city or locality).
+# Lookups are a dict hit for exact names, a bisect over the sorted names for
+# prefixes and difflib for typos.
+#
+# Only an exact city- or state-level name is trusted ahead of the network
+# (lookup(..., approximate=False)). Locality names repeat across cities and
+# a prefix or typo match can land on the wrong one ("delhi" -> "delhi
+# darwaja", Ahmedabad), so geocoding.py uses those only when the network
+# has no answer or is off.
+#
+# Build once with `python gazetteer.py`; geocoding.py picks the file up.
+
+import bisect
+import difflib
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from geocoding import normalize_query
+
+DATA_PATH = "cleaned_tourism_dataset.csv"
+GAZETTEER_PATH = os.path.join("models", "gazetteer.npz")
+TAIL_PARTS = 3      # address components kept, counted from the end (country dropped)
+MIN_PLACES = 3      # a name must appear in this many addresses
+MIN_PREFIX_LEN = 4
+FUZZY_CUTOFF = 0.85
+COUNTRIES = {"india"}
+PIN_PATTERN = re.compile(r"\b\d{6}\b")
+STATE_LEVEL, CITY_LEVEL, LOCALITY_LEVEL = 0, 1, 2  # position from the end of the address
+
+
+def address_localities(address, tail_parts=TAIL_PARTS):
+    # Only the PIN code goes; other numbers tell localities apart ("sector 17")
+    parts = []
+    for part in str(address).split(","):
+        part = normalize_query(PIN_PATTERN.sub(" ", part))
+        if part and not part.isdigit():
+            parts.append(part)
+    while parts and parts[-1] in COUNTRIES:
+        parts.pop()
+    return parts[-tail_parts:]
+
+
+class Gazetteer:
+    def __init__(self, names, lat, lng, counts, levels=None):
+        order = np.argsort(np.asarray(names, dtype=str), kind="stable")
+        self.names = [str(names[i]) for i in order]
+        self.lat = np.asarray(lat, dtype=np.float64)[order]
+        self.lng = np.asarray(lng, dtype=np.float64)[order]
+        self.counts = np.asarray(counts, dtype=np.int32)[order]
+        if levels is None:  # files from before levels were kept: trust no name ahead of the network
+            levels = np.full(len(self.names), LOCALITY_LEVEL)
+        self.levels = np.asarray(levels, dtype=np.int8)[order]
+        self._positions = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    # --------- Build / persist ---------
+    @classmethod
+    def from_frame(cls, df, min_places=MIN_PLACES, tail_parts=TAIL_PARTS):
+        df = df[(df["lat"] != 0) & (df["lng"] != 0)]
+        rows = []
+        for address, lat, lng in zip(df["address"], df["lat"], df["lng"]):
+            parts = address_localities(address, tail_parts)
+            seen = set()
+            for level, name in enumerate(reversed(parts)):
+                if name not in seen:
+                    seen.add(name)
+                    rows.append((name, lat, lng, min(level, LOCALITY_LEVEL)))
+        if not rows:
+            return cls([], [], [], [])
+        table = pd.DataFrame(rows, columns=["name", "lat", "lng", "level"])
+        grouped = table.groupby("name").agg(lat=("lat", "median"), lng=("lng", "median"), count=("lat", "size"),
+                                            level=("level", lambda s: s.mode().min()))
+        grouped = grouped[grouped["count"] >= min_places]
+        return cls(grouped.index.to_numpy(), grouped["lat"], grouped["lng"], grouped["count"], grouped["level"])
+
+    @classmethod
+    def from_csv(cls, path=DATA_PATH, **kwargs):
+        df = pd.read_csv(path, usecols=lambda c: c.strip() in ("address", "lat", "lng"))
+        df.columns = df.columns.str.strip()
+        df = df.dropna(subset=["lat", "lng"])
+        df["address"] = df["address"].fillna("")
+        return cls.from_frame(df, **kwargs)
+
+    def save(self, path=GAZETTEER_PATH):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        np.savez_compressed(path, names=np.array(self.names, dtype=str), lat=self.lat, lng=self.lng,
+                            counts=self.counts, levels=self.levels)
+
+    @classmethod
+    def load(cls, path=GAZETTEER_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            levels = data["levels"] if "levels" in data.files else None
+            return cls(data["names"], data["lat"], data["lng"], data["counts"], levels)
+
+    # --------- Lookup ---------
+    def _coords(self, i):
+        return float(self.lat[i]), float(self.lng[i])
+
+    def exact(self, key, max_level=LOCALITY_LEVEL):
+        i = self._positions.get(key)
+        return None if i is None or self.levels[i] > max_level else self._coords(i)
+
+    def prefix_matches(self, key):
+        # names sharing the prefix form one contiguous run of the sorted list
+        lo = bisect.bisect_left(self.names, key)
+        hi = bisect.bisect_left(self.names, key + "\U0010ffff")
+        return list(range(lo, hi))
+
+    def lookup(self, query, approximate=True):
+        """(lat, lng) for a query, or None.
+
+        approximate=False answers only exact city- or state-level names;
+        otherwise localities, prefixes and close spellings match too.
+        """
+        key = normalize_query(query)
+        if not key:
+            return None
+        candidates = [key]
+        head = key.split(",")[0].strip()
+        if head != key:
+            candidates.append(head)
+
+        for name in candidates:
+            coords = self.exact(name, LOCALITY_LEVEL if approximate else CITY_LEVEL)
+            if coords is not None:
+                return coords
+        if not approximate:
+            return None
+        for name in candidates:
+            if len(name) >= MIN_PREFIX_LEN:
+                matches = self.prefix_matches(name)
+                if matches:
+                    # the best-attested name wins ("ahmed" -> "ahmedabad")
+                    return self._coords(max(matches, key=lambda i: self.counts[i]))
+        for name in candidates:
+            close = difflib.get_close_matches(name, self.names, n=1, cutoff=FUZZY_CUTOFF)
+            if close:
+                return self.exact(close[0])
+        return None
+
+
+def build(data_path=DATA_PATH, out_path=GAZETTEER_PATH):
+    gazetteer = Gazetteer.from_csv(data_path)
+    gazetteer.save(out_path)
+    return gazetteer
+
+
+if __name__ == "__main__":
+    g = build()
+    print(f"Gazetteer with {len(g)} names saved to {GAZETTEER_PATH}")
@@ -0,0 +1,83 @@
+# geo_clustering.py
+# Weighted k-means over (lat, lng) points, used to split a multi-day trip's
+# candidates into one geographic group per day.
+#
+# Points are projected to a local equirectangular plane (longitude scaled by
+# cos(mean latitude)), which is accurate enough at city/region scale and keeps
+# every iteration a single (n, k) array pass: O(n * k) per iteration, never
+# O(n^2). Weights pull the centres towards high-scoring places.
+
+import numpy as np
+
+MAX_ITER = 50
+
+
+def _project(coords, lat0):
+    coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+    return np.column_stack([coords[:, 0], coords[:, 1] * np.cos(np.radians(lat0))])
+
+
+def _sq_dist(points, centers):
+    return ((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+
+
+def weighted_kmeans(coords, k, weights=None, max_iter=MAX_ITER, seed=0):
+    """(labels, centers) of k clusters; centers are (lat, lng).
+
+    Initialised with weighted k-means++ from a fixed seed, so the same input
+    always gives the same days. There are never more clusters than distinct
+    points. Clusters that empty out are re-seeded at the point farthest from
+    its centre, taken from a cluster that keeps at least one point.
+    """
+    coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+    n = len(coords)
+    if n == 0:
+        return np.empty(0, dtype=np.int64), np.empty((0, 2))
+    k = max(1, min(k, len(np.unique(coords, axis=0))))
+    w = np.ones(n) if weights is None else np.maximum(np.asarray(weights, dtype=float), 0) + 1e-9
+    lat0 = float(np.average(coords[:, 0], weights=w))
+    points = _project(coords, lat0)
+    rng = np.random.default_rng(seed)
+
+    centers = np.empty((k, 2))
+    centers[0] = points[rng.choice(n, p=w / w.sum())]
+    closest = _sq_dist(points, centers[:1])[:, 0]
+    for c in range(1, k):
+        p = w * closest
+        centers[c] = points[rng.choice(n, p=p / p.sum())] if p.sum() > 0 else points[rng.integers(n)]
+        closest = np.minimum(closest, _sq_dist(points, centers[c:c + 1])[:, 0])
+
+    labels = np.full(n, -1)
+    for _ in range(max_iter):
+        d = _sq_dist(points, centers)
+        new_labels = d.argmin(axis=1)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        sums = np.zeros((k, 2))
+        np.add.at(sums, labels, points * w[:, None])
+        totals = np.bincount(labels, weights=w, minlength=k)
+        sizes = np.bincount(labels, minlength=k)
+        spread = d[np.arange(n), labels]
+        for c in np.flatnonzero(sizes == 0):
+            movable = np.where(sizes[labels] > 1, spread, -np.inf)
+            far = int(movable.argmax())
+            old = labels[far]
+            sums[old] -= points[far] * w[far]
+            totals[old] -= w[far]
+            sizes[old] -= 1
+            labels[far] = c
+            sums[c], totals[c], sizes[c] = points[far] * w[far], w[far], 1
+        centers = sums / totals[:, None]
+
+    centers_latlng = np.column_stack([centers[:, 0], centers[:, 1] / np.cos(np.radians(lat0))])
+    return labels, centers_latlng
+
+
+def nearest_center(coords, centers):
+    """Index of the closest centre for every (lat, lng) point."""
+    coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+    if len(coords) == 0:
+        return np.empty(0, dtype=np.int64)
+    lat0 = float(np.mean(centers[:, 0]))
+    return _sq_dist(_project(coords, lat0), _project(centers, lat0)).argmin(axis=1)
@@ -0,0 +1,135 @@
+# geo_distance.py
+# Vectorized great-circle distances used by the recommender and itinerary builder.
+#
+# Two methods are available:
+#   "haversine"   - spherical model with the mean Earth radius. Fast (one array
+#                   pass). Relative error against the WGS-84 ellipsoid is below
+#                   0.56% for any pair of points, i.e. under 170 m at 30 km.
+#   "ellipsoidal" - Vincenty's inverse formula on WGS-84, iterated on the whole
+#                   array at once. Agrees with geopy's geodesic to well under a
+#                   millimetre. Nearly antipodal pairs that do not converge fall
+#                   back to haversine.
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+WGS84_A_KM = 6378.137
+WGS84_F = 1 / 298.257223563
+WGS84_B_KM = (1 - WGS84_F) * WGS84_A_KM
+
+METHODS = ("haversine", "ellipsoidal")
+
+
+# --------- Formulas (broadcasting over numpy arrays) ---------
+def haversine_km(lat1, lng1, lat2, lng2):
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = np.radians(lng2) - np.radians(lng1)
+    h = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+def vincenty_km(lat1, lng1, lat2, lng2, tol=1e-12, max_iter=200):
+    lat1, lng1, lat2, lng2 = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (lat1, lng1, lat2, lng2))
+    )
+    a, b, f = WGS84_A_KM, WGS84_B_KM, WGS84_F
+
+    L = np.radians(lng2 - lng1)
+    U1 = np.arctan((1 - f) * np.tan(np.radians(lat1)))
+    U2 = np.arctan((1 - f) * np.tan(np.radians(lat2)))
+    sinU1, cosU1 = np.sin(U1), np.cos(U1)
+    sinU2, cosU2 = np.sin(U2), np.cos(U2)
+
+    lmb = L.copy()
+    # Converged entries keep their lambda, so each result is independent of
+    # whatever else is in the array (batch and single queries agree exactly).
+    converged = np.zeros(L.shape, dtype=bool)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for _ in range(max_iter):
+            sin_lmb, cos_lmb = np.sin(lmb), np.cos(lmb)
+            sin_sigma = np.sqrt((cosU2 * sin_lmb) ** 2 + (cosU1 * sinU2 - sinU1 * cosU2 * cos_lmb) ** 2)
+            cos_sigma = sinU1 * sinU2 + cosU1 * cosU2 * cos_lmb
+            sigma = np.arctan2(sin_sigma, cos_sigma)
+            sin_alpha = np.where(sin_sigma == 0, 0.0, cosU1 * cosU2 * sin_lmb / sin_sigma)
+            cos2_alpha = 1 - sin_alpha ** 2
+            # equatorial lines have cos2_alpha == 0
+            cos_2sm = np.where(cos2_alpha == 0, 0.0, cos_sigma - 2 * sinU1 * sinU2 / cos2_alpha)
+            C = f / 16 * cos2_alpha * (4 + f * (4 - 3 * cos2_alpha))
+            lmb_next = L + (1 - C) * f * sin_alpha * (
+                sigma + C * sin_sigma * (cos_2sm + C * cos_sigma * (-1 + 2 * cos_2sm ** 2))
+            )
+            converged |= np.abs(lmb_next - lmb) < tol
+            if converged.all():
+                break
+            lmb = np.where(converged, lmb, lmb_next)
+
+        u2 = cos2_alpha * (a ** 2 - b ** 2) / b ** 2
+        A = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+        B = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+        delta_sigma = B * sin_sigma * (
+            cos_2sm + B / 4 * (
+                cos_sigma * (-1 + 2 * cos_2sm ** 2)
+                - B / 6 * cos_2sm * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2sm ** 2)
+            )
+        )
+        dist = b * A * (sigma - delta_sigma)
+
+    if not converged.all():
+        dist = np.where(converged, dist, haversine_km(lat1, lng1, lat2, lng2))
+    return dist
+
+
+_FORMULAS = {
+    "haversine": haversine_km,
+    "ellipsoidal": vincenty_km,
+}
+
+
+def _formula(method):
+    try:
+        return _FORMULAS[method]
+    except KeyError:
+        raise ValueError(f"Unknown distance method {method!r}, expected one of {METHODS}") from None
+
+
+# --------- Public helpers ---------
+def distances_km(origin, coords, method="haversine"):
+    """Distances in km from one (lat, lng) point to every row of an (n, 2) array."""
+    coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+    lat0, lng0 = float(origin[0]), float(origin[1])
+    return _formula(method)(lat0, lng0, coords[:, 0], coords[:, 1])
+
+
+def distance_matrix_km(origins, coords, method="haversine"):
+    """(len(origins), len(coords)) matrix of distances in km."""
+    origins = np.asarray(origins, dtype=float).reshape(-1, 2)
+    coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+    return _formula(method)(origins[:, :1], origins[:, 1:], coords[None, :, 0], coords[None, :, 1])
+
+
+def pairwise_km(points, method="haversine"):
+    """Symmetric (n, n) distance matrix between the rows of an (n, 2) array.
+
+    For haversine the points are mapped to unit vectors once and each entry is
+    2R * asin(chord / 2), the same great-circle distance (to ~1e-12 km) with
+    no trigonometry per pair, which is what dominates large matrices.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if method != "haversine":
+        return distance_matrix_km(points, points, method=method)
+
+    phi, lmb = np.radians(points[:, 0]), np.radians(points[:, 1])
+    xyz = (np.cos(phi) * np.cos(lmb), np.cos(phi) * np.sin(lmb), np.sin(phi))
+    chord = np.zeros((len(points), len(points)))
+    diff = np.empty_like(chord)
+    for axis in xyz:
+        np.subtract.outer(axis, axis, out=diff)
+        np.square(diff, out=diff)
+        chord += diff
+    np.sqrt(chord, out=chord)
+    chord *= 0.5
+    np.minimum(chord, 1.0, out=chord)
+    np.arcsin(chord, out=chord)
+    chord *= 2 * EARTH_RADIUS_KM
+    return chord
@@ -0,0 +1,195 @@
+# geocoding.py
+# Cached geocoding shared by app.py and backendLogic.
+#
+# Lookups go: in-memory LRU -> offline gazetteer, exact city names only
+# (gazetteer.py) -> SQLite store on disk -> network geocoder. When none of
+# them knows the query, or the network is off, the gazetteer's locality,
+# prefix and typo matches are the last resort.
+# Queries are normalized before keying, and "not found" answers are cached
+# too (with a shorter TTL) so typos don't hit Nominatim on every submit.
+# Any object with a geopy-style `geocode(query)` method can stand in for
+# Nominatim, e.g. in tests or offline runs.
+
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from cache_utils import LRUCache, MISSING
+
+CACHE_DB_PATH = os.path.join("cache", "geocode_cache.sqlite")
+USER_AGENT = "wanderwise_app"
+FOUND_TTL = 30 * 24 * 3600    # 30 days
+NOT_FOUND_TTL = 24 * 3600     # 1 day
+MEMORY_SIZE = 2048
+
+NOT_FOUND = None
+
+
+def normalize_query(text):
+    text = str(text).casefold()
+    text = re.sub(r"[^\w\s,]", " ", text)
+    text = re.sub(r"\s*,\s*", ", ", text)
+    return re.sub(r"\s+", " ", text).strip(" ,")
+
+
+def nominatim_geocoder():
+    from geopy.geocoders import Nominatim
+    return Nominatim(user_agent=USER_AGENT, timeout=10)
+
+
+class GeocodeCache:
+    def __init__(self, geocoder=None, db_path=CACHE_DB_PATH, memory_size=MEMORY_SIZE,
+                 found_ttl=FOUND_TTL, not_found_ttl=NOT_FOUND_TTL, clock=time.time, gazetteer=None):
+        self._geocoder = geocoder
+        self.gazetteer = gazetteer
+        self.db_path = db_path
+        self.found_ttl = found_ttl
+        self.not_found_ttl = not_found_ttl
+        self._clock = clock
+        self.memory = LRUCache(maxsize=memory_size, clock=clock)
+        self._lock = threading.Lock()
+        self.gazetteer_hits = 0
+        self.disk_hits = 0
+        self.network_calls = 0
+        self.negative_hits = 0
+        if db_path:
+            self._init_db()
+
+    @property
+    def geocoder(self):
+        if self._geocoder is None:
+            self._geocoder = nominatim_geocoder()
+        return self._geocoder
+
+    # --------- SQLite store ---------
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def _init_db(self):
+        folder = os.path.dirname(self.db_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocode ("
+                " query TEXT PRIMARY KEY, lat REAL, lng REAL, expires_at REAL NOT NULL)"
+            )
+
+    def _disk_get(self, key):
+        if not self.db_path:
+            return MISSING, None
+        with self._connect() as conn:
+            row = conn.execute("SELECT lat, lng, expires_at FROM geocode WHERE query = ?", (key,)).fetchone()
+        if row is None or row[2] <= self._clock():
+            return MISSING, None
+        coords = NOT_FOUND if row[0] is None else (row[0], row[1])
+        return coords, row[2]
+
+    def _disk_put(self, key, coords, expires_at):
+        if not self.db_path:
+            return
+        lat, lng = (None, None) if coords is NOT_FOUND else coords
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO geocode (query, lat, lng, expires_at) VALUES (?, ?, ?, ?)",
+                (key, lat, lng, expires_at),
+            )
+
+    # --------- Lookup ---------
+    def geocode(self, query, allow_network=True):
+        """(lat, lng) for the query, or None when the geocoder doesn't know it.
+
+        With allow_network=False a full miss returns None without asking the
+        geocoder (and without caching that answer).
+        """
+        key = normalize_query(query)
+        if not key:
+            return NOT_FOUND
+
+        coords = self.memory.get(key, MISSING)
+        if coords is MISSING:
+            coords = self._gazetteer_get(key, approximate=False)
+        if coords is MISSING:
+            coords, expires_at = self._disk_get(key)
+            if coords is not MISSING:
+                with self._lock:
+                    self.disk_hits += 1
+                self.memory.put(key, coords, ttl=expires_at - self._clock())
+            elif allow_network:
+                coords = self._lookup(key)
+            else:
+                return self._gazetteer_get(key, approximate=True, default=NOT_FOUND)
+        if coords is NOT_FOUND:
+            with self._lock:
+                self.negative_hits += 1
+            return self._gazetteer_get(key, approximate=True, default=NOT_FOUND)
+        return coords
+
+    def _gazetteer_get(self, key, approximate, default=MISSING):
+        coords = None if self.gazetteer is None else self.gazetteer.lookup(key, approximate=approximate)
+        if coords is None:
+            return default
+        with self._lock:
+            self.gazetteer_hits += 1
+        return coords
+
+    def _lookup(self, key):
+        with self._lock:
+            self.network_calls += 1
+        # Errors (timeouts, rate limits) propagate and are not cached
+        loc = self.geocoder.geocode(key)
+        coords = NOT_FOUND if loc is None else (float(loc.latitude), float(loc.longitude))
+        ttl = self.not_found_ttl if coords is NOT_FOUND else self.found_ttl
+        self.memory.put(key, coords, ttl=ttl)
+        self._disk_put(key, coords, self._clock() + ttl)
+        return coords
+
+    def stats(self):
+        mem = self.memory.stats()
+        lookups = mem["hits"] + mem["misses"]
+        return {
+            "lookups": lookups,
+            "memory_hits": mem["hits"],
+            "gazetteer_hits": self.gazetteer_hits,
+            "disk_hits": self.disk_hits,
+            "network_calls": self.network_calls,
+            "negative_hits": self.negative_hits,
+            "hit_rate": (mem["hits"] + self.gazetteer_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory": mem,
+        }
+
+
+# --------- Shared instance ---------
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def load_default_gazetteer():
+    # Prefer the built artifact, else index the dataset in memory, else go without
+    from gazetteer import Gazetteer, GAZETTEER_PATH, DATA_PATH
+
+    if os.path.exists(GAZETTEER_PATH):
+        return Gazetteer.load(GAZETTEER_PATH)
+    if os.path.exists(DATA_PATH):
+        return Gazetteer.from_csv(DATA_PATH)
+    return None
+
+
+def get_geocode_cache():
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = GeocodeCache(gazetteer=load_default_gazetteer())
+    return _default_cache
+
+
+def set_geocode_cache(cache):
+    global _default_cache
+    _default_cache = cache
+
+
+def geocode(query):
+    return get_geocode_cache().geocode(query)
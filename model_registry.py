@@ -0,0 +1,215 @@
+# model_registry.py
+# Versioned, checksummed snapshots of the serving models.
+#
+# train_models.py publishes every training run here: the serving artifacts
+# in models/ (vectorizer, mood and budget models, the distilled budget model
+# and models/compact when it is fresh) are copied into an immutable
+# models/registry/vNNNN/ directory, and manifest.json records each version's
+# files with their SHA-256 and the training stage keys (models/stages.json).
+# The manifest also names the "active" version and the one before it
+# ("previous").
+#
+#   python model_registry.py                  list versions
+#   python model_registry.py publish          snapshot models/ and activate it
+#   python model_registry.py activate v0003   serve another version
+#   python model_registry.py rollback         back to the previous version
+#   python model_registry.py verify [v0003]   recheck the checksums
+#
+# Running processes poll the manifest (backendLogic.MODEL_RELOAD) and load a
+# newly activated version in the background, so deploying a model needs no
+# restart. Versions are never modified once written, which also means a
+# process that memory-maps a version's compact arrays can't have them
+# rewritten underneath it by the next export.
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+
+REGISTRY_DIR = os.path.join("models", "registry")
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+ARTIFACTS = ("tfidf_vectorizer.pkl", "mood_classifier.pkl", "budget_predictor.pkl", "budget_distilled.pkl")
+REQUIRED = ("tfidf_vectorizer.pkl", "mood_classifier.pkl", "budget_predictor.pkl")
+KEEP_VERSIONS = 5  # older versions are deleted on publish, except the active and previous ones
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _tree_checksums(root):
+    # {path relative to root: sha256} of every file under root
+    checksums = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            checksums[os.path.relpath(path, root).replace(os.sep, "/")] = file_sha256(path)
+    return dict(sorted(checksums.items()))
+
+
+# --------- Manifest ---------
+def read_registry(registry_dir=REGISTRY_DIR):
+    """The registry manifest, or None when nothing was published yet."""
+    try:
+        with open(os.path.join(registry_dir, MANIFEST)) as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("format_version") == FORMAT_VERSION else None
+
+
+def _write_registry(manifest, registry_dir):
+    # Readers poll this file: replace it in one step, never rewrite it in place
+    path = os.path.join(registry_dir, MANIFEST)
+    with open(path + ".tmp", "w") as fh:
+        json.dump(manifest, fh, indent=1)
+    os.replace(path + ".tmp", path)
+
+
+def active_version(registry_dir=REGISTRY_DIR):
+    manifest = read_registry(registry_dir)
+    return None if manifest is None else manifest["active"]
+
+
+def version_dir(version, registry_dir=REGISTRY_DIR):
+    return os.path.join(registry_dir, version)
+
+
+def version_info(version, registry_dir=REGISTRY_DIR):
+    manifest = read_registry(registry_dir)
+    if manifest is None or version not in manifest["versions"]:
+        raise KeyError(f"Unknown model version {version!r} in {registry_dir}")
+    return manifest["versions"][version]
+
+
+# --------- Publish ---------
+def publish(models_dir="models", registry_dir=REGISTRY_DIR, activate=True):
+    """Snapshot the serving models in models_dir; returns (version, created).
+
+    Publishing the same files as the newest version creates nothing and
+    returns that version (activating it if asked).
+    """
+    from compact_models import COMPACT_DIR, compact_status
+
+    missing = [f for f in REQUIRED if not os.path.exists(os.path.join(models_dir, f))]
+    if missing:
+        raise FileNotFoundError(f"Cannot publish models, missing: {', '.join(missing)}")
+    compact_dir = os.path.join(models_dir, os.path.relpath(COMPACT_DIR, "models"))
+    files = [f for f in ARTIFACTS if os.path.exists(os.path.join(models_dir, f))]
+    with_compact = compact_status(compact_dir) == "fresh"
+    checksums = {f: file_sha256(os.path.join(models_dir, f)) for f in files}
+    if with_compact:
+        checksums.update({f"compact/{name}": digest for name, digest in _tree_checksums(compact_dir).items()})
+
+    os.makedirs(registry_dir, exist_ok=True)
+    manifest = read_registry(registry_dir) or {"format_version": FORMAT_VERSION, "active": None,
+                                               "previous": None, "versions": {}}
+    latest = max(manifest["versions"], default=None)
+    if latest is not None and manifest["versions"][latest]["files"] == checksums:
+        if activate:
+            _set_active(manifest, latest)
+            _write_registry(manifest, registry_dir)
+        return latest, False
+
+    version = f"v{int(latest[1:]) + 1 if latest else 1:04d}"
+    tmp = version_dir(version, registry_dir) + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for f in files:
+        shutil.copy2(os.path.join(models_dir, f), os.path.join(tmp, f))
+    if with_compact:
+        shutil.copytree(compact_dir, os.path.join(tmp, "compact"))
+    # the copies, not the sources, are what gets served: check them
+    copied = _tree_checksums(tmp)
+    if copied != checksums:
+        shutil.rmtree(tmp)
+        raise RuntimeError(f"Model files changed while publishing {version}; retry")
+    os.replace(tmp, version_dir(version, registry_dir))
+
+    stages = {}
+    if os.path.exists(os.path.join(models_dir, "stages.json")):
+        with open(os.path.join(models_dir, "stages.json")) as fh:
+            stages = {name: key[:16] for name, key in json.load(fh).items() if name in files}
+    manifest["versions"][version] = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "files": checksums,
+        "stages": stages,
+    }
+    if activate:
+        _set_active(manifest, version)
+    _prune(manifest, registry_dir)
+    _write_registry(manifest, registry_dir)
+    return version, True
+
+
+def _set_active(manifest, version):
+    if manifest["active"] != version:
+        manifest["previous"] = manifest["active"]
+        manifest["active"] = version
+
+
+def _prune(manifest, registry_dir):
+    keep = set(sorted(manifest["versions"])[-KEEP_VERSIONS:]) | {manifest["active"], manifest["previous"]}
+    for version in [v for v in manifest["versions"] if v not in keep]:
+        del manifest["versions"][version]
+        shutil.rmtree(version_dir(version, registry_dir), ignore_errors=True)
+
+
+# --------- Activate / Rollback ---------
+def activate(version, registry_dir=REGISTRY_DIR):
+    manifest = read_registry(registry_dir)
+    if manifest is None or version not in manifest["versions"]:
+        raise KeyError(f"Unknown model version {version!r} in {registry_dir}")
+    verify(version, registry_dir)
+    _set_active(manifest, version)
+    _write_registry(manifest, registry_dir)
+    return version
+
+
+def rollback(registry_dir=REGISTRY_DIR):
+    """Make the previous version active again; returns it."""
+    manifest = read_registry(registry_dir)
+    if manifest is None or manifest["previous"] is None:
+        raise RuntimeError("No previous model version to roll back to")
+    return activate(manifest["previous"], registry_dir)
+
+
+def verify(version, registry_dir=REGISTRY_DIR):
+    """Raise ValueError unless the version's files match their checksums."""
+    expected = version_info(version, registry_dir)["files"]
+    actual = _tree_checksums(version_dir(version, registry_dir))
+    bad = sorted(name for name in expected.keys() | actual.keys() if expected.get(name) != actual.get(name))
+    if bad:
+        raise ValueError(f"Model version {version} is corrupt: {', '.join(bad)}")
+    return version
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "list"
+    if command == "publish":
+        version, created = publish()
+        print(f"{'Published' if created else 'Unchanged, active'}: {version}")
+    elif command == "activate":
+        print(f"Active: {activate(sys.argv[2])}")
+    elif command == "rollback":
+        print(f"Rolled back to {rollback()}")
+    elif command == "verify":
+        print(f"{verify(sys.argv[2] if len(sys.argv) > 2 else active_version())} OK")
+    elif command == "list":
+        manifest = read_registry()
+        if manifest is None:
+            print(f"No model versions in {REGISTRY_DIR}; run python train_models.py")
+        else:
+            for version, info in sorted(manifest["versions"].items()):
+                mark = "*" if version == manifest["active"] else "-" if version == manifest["previous"] else " "
+                compact = "compact" if any(f.startswith("compact/") for f in info["files"]) else "pickle"
+                print(f"{mark} {version}  {info['created']}  {len(info['files'])} files ({compact})")
+    else:
+        sys.exit(f"Unknown command {command!r}; expected publish, activate, rollback, verify or list")
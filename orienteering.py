@@ -0,0 +1,235 @@
+# orienteering.py
+# Score-maximizing route selection under a time budget (the orienteering
+# problem) for the itinerary builder.
+#
+# Node 0 is the start; the route is an open path (no return leg). Every node
+# j has a score and a stay time, and travel[i, j] is the travel time between
+# nodes in the same unit as the budget. The solver:
+#   1. builds a route by cheapest-ratio insertion (score gained per hour added),
+#   2. shortens it with 2-opt, which frees time,
+#   3. inserts more nodes into the freed time and tries 1-for-1 swaps that
+#      raise the score,
+# and repeats 2-3 until nothing improves or the wall-clock deadline passes.
+# Step 1 always runs to completion, so even a zero deadline returns the full
+# greedy route; every later intermediate route is feasible too, so a
+# deadline hit returns a valid (if less optimized) plan. Insertion and swap
+# moves are scored for all candidates at once with numpy, so a step costs
+# O(route length x candidates).
+#
+# min_travel_route answers the opposite question, for a fixed number of
+# stops: which ones, in which order, need the least travel. It inserts the
+# stop adding the least travel until it has enough, then repeats the same
+# 2-opt, swaps that shorten the path and refills until nothing improves.
+
+import time
+
+import numpy as np
+
+DEFAULT_DEADLINE_S = 0.25
+_EPS = 1e-9
+# Added to every score when ranking insertions, so zero-score places still
+# fill spare time (cheapest first) while any real score difference dominates
+_BASE_VALUE = 1e-6
+
+
+def route_duration(route, travel, stay, start=0):
+    """Travel plus stay time of visiting `route` in order, starting at `start`."""
+    if not route:
+        return 0.0
+    path = [start, *route]
+    return float(travel[path[:-1], path[1:]].sum() + stay[route].sum())
+
+
+def path_travel(route, travel, start=0):
+    """Travel time alone (no stays) of visiting `route` in order from `start`."""
+    if not route:
+        return 0.0
+    path = [start, *route]
+    return float(travel[path[:-1], path[1:]].sum())
+
+
+def _insertion_costs(route, travel, stay, candidates, start):
+    # (len(route) + 1, n_candidates) extra time of inserting each candidate
+    # before route[p] (p < len(route)) or after the last stop (p == len(route))
+    prev = np.array([start, *route])
+    cost = travel[prev[:, None], candidates[None, :]] + stay[candidates][None, :]
+    if route:
+        nxt = np.array(route)
+        cost[:-1] += travel[candidates[None, :], nxt[:, None]] - travel[prev[:-1], nxt][:, None]
+    return cost
+
+
+def _insert(route, used, travel, stay, scores, budget, start, deadline):
+    """Greedy ratio insertion until no candidate fits (or `deadline`, unless None). Returns the new duration."""
+    duration = route_duration(route, travel, stay, start)
+    while deadline is None or time.perf_counter() < deadline:
+        candidates = np.flatnonzero(~used)
+        if len(candidates) == 0:
+            break
+        cost = _insertion_costs(route, travel, stay, candidates, start)
+        best_pos = cost.argmin(axis=0)
+        best_cost = cost[best_pos, np.arange(len(candidates))]
+        fits = duration + best_cost <= budget + _EPS
+        if not fits.any():
+            break
+        ratio = np.where(fits, (scores[candidates] + _BASE_VALUE) / np.maximum(best_cost, _EPS), -np.inf)
+        c = int(ratio.argmax())
+        node = int(candidates[c])
+        route.insert(int(best_pos[c]), node)
+        used[node] = True
+        duration += float(best_cost[c])
+    return duration
+
+
+def _two_opt(route, travel, stay, start, deadline):
+    """Reverse segments while that shortens the open path; stays are unaffected."""
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        path = [start, *route]
+        for i in range(1, len(path) - 1):
+            a, b = path[i - 1], path[i]
+            for k in range(i + 1, len(path)):
+                c = path[k]
+                d = path[k + 1] if k + 1 < len(path) else None
+                before = travel[a, b] + (travel[c, d] if d is not None else 0.0)
+                after = travel[a, c] + (travel[b, d] if d is not None else 0.0)
+                # reversed segments only matter on asymmetric matrices
+                inner = path[i:k + 1]
+                before += travel[inner[:-1], inner[1:]].sum()
+                after += travel[inner[:0:-1], inner[-2::-1]].sum()
+                if after < before - _EPS:
+                    path[i:k + 1] = path[i:k + 1][::-1]
+                    improved = True
+                    break
+            if improved:
+                break
+        route[:] = path[1:]
+
+
+def _swap(route, used, travel, stay, scores, budget, start):
+    """Replace one route node with a higher-scoring unused one if it still fits."""
+    candidates = np.flatnonzero(~used)
+    if not route or len(candidates) == 0:
+        return False
+    duration = route_duration(route, travel, stay, start)
+    best = None
+    for p, node in enumerate(route):
+        rest = route[:p] + route[p + 1:]
+        removed = duration - route_duration(rest, travel, stay, start)
+        # cost of putting each candidate back exactly where `node` was
+        cost = _insertion_costs(rest, travel, stay, candidates, start)[p]
+        gain = scores[candidates] - scores[node]
+        ok = (duration - removed + cost <= budget + _EPS) & (gain > _EPS)
+        if ok.any():
+            c = int(np.where(ok, gain, -np.inf).argmax())
+            if best is None or gain[c] > best[0]:
+                best = (float(gain[c]), p, int(candidates[c]))
+    if best is None:
+        return False
+    _, p, new = best
+    used[route[p]] = False
+    used[new] = True
+    route[p] = new
+    return True
+
+
+def solve_orienteering(travel, stay, scores, budget, start=0, deadline_s=DEFAULT_DEADLINE_S):
+    """Route (list of node ids, start excluded) maximizing total score within `budget`.
+
+    `travel` is an (n, n) matrix, `stay` and `scores` are length-n arrays; the
+    start node is never visited. `deadline_s` bounds the wall-clock time spent
+    improving the route; the initial greedy construction always completes.
+    """
+    deadline = time.perf_counter() + deadline_s
+    travel = np.asarray(travel, dtype=float)
+    stay = np.asarray(stay, dtype=float)
+    scores = np.asarray(scores, dtype=float)
+
+    used = np.zeros(len(scores), dtype=bool)
+    used[start] = True
+    used[stay > budget] = True  # can never fit
+    route = []
+    _insert(route, used, travel, stay, scores, budget, start, None)
+
+    while time.perf_counter() < deadline:
+        before = (scores[route].sum(), route_duration(route, travel, stay, start))
+        _two_opt(route, travel, stay, start, deadline)
+        _insert(route, used, travel, stay, scores, budget, start, deadline)
+        swapped = _swap(route, used, travel, stay, scores, budget, start)
+        after = (scores[route].sum(), route_duration(route, travel, stay, start))
+        if not swapped and after[0] <= before[0] + _EPS and after[1] >= before[1] - _EPS:
+            break
+    return route
+
+
+def _shorten(route, used, travel, stay, budget, start):
+    """Replace one route node with an unused one if that shortens the path and still fits."""
+    candidates = np.flatnonzero(~used)
+    if not route or len(candidates) == 0:
+        return False
+    length = path_travel(route, travel, start)
+    best = None
+    for p in range(len(route)):
+        rest = route[:p] + route[p + 1:]
+        # cost of putting each candidate exactly where route[p] was
+        cost = _insertion_costs(rest, travel, stay, candidates, start)[p]
+        fits = route_duration(rest, travel, stay, start) + cost <= budget + _EPS
+        saved = length - (path_travel(rest, travel, start) + cost - stay[candidates])
+        ok = fits & (saved > _EPS)
+        if ok.any():
+            c = int(np.where(ok, saved, -np.inf).argmax())
+            if best is None or saved[c] > best[0]:
+                best = (float(saved[c]), p, int(candidates[c]))
+    if best is None:
+        return False
+    _, p, new = best
+    used[route[p]] = False
+    used[new] = True
+    route[p] = new
+    return True
+
+
+def _fill(route, used, travel, stay, budget, start, stops):
+    """Insert the node adding the least travel, wherever it fits, until the route has `stops` nodes."""
+    duration = route_duration(route, travel, stay, start)
+    while len(route) < stops:
+        candidates = np.flatnonzero(~used)
+        if len(candidates) == 0:
+            break
+        cost = _insertion_costs(route, travel, stay, candidates, start)
+        added = np.where(duration + cost <= budget + _EPS, cost - stay[candidates][None, :], np.inf)
+        pos, c = np.unravel_index(int(added.argmin()), added.shape)
+        if not np.isfinite(added[pos, c]):
+            break
+        node = int(candidates[c])
+        route.insert(int(pos), node)
+        used[node] = True
+        duration += float(cost[pos, c])
+
+
+def min_travel_route(travel, stay, stops, budget, start=0, deadline_s=DEFAULT_DEADLINE_S):
+    """Route of at most `stops` nodes (start excluded) with the least travel that fits `budget`.
+
+    Same inputs as solve_orienteering, without scores. The cheapest-insertion
+    construction always completes; `deadline_s` bounds the time spent
+    shortening it.
+    """
+    deadline = time.perf_counter() + deadline_s
+    travel = np.asarray(travel, dtype=float)
+    stay = np.asarray(stay, dtype=float)
+
+    used = np.zeros(len(stay), dtype=bool)
+    used[start] = True
+    used[stay > budget] = True
+    route = []
+    _fill(route, used, travel, stay, budget, start, stops)
+
+    while time.perf_counter() < deadline:
+        before = (len(route), path_travel(route, travel, start))
+        _two_opt(route, travel, stay, start, deadline)
+        shortened = _shorten(route, used, travel, stay, budget, start)
+        _fill(route, used, travel, stay, budget, start, stops)
+        if not shortened and (len(route), path_travel(route, travel, start)) == before:
+            break
+    return route
@@ -0,0 +1,230 @@
+# place_index.py
+# Row-aligned view of the place catalogue: the place columns, their TF-IDF
+# rows, L2 norms, coordinates, category codes, the radius index and the tag
+# index (tag_index.py) all share the same integer positions, so a request
+# only ever slices precomputed rows.
+#
+# Columns are plain array-likes indexed by position, so the same index works
+# over an in-memory DataFrame or over memory-mapped files (dataset_store.py).
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from geo_distance import EARTH_RADIUS_KM
+from spatial_index import GridIndex
+from topk import top_k
+
+FOOD_NEIGHBORS = 8       # nearest food places kept per place
+FOOD_NEIGHBOR_KM = 5.0   # ...within this great-circle distance
+
+
+def row_norms(matrix):
+    # Row-by-row L2 norms; used for places and queries alike so both round the same way
+    m = sp.csr_matrix(matrix)
+    return np.sqrt(np.asarray(m.multiply(m).sum(axis=1)).ravel())
+
+
+class CategoryColumn:
+    """Category names stored as small integer codes."""
+
+    def __init__(self, codes, categories):
+        self.codes = codes
+        self.categories = tuple(categories)
+        self._names = np.array(self.categories, dtype=object)
+
+    @classmethod
+    def from_values(cls, values):
+        categories, codes = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+        return cls(codes.astype(np.int16), categories.tolist())
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, positions):
+        return self._names[self.codes[positions]]
+
+
+class PlaceIndex:
+    def __init__(self, columns, matrix, coords, norms=None, spatial=None, food_neighbors=None,
+                 semantic_index=None, tag_index=None):
+        n = len(coords)
+        if matrix.shape[0] != n:
+            raise ValueError(f"TF-IDF matrix has {matrix.shape[0]} rows but the place table has {n}")
+        for name, values in columns.items():
+            if len(values) != n:
+                raise ValueError(f"Column {name!r} has {len(values)} rows but the place table has {n}")
+
+        self.columns = dict(columns)
+        self.matrix = matrix if sp.isspmatrix_csr(matrix) else sp.csr_matrix(matrix)
+        self.coords = coords
+        self.norms = row_norms(self.matrix) if norms is None else norms
+
+        category = self.columns["place_category"]
+        self.categories = category.categories
+        self.category_codes = category.codes
+
+        ratings = self.columns["rating"]
+        if not (isinstance(ratings, np.ndarray) and ratings.dtype.kind in "fiu"):
+            ratings = pd.to_numeric(pd.Series(ratings), errors="coerce").fillna(0).to_numpy(dtype=float)
+        self.ratings = ratings
+
+        if spatial is None:
+            valid = np.flatnonzero((coords[:, 0] != 0) & (coords[:, 1] != 0))
+            spatial = GridIndex(coords, positions=valid)
+        self.spatial = spatial
+        self._food_neighbors = food_neighbors
+        self._semantic_index = semantic_index
+        self._tag_index = tag_index
+        self._positions_by_name = None
+
+    @classmethod
+    def from_frame(cls, frame, matrix):
+        frame = frame.reset_index(drop=True)
+        columns = {}
+        for name in frame.columns:
+            if name == "place_category":
+                columns[name] = CategoryColumn.from_values(frame[name])
+            elif frame[name].dtype.kind in "fiub":
+                columns[name] = frame[name].to_numpy()
+            else:
+                columns[name] = frame[name].array
+        return cls(columns, matrix, frame[["lat", "lng"]].to_numpy(dtype=float))
+
+    def __len__(self):
+        return len(self.coords)
+
+    def category_code(self, name):
+        try:
+            return self.categories.index(name)
+        except ValueError:
+            raise ValueError(f"Unknown place category {name!r}, expected one of {self.categories}") from None
+
+    def within(self, origin, radius_km):
+        """Sorted positions of places with valid coordinates inside the radius."""
+        return self.spatial.query(origin, radius_km)
+
+    @property
+    def food_neighbors(self):
+        """(positions, km): for every place, its nearest food places, closest first.
+
+        Both arrays are (n, FOOD_NEIGHBORS); unused slots hold -1 / inf. Built
+        with the dataset store, or on first use when serving from the CSV.
+        """
+        if self._food_neighbors is None:
+            self._food_neighbors = nearest_of_category(self, "food")
+        return self._food_neighbors
+
+    @property
+    def semantic_index(self):
+        """ImpactIndex over the TF-IDF rows (ann_index.py); built with the store or on first use."""
+        if self._semantic_index is None:
+            from ann_index import ImpactIndex
+
+            self._semantic_index = ImpactIndex.build(self.matrix, self.norms)
+        return self._semantic_index
+
+    def semantic_top_k(self, query_vector, k, depth=None):
+        """(positions, cosine scores) of the k places most similar to the query, best first.
+
+        Candidates come from the semantic index (`depth` postings per query
+        term, see ann_index.py) and are then scored exactly.
+        """
+        from ann_index import DEPTH
+
+        positions = self.semantic_index.candidates(query_vector, DEPTH if depth is None else depth)
+        scores = self.cosine_scores(query_vector, positions)
+        best = top_k(scores, k)
+        return positions[best], scores[best]
+
+    @property
+    def tag_index(self):
+        """TagIndex over the descriptions (tag_index.py); built with the store or on first use."""
+        if self._tag_index is None:
+            from tag_index import TagIndex
+
+            self._tag_index = TagIndex.build(self.columns["description"][np.arange(len(self))])
+        return self._tag_index
+
+    def similar_places(self, position, k, category=None):
+        """(positions, cosine scores) of the k places whose descriptions share the most tags, best first."""
+        allowed = None if category is None else self.category_codes == self.category_code(category)
+        return self.tag_index.similar(position, k, allowed)
+
+    def position_of(self, name):
+        """Catalogue position of the first place called `name`; KeyError if there is none."""
+        if self._positions_by_name is None:
+            names = self.columns["name"][np.arange(len(self))]
+            self._positions_by_name = {}
+            for position, value in enumerate(names):
+                self._positions_by_name.setdefault(str(value), position)
+        return self._positions_by_name[name]
+
+    def cosine_scores(self, query_vector, positions):
+        """Cosine similarity of one (1, n_features) query row against the given places."""
+        return self.cosine_score_matrix(query_vector, positions)[:, 0]
+
+    def cosine_score_matrix(self, query_vectors, positions):
+        """(len(positions), n_queries) cosine similarities as one sparse product.
+
+        Every entry only depends on its own place and query row, so batched
+        and one-at-a-time calls agree exactly.
+        """
+        q = sp.csr_matrix(query_vectors)
+        dots = (self.matrix[positions] @ q.T).toarray()
+        denom = self.norms[positions][:, None] * row_norms(q)[None, :]
+        return np.divide(dots, denom, out=np.zeros_like(dots), where=denom > 0)
+
+    def rows(self, positions, extra_columns=None):
+        """Place rows at `positions` (indexed by catalogue position) plus optional extra columns.
+
+        Built column-wise in one DataFrame constructor call, which is far
+        cheaper than slicing the frame and assigning columns one by one.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        data = {name: values[positions] for name, values in self.columns.items()}
+        if extra_columns:
+            data.update(extra_columns)
+        return pd.DataFrame(data, index=positions)
+
+    def to_frame(self):
+        return self.rows(np.arange(len(self)))
+
+
+def _unit_vectors(coords):
+    phi, lmb = np.radians(coords[:, 0]), np.radians(coords[:, 1])
+    return np.column_stack([np.cos(phi) * np.cos(lmb), np.cos(phi) * np.sin(lmb), np.sin(phi)])
+
+
+def nearest_of_category(index, category, k=FOOD_NEIGHBORS, max_km=FOOD_NEIGHBOR_KM):
+    """(positions int32, km float32) of the k nearest `category` places to every place."""
+    from scipy.spatial import cKDTree
+
+    n = len(index)
+    positions = np.full((n, k), -1, dtype=np.int32)
+    km = np.full((n, k), np.inf, dtype=np.float32)
+    if category not in index.categories:
+        return positions, km
+    # only places the radius index knows about (valid coordinates)
+    valid = np.asarray(index.spatial.positions)
+    targets = valid[index.category_codes[valid] == index.category_code(category)]
+    if len(targets) == 0 or len(valid) == 0:
+        return positions, km
+
+    coords = np.asarray(index.coords, dtype=float)
+    tree = cKDTree(_unit_vectors(coords[targets]))
+    # one extra neighbour so a food place can drop itself
+    chord_limit = 2 * np.sin(max_km / (2 * EARTH_RADIUS_KM))
+    chord, found = tree.query(_unit_vectors(coords[valid]), k=k + 1, distance_upper_bound=chord_limit)
+    hit = found < len(targets)
+    found_pos = np.where(hit, targets[np.minimum(found, len(targets) - 1)], -1)
+    hit &= found_pos != valid[:, None]
+
+    # shift the hits of every row to the front, keeping their order
+    order = np.argsort(~hit, axis=1, kind="stable")[:, :k]
+    rows = np.arange(len(valid))[:, None]
+    keep = hit[rows, order]
+    positions[valid] = np.where(keep, found_pos[rows, order], -1)
+    dist = 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord[rows, order] / 2, 1.0))
+    km[valid] = np.where(keep, dist, np.inf)
+    return positions, km
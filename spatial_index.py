@@ -0,0 +1,104 @@
+# spatial_index.py
+# Radius prefilter over place coordinates.
+#
+# Places are bucketed into fixed lat/lng cells and kept sorted by cell key, so
+# the whole index is two flat arrays (keys, positions) that can be saved with
+# the dataset store and memory-mapped back. A radius query turns the bounding
+# box into one key range per cell row, slices them with searchsorted and
+# keeps the candidates whose haversine distance is inside the radius.
+
+import numpy as np
+
+from geo_distance import EARTH_RADIUS_KM, haversine_km
+
+CELL_DEG = 0.05  # ~5.5 km of latitude per cell row
+
+# The ellipsoidal distance can exceed the spherical one by up to ~0.56%, so
+# radius queries are padded to never drop a place the exact check would keep.
+RADIUS_PADDING = 1.006
+
+
+def _n_cols(cell_deg):
+    return int(np.ceil(360.0 / cell_deg))
+
+
+def cell_keys(lat, lng, cell_deg=CELL_DEG):
+    rows = np.floor((np.asarray(lat, dtype=float) + 90.0) / cell_deg).astype(np.int64)
+    cols = np.floor((np.asarray(lng, dtype=float) + 180.0) / cell_deg).astype(np.int64) % _n_cols(cell_deg)
+    return rows * _n_cols(cell_deg) + cols
+
+
+class GridIndex:
+    """Sorted-cell index over (lat, lng) rows.
+
+    `coords` is the full (n, 2) coordinate table; `positions` selects the rows
+    to index (default: all). `keys`/`positions` can be passed back in from a
+    previous `state()` to skip the build.
+    """
+
+    def __init__(self, coords, positions=None, cell_deg=CELL_DEG, keys=None):
+        self.coords = coords
+        self.cell_deg = cell_deg
+        if keys is None:
+            if positions is None:
+                positions = np.arange(len(coords))
+            positions = np.asarray(positions, dtype=np.int64)
+            keys = cell_keys(coords[positions, 0], coords[positions, 1], cell_deg)
+            order = np.argsort(keys, kind="stable")
+            keys, positions = keys[order], positions[order]
+        self.keys = keys
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def state(self):
+        return {"keys": self.keys, "positions": self.positions}
+
+    def _key_ranges(self, lat0, lng0, radius_km):
+        ang = radius_km / EARTH_RADIUS_KM
+        dlat = np.degrees(ang)
+        lat_lo, lat_hi = max(-90.0, lat0 - dlat), min(90.0, lat0 + dlat)
+        n_cols = _n_cols(self.cell_deg)
+        row_lo = int(np.floor((lat_lo + 90.0) / self.cell_deg))
+        row_hi = int(np.floor((lat_hi + 90.0) / self.cell_deg))
+
+        max_abs_lat = max(abs(lat_lo), abs(lat_hi))
+        if max_abs_lat >= 89.0 or ang >= np.pi / 2:
+            col_spans = [(0, n_cols - 1)]
+        else:
+            dlng = min(180.0, dlat / np.cos(np.radians(max_abs_lat)))
+            c_lo = int(np.floor((lng0 - dlng + 180.0) / self.cell_deg))
+            c_hi = int(np.floor((lng0 + dlng + 180.0) / self.cell_deg))
+            if c_hi - c_lo + 1 >= n_cols:
+                col_spans = [(0, n_cols - 1)]
+            elif c_lo < 0:
+                col_spans = [(0, c_hi), (c_lo + n_cols, n_cols - 1)]
+            elif c_hi >= n_cols:
+                col_spans = [(c_lo, n_cols - 1), (0, c_hi - n_cols)]
+            else:
+                col_spans = [(c_lo, c_hi)]
+
+        rows = np.arange(row_lo, row_hi + 1, dtype=np.int64) * n_cols
+        lo = np.concatenate([rows + a for a, _ in col_spans])
+        hi = np.concatenate([rows + b for _, b in col_spans])
+        return lo, hi
+
+    def query(self, origin, radius_km):
+        """Sorted table positions of every place within `radius_km` of `origin`."""
+        if len(self.positions) == 0 or radius_km < 0:
+            return np.empty(0, dtype=np.int64)
+        lat0, lng0 = float(origin[0]), float(origin[1])
+        radius_km = radius_km * RADIUS_PADDING
+
+        lo, hi = self._key_ranges(lat0, lng0, radius_km)
+        starts = np.searchsorted(self.keys, lo, side="left")
+        stops = np.searchsorted(self.keys, hi, side="right")
+        slices = [self.positions[a:b] for a, b in zip(starts, stops) if b > a]
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        candidates = np.concatenate(slices)
+
+        coords = self.coords[candidates]
+        inside = haversine_km(lat0, lng0, coords[:, 0], coords[:, 1]) <= radius_km
+        return np.sort(candidates[inside])
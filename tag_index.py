@@ -0,0 +1,91 @@
+# tag_index.py
+# Place-to-place similarity over description tags: the "collaborative" KNN
+# of train_models.py, kept sparse and usable at serving time.
+#
+# A place's tags are the words of its description. The place x tag matrix
+# is binary and mostly empty, so it is built as CSR. It used to come out of
+# a dense MultiLabelBinarizer, with one int64 column per distinct word in
+# the catalogue. The vocabulary is also pruned by document frequency:
+#   - a tag on fewer than TAG_MIN_DF places links no two places;
+#   - a tag on more than TAG_MAX_DF of them ("the", "and") links most pairs,
+#     tells them apart by little, and has the longest posting list.
+# Rows are scaled to unit length, so a dot product is the cosine similarity
+# of two places' kept tags. The same matrix is also kept transposed (tag ->
+# places, an inverted index), so similar() only reads the postings of one
+# place's tags and never the whole catalogue.
+
+import re
+
+import numpy as np
+import scipy.sparse as sp
+
+from topk import top_k
+
+TAG_PATTERN = re.compile(r"\b\w+\b")  # same words as train_models.prepare
+TAG_MIN_DF = 2      # places a tag must appear on to be kept
+TAG_MAX_DF = 0.5    # ...and the largest share of places it may appear on (benchmarks/bench_tag_matrix.py)
+
+
+def place_tags(text):
+    return TAG_PATTERN.findall(str(text).lower())
+
+
+def tag_matrix(tag_lists, min_df=TAG_MIN_DF, max_df=TAG_MAX_DF):
+    """(binary CSR place x tag matrix, sorted tag vocabulary) with rare and ubiquitous tags pruned."""
+    lengths = np.fromiter((len(tags) for tags in tag_lists), dtype=np.int64, count=len(tag_lists))
+    words = np.array([tag for tags in tag_lists for tag in tags], dtype=str)
+    vocabulary, columns = np.unique(words, return_inverse=True)
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+    matrix = sp.csr_matrix((np.ones(len(columns), dtype=np.float32), (rows, columns.ravel())),
+                           shape=(len(lengths), len(vocabulary)))
+    matrix.sum_duplicates()
+    matrix.data[:] = 1  # a tag counts once per place
+
+    doc_freq = np.bincount(matrix.indices, minlength=len(vocabulary))
+    keep = np.flatnonzero((doc_freq >= min_df) & (doc_freq <= max_df * len(lengths)))
+    return matrix[:, keep].tocsr(), vocabulary[keep]
+
+
+class TagIndex:
+    """Unit-length tag rows of every place (CSR) plus their transpose, for top-k similar places."""
+
+    def __init__(self, matrix, inverted):
+        self.matrix = matrix      # places x tags
+        self.inverted = inverted  # tags x places
+
+    @classmethod
+    def build(cls, texts, min_df=TAG_MIN_DF, max_df=TAG_MAX_DF):
+        binary, _ = tag_matrix([place_tags(t) for t in texts], min_df, max_df)
+        norms = np.sqrt(np.diff(binary.indptr)).astype(np.float32)
+        binary.data /= np.repeat(norms, np.diff(binary.indptr))
+        index_dtype = np.int32 if binary.nnz < np.iinfo(np.int32).max else np.int64
+        matrix = sp.csr_matrix((binary.data, binary.indices.astype(index_dtype), binary.indptr.astype(index_dtype)),
+                               shape=binary.shape)
+        inverted = matrix.T.tocsr()
+        inverted.indices = inverted.indices.astype(index_dtype)
+        inverted.indptr = inverted.indptr.astype(index_dtype)
+        return cls(matrix, inverted)
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    @property
+    def n_tags(self):
+        return self.matrix.shape[1]
+
+    def similar(self, position, k, allowed=None):
+        """(positions, cosine scores) of the k places sharing the most tags with `position`, best first.
+
+        The place itself is left out, as are places with no tag in common
+        and, when `allowed` (a boolean mask over places) is given, places
+        outside it.
+        """
+        scores = self.matrix[position] @ self.inverted
+        scores.sort_indices()  # ties go to the lower position
+        positions, values = scores.indices, scores.data
+        keep = (positions != position) & (values > 0)
+        if allowed is not None:
+            keep &= allowed[positions]
+        positions, values = positions[keep], values[keep]
+        best = top_k(values, k)
+        return positions[best].astype(np.int64), values[best]
@@ -0,0 +1,69 @@
+# tests/conftest.py
+# Shared fixtures: a small synthetic catalogue and models trained on it by
+# train_models.py, in a scratch directory laid out like the repo (the
+# modules resolve cleaned_tourism_dataset.csv and models/ from the working
+# directory).
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CENTER = (23.02, 72.57)
+
+
+def synthetic_catalogue(n=400, seed=0):
+    """Place table shaped like cleaned_tourism_dataset.csv, attractions first."""
+    rng = np.random.default_rng(seed)
+    vocab = np.array([f"w{i}" for i in range(300)])
+    p = 1.0 / np.arange(1, len(vocab) + 1)
+    return pd.DataFrame({
+        "name": [f"Place {i}" for i in range(n)],
+        "rating": np.round(rng.uniform(1, 5, n), 1),
+        "reviews": rng.integers(0, 5000, n),
+        "address": [f"{i % 97} Main Road, City{i % 7}, India" for i in range(n)],
+        "description": [" ".join(rng.choice(vocab, rng.integers(4, 12), p=p / p.sum())) for _ in range(n)],
+        "lat": CENTER[0] + rng.uniform(-0.3, 0.3, n),
+        "lng": CENTER[1] + rng.uniform(-0.3, 0.3, n),
+        "place_category": np.where(np.arange(n) < n // 2, "attraction", "food"),
+    })
+
+
+@pytest.fixture(scope="session")
+def trained_dir(tmp_path_factory):
+    """Directory with the catalogue CSV, trained pickles and their compact export."""
+    import train_models
+    from compact_models import export_compact
+
+    root = tmp_path_factory.mktemp("trained")
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        synthetic_catalogue().to_csv(train_models.DATA_PATH, index=False)
+        train_models.run_stages(train_models.full_stages(train_models.DATA_PATH, n_jobs=1), workers=1)
+        export_compact()
+    finally:
+        os.chdir(cwd)
+    return root
+
+
+@pytest.fixture
+def in_trained_dir(trained_dir, monkeypatch):
+    monkeypatch.chdir(trained_dir)
+    return trained_dir
+
+
+@pytest.fixture
+def backend(in_trained_dir, monkeypatch):
+    """backendLogic serving an engine loaded from the trained directory."""
+    import backendLogic
+
+    monkeypatch.setattr(backendLogic, "MODEL_RELOAD", "manual")
+    engine = backendLogic.RecommenderEngine(offline=True, use_store=False, use_registry=False).load()
+    previous = backendLogic._swap_engine(engine)
+    yield backendLogic
+    backendLogic._swap_engine(previous)
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from ann_index import ImpactIndex
+
+
+def tfidf_rows(n=2000, n_terms=300, seed=0):
+    rng = np.random.default_rng(seed)
+    matrix = sp.random(n, n_terms, density=0.03, random_state=seed, format="csr", dtype=np.float64)
+    matrix.data = rng.uniform(0.1, 1.0, matrix.nnz)
+    return matrix
+
+
+def exact_top(matrix, query, k):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    scores = (matrix @ query.T).toarray().ravel() / np.where(norms > 0, norms, 1)
+    positive = np.flatnonzero(scores > 0)
+    return positive[np.argsort(-scores[positive], kind="stable")][:k]
+
+
+def query(terms, n_terms=300):
+    return sp.csr_matrix((np.ones(len(terms)), ([0] * len(terms), terms)), shape=(1, n_terms))
+
+
+def test_postings_are_sorted_by_impact():
+    matrix = tfidf_rows()
+    index = ImpactIndex.build(matrix)
+    assert index.n_terms == 300 and index.n_places == 2000
+    unit = sp.diags(1 / np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())) @ matrix
+    unit = unit.tocsc()
+    for term in (0, 17, 299):
+        start, stop = index.indptr[term], index.indptr[term + 1]
+        impacts = index.impacts[start:stop]
+        assert (np.diff(impacts) <= 0).all()
+        np.testing.assert_allclose(impacts, unit[index.positions[start:stop], term].toarray().ravel(), rtol=1e-6)
+
+
+def test_one_word_queries_are_exact_within_the_depth():
+    matrix = tfidf_rows()
+    index = ImpactIndex.build(matrix)
+    for term in range(0, 300, 37):
+        candidates = index.candidates(query([term]), depth=20)
+        assert len(candidates) == min(20, matrix[:, term].nnz)
+        assert set(exact_top(matrix, query([term]), 20)) == set(candidates)
+
+
+@pytest.mark.parametrize("terms", [[3, 40], [5, 90, 210], [1, 2, 3, 4]])
+def test_deep_enough_searches_find_the_exact_top(terms):
+    matrix = tfidf_rows()
+    index = ImpactIndex.build(matrix)
+    expected = exact_top(matrix, query(terms), 10)
+    found = index.candidates(query(terms), depth=200)
+    assert np.isin(expected, found).all()
+    everything = index.candidates(query(terms), depth=None)
+    np.testing.assert_array_equal(everything, np.sort(exact_top(matrix, query(terms), len(matrix.indptr))))
+
+
+def test_queries_without_indexed_terms():
+    index = ImpactIndex.build(tfidf_rows(n_terms=300))
+    assert index.candidates(sp.csr_matrix((1, 300))).size == 0
+    assert index.candidates(sp.csr_matrix(([1.0], ([0], [400])), shape=(1, 500))).size == 0
+    assert index.candidates(query([5]) * -1).size == 0
+
+
+def test_given_norms_match_computed_ones():
+    matrix = tfidf_rows()
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    a, b = ImpactIndex.build(matrix), ImpactIndex.build(matrix, norms)
+    np.testing.assert_array_equal(a.positions, b.positions)
+    np.testing.assert_allclose(a.impacts, b.impacts)
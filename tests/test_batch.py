@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+from conftest import CENTER
+
+QUERIES = [
+    ((CENTER[0], CENTER[1]), ["w3"], 500, 8),
+    ((CENTER[0] + 0.1, CENTER[1] - 0.1), ["w5", "w17"], 300, 4),
+    ((CENTER[0], CENTER[1]), ["w5"], 100, 2),
+    ((CENTER[0] - 0.2, CENTER[1] + 0.2), ["w1"], 800, 6),
+    ((CENTER[0] + 5, CENTER[1] + 5), ["w3"], 500, 1),  # nothing in reach
+]
+
+
+@pytest.fixture(params=["compact", "pickle"])
+def backend(request, in_trained_dir, monkeypatch):
+    import backendLogic
+
+    monkeypatch.setattr(backendLogic, "MODEL_FORMAT", request.param)
+    monkeypatch.setattr(backendLogic, "MODEL_RELOAD", "manual")
+    engine = backendLogic.RecommenderEngine(offline=True, use_store=False, use_registry=False).load()
+    assert engine.model_format == request.param
+    previous = backendLogic._swap_engine(engine)
+    yield backendLogic
+    backendLogic._swap_engine(previous)
+
+
+def test_batch_matches_single_queries(backend):
+    batch = backend.recommend_places_batch(QUERIES)
+    assert len(batch) == len(QUERIES)
+    for (coords, moods, budget, time_hr), (tourist, food) in zip(QUERIES, batch):
+        backend.result_cache.clear()
+        single = backend.recommend_places("", location_coords=coords, moods=moods, budget=budget, time_hr=time_hr)
+        pd.testing.assert_frame_equal(tourist, single[0])
+        pd.testing.assert_frame_equal(food, single[1])
+    assert any(len(tourist) for tourist, _ in batch)
+    assert batch[-1][0].empty and batch[-1][1].empty
+
+
+def test_batch_predicts_missing_moods_and_budgets(backend):
+    query = {"user_text": "w3 w17 temple", "location_coords": CENTER, "time_hr": 6}
+    (tourist, food), = backend.recommend_places_batch([query])
+    single = backend.recommend_places(**query)
+    pd.testing.assert_frame_equal(tourist, single[0])
+    pd.testing.assert_frame_equal(food, single[1])
@@ -0,0 +1,57 @@
+import os
+import shutil
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from compact_models import load_compact
+
+TEXTS = ["w1 w2 w3", "w7 w40 w41 w250", "quiet temple garden", "", "W3, w3; w12 w299"]
+
+
+@pytest.fixture
+def pickles(in_trained_dir):
+    return {name: joblib.load(f"models/{name}.pkl")
+            for name in ("tfidf_vectorizer", "mood_classifier", "budget_predictor", "budget_distilled")}
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_vectorizer_and_mood_model_match_the_pickles(pickles, mmap):
+    vectorizer, mood_model, _ = load_compact(mmap=mmap)
+    expected = pickles["tfidf_vectorizer"].transform(TEXTS)
+    assert abs(vectorizer.transform(TEXTS) - expected).max() < 1e-12
+    assert list(mood_model.predict(TEXTS)) == list(pickles["mood_classifier"].predict(TEXTS))
+
+
+@pytest.mark.parametrize("budget_model, pickle_name", [("forest", "budget_predictor"),
+                                                        ("distilled", "budget_distilled")])
+def test_budget_models_match_the_pickles(pickles, budget_model, pickle_name):
+    _, _, compact = load_compact(budget_model=budget_model)
+    catalogue = pickles["tfidf_vectorizer"].transform(pd.read_csv("cleaned_tourism_dataset.csv")["description"])
+    for X in (pickles["tfidf_vectorizer"].transform(TEXTS), catalogue):
+        np.testing.assert_allclose(compact.predict(X), pickles[pickle_name].predict(X), rtol=1e-6, atol=1e-6)
+    for X in (catalogue[:1], catalogue[:0]):
+        assert compact.predict(X).shape == (X.shape[0],)
+
+
+def test_reexport_leaves_mapped_arrays_intact(in_trained_dir, tmp_path):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    from compact_models import export_compact
+
+    models_dir, out_dir = tmp_path / "models", str(tmp_path / "models" / "compact")
+    shutil.copytree("models", models_dir, ignore=shutil.ignore_patterns("compact", "registry"))
+    assert export_compact(str(models_dir), out_dir) is True
+    assert export_compact(str(models_dir), out_dir) is False
+    vectorizer, _, forest = load_compact(out_dir)
+    X = vectorizer.transform(TEXTS)
+    before = forest.predict(X)
+
+    joblib.dump(TfidfVectorizer().fit(TEXTS[2:]), models_dir / "tfidf_vectorizer.pkl")
+    assert export_compact(str(models_dir), out_dir) is True
+    assert abs(vectorizer.transform(TEXTS) - X).max() == 0
+    np.testing.assert_array_equal(forest.predict(X), before)
+    assert load_compact(out_dir)[0].transform(TEXTS).shape[1] == 6
+    assert not [p for p in os.listdir(models_dir) if p.startswith("compact.")]
@@ -0,0 +1,71 @@
+import os
+
+import joblib
+import numpy as np
+import pytest
+
+from conftest import synthetic_catalogue
+from dataset_store import load_place_index, save_place_index, store_status
+
+
+def build_index(tmp_path, n, seed, with_category=True):
+    from backendLogic import build_place_index
+
+    frame = synthetic_catalogue(n, seed)
+    if not with_category:
+        frame = frame.drop(columns="place_category")
+    path = str(tmp_path / f"places_{n}_{seed}.csv")
+    frame.to_csv(path, index=False)
+    return path, build_place_index(path, joblib.load("models/tfidf_vectorizer.pkl"))[1]
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_store_round_trip(in_trained_dir, tmp_path, mmap):
+    _, index = build_index(tmp_path, 300, 1)
+    store = str(tmp_path / "store")
+    save_place_index(index, store)
+    loaded = load_place_index(store, mmap=mmap)
+    assert len(loaded) == len(index)
+    assert abs(loaded.matrix - index.matrix).max() == 0
+    np.testing.assert_array_equal(loaded.norms, index.norms)
+    assert loaded.to_frame().equals(index.to_frame())
+
+
+def test_csv_without_categories_uses_the_legacy_layout(in_trained_dir, tmp_path):
+    from backendLogic import LEGACY_ATTRACTION_ROWS
+
+    path, index = build_index(tmp_path, 600, 2, with_category=False)
+    before = open(path, "rb").read()
+    store = str(tmp_path / "store")
+    save_place_index(index, store)
+    frame = load_place_index(store).to_frame()
+    assert (frame["place_category"][:LEGACY_ATTRACTION_ROWS] == "attraction").all()
+    assert (frame["place_category"][LEGACY_ATTRACTION_ROWS:] == "food").all()
+    assert open(path, "rb").read() == before
+
+
+def test_rebuild_leaves_mapped_stores_intact(in_trained_dir, tmp_path):
+    _, old = build_index(tmp_path, 300, 1)
+    _, new = build_index(tmp_path, 200, 3)
+    store = str(tmp_path / "store")
+    save_place_index(old, store)
+    live = load_place_index(store)
+    save_place_index(new, store)
+    np.testing.assert_array_equal(live.norms, old.norms)
+    np.testing.assert_array_equal(live.coords, old.coords)
+    assert live.to_frame().equals(old.to_frame())
+    assert len(load_place_index(store)) == len(new)
+    assert not [p for p in os.listdir(tmp_path) if p.startswith("store.")]  # no staging or old copies left
+
+
+def test_stale_when_a_source_changes(in_trained_dir, tmp_path):
+    path, index = build_index(tmp_path, 300, 1)
+    store = str(tmp_path / "store")
+    assert store_status(store) == "missing"
+    save_place_index(index, store, sources=[path])
+    assert store_status(store) == "fresh"
+    with open(path, "a") as fh:
+        fh.write("\n")
+    assert store_status(store) == "stale"
+    os.remove(path)
+    assert store_status(store) == "fresh"
@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+
+from gazetteer import CITY_LEVEL, LOCALITY_LEVEL, STATE_LEVEL, Gazetteer, address_localities
+from geocoding import GeocodeCache
+from test_geocoding import Clock, StandInGeocoder
+
+
+def places():
+    rows = []
+    for i in range(4):
+        rows.append((f"{i} Relief Road, Delhi Darwaja, Ahmedabad, Gujarat 380001, India", 23.03 + i * 0.001, 72.58))
+        rows.append((f"{i} CG Road, Navrangpura, Ahmedabad, Gujarat 380009, India", 23.04, 72.56 + i * 0.001))
+        rows.append((f"{i} Ring Road, Adajan, Surat, Gujarat 395009, India", 21.19, 72.79))
+        rows.append((f"{i} Janpath, Connaught Place, New Delhi, Delhi 110001, India", 28.63, 77.22))
+    rows.append(("Lone Lane, Nowhere Village, Ahmedabad, Gujarat 380001, India", 23.0, 72.5))
+    return pd.DataFrame(rows, columns=["address", "lat", "lng"])
+
+
+@pytest.fixture(scope="module")
+def gazetteer():
+    return Gazetteer.from_frame(places())
+
+
+def test_address_localities():
+    assert address_localities("Plot 12, Sector 17, Chandigarh, Chandigarh 160017, India") == \
+        ["sector 17", "chandigarh", "chandigarh"]
+    assert address_localities("Relief Road, Delhi Darwaja, Ahmedabad, Gujarat 380001, India", 2) == \
+        ["ahmedabad", "gujarat"]
+
+
+def test_names_get_levels_and_need_enough_places(gazetteer):
+    levels = dict(zip(gazetteer.names, gazetteer.levels))
+    assert levels["gujarat"] == STATE_LEVEL and levels["ahmedabad"] == CITY_LEVEL
+    assert levels["navrangpura"] == LOCALITY_LEVEL
+    assert "nowhere village" not in levels  # one address only
+    lat, lng = gazetteer.lookup("Ahmedabad")
+    assert 23.03 <= lat <= 23.04 and 72.56 <= lng <= 72.58
+
+
+def test_only_city_and_state_names_are_trusted_exactly(gazetteer):
+    assert gazetteer.lookup("ahmedabad", approximate=False) is not None
+    assert gazetteer.lookup("Navrangpura", approximate=False) is None
+    assert gazetteer.lookup("Navrangpura") == gazetteer.exact("navrangpura")
+
+
+def test_prefix_and_typo_matches(gazetteer):
+    assert gazetteer.lookup("Ahmed") == gazetteer.exact("ahmedabad")
+    assert gazetteer.lookup("Ahmedabd") == gazetteer.exact("ahmedabad")
+    assert gazetteer.lookup("Navrangpura, somewhere") == gazetteer.exact("navrangpura")
+    assert gazetteer.lookup("Atlantis") is None
+    assert gazetteer.lookup("Ahm") is None  # too short for a prefix
+
+
+def test_save_and_load(gazetteer, tmp_path):
+    path = str(tmp_path / "gazetteer.npz")
+    gazetteer.save(path)
+    loaded = Gazetteer.load(path)
+    assert loaded.names == gazetteer.names
+    assert (loaded.levels == gazetteer.levels).all()
+    assert loaded.lookup("Surat") == gazetteer.lookup("Surat")
+
+
+def test_geocode_cache_asks_the_network_before_trusting_a_locality(gazetteer):
+    geocoder = StandInGeocoder({"navrangpura": (1.0, 2.0)})
+    cache = GeocodeCache(geocoder, gazetteer=gazetteer, clock=Clock())
+    assert cache.geocode("Ahmedabad") == gazetteer.exact("ahmedabad")
+    assert geocoder.calls == []
+    assert cache.geocode("Navrangpura") == (1.0, 2.0)
+    offline = GeocodeCache(StandInGeocoder({}, fail=True), gazetteer=gazetteer, clock=Clock())
+    assert offline.geocode("Adajan", allow_network=False) == gazetteer.exact("adajan")
@@ -0,0 +1,101 @@
+import pytest
+
+from geocoding import GeocodeCache
+
+
+class Location:
+    def __init__(self, latitude, longitude):
+        self.latitude = latitude
+        self.longitude = longitude
+
+
+class StandInGeocoder:
+    """geopy-style geocoder answering from a dict and counting its calls."""
+
+    def __init__(self, places, fail=False):
+        self.places = places
+        self.fail = fail
+        self.calls = []
+
+    def geocode(self, query):
+        self.calls.append(query)
+        if self.fail:
+            raise TimeoutError("geocoder timed out")
+        coords = self.places.get(query)
+        return None if coords is None else Location(*coords)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def make_cache(geocoder, clock, db_path=None):
+    return GeocodeCache(geocoder, db_path=db_path, found_ttl=100, not_found_ttl=10, clock=clock)
+
+
+def test_found_answer_is_cached_and_normalized(clock):
+    geocoder = StandInGeocoder({"ahmedabad": (23.02, 72.57)})
+    cache = make_cache(geocoder, clock)
+    assert cache.geocode("Ahmedabad") == (23.02, 72.57)
+    assert cache.geocode("  AHMEDABAD!! ") == (23.02, 72.57)
+    assert geocoder.calls == ["ahmedabad"]
+
+
+def test_found_answer_expires_after_ttl(clock):
+    geocoder = StandInGeocoder({"pune": (18.52, 73.86)})
+    cache = make_cache(geocoder, clock)
+    cache.geocode("Pune")
+    clock.now += 99
+    cache.geocode("Pune")
+    assert len(geocoder.calls) == 1
+    clock.now += 2
+    cache.geocode("Pune")
+    assert len(geocoder.calls) == 2
+
+
+def test_not_found_is_cached_for_the_shorter_ttl(clock):
+    geocoder = StandInGeocoder({})
+    cache = make_cache(geocoder, clock)
+    assert cache.geocode("Atlantis") is None
+    assert cache.geocode("atlantis") is None
+    assert len(geocoder.calls) == 1
+    assert cache.stats()["negative_hits"] == 2
+    clock.now += 11
+    assert cache.geocode("Atlantis") is None
+    assert len(geocoder.calls) == 2
+
+
+def test_errors_are_not_cached(clock):
+    geocoder = StandInGeocoder({"jaipur": (26.91, 75.79)}, fail=True)
+    cache = make_cache(geocoder, clock)
+    with pytest.raises(TimeoutError):
+        cache.geocode("Jaipur")
+    geocoder.fail = False
+    assert cache.geocode("Jaipur") == (26.91, 75.79)
+    assert len(geocoder.calls) == 2
+
+
+def test_disk_store_survives_a_new_process(clock, tmp_path):
+    db_path = str(tmp_path / "geocode.sqlite")
+    make_cache(StandInGeocoder({"surat": (21.17, 72.83)}), clock, db_path).geocode("Surat")
+    offline = StandInGeocoder({}, fail=True)
+    cache = make_cache(offline, clock, db_path)
+    assert cache.geocode("Surat") == (21.17, 72.83)
+    assert offline.calls == [] and cache.stats()["disk_hits"] == 1
+
+
+def test_no_network_miss_is_not_cached(clock):
+    geocoder = StandInGeocoder({"delhi": (28.61, 77.21)})
+    cache = make_cache(geocoder, clock)
+    assert cache.geocode("Delhi", allow_network=False) is None
+    assert geocoder.calls == []
+    assert cache.geocode("Delhi") == (28.61, 77.21)
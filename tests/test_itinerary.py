@@ -0,0 +1,165 @@
+import time
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+import backendLogic
+from backendLogic import create_itinerary, create_itinerary_variants, plan_trip
+from conftest import CENTER, synthetic_catalogue
+from geo_distance import distances_km
+
+
+def frames(n_tourist=60, n_food=30, spread_deg=0.05, seed=0):
+    """Recommendation-shaped (tourist, food) frames around CENTER; no catalogue rows."""
+    rng = np.random.default_rng(seed)
+    places = synthetic_catalogue(n_tourist + n_food, seed).drop(columns="place_category")
+    places["lat"] = CENTER[0] + rng.uniform(-spread_deg, spread_deg, len(places))
+    places["lng"] = CENTER[1] + rng.uniform(-spread_deg, spread_deg, len(places))
+    places["name"] = [f"Stop {seed}-{i}" for i in range(len(places))]
+    places["final_score"] = rng.random(len(places))
+    places.index += 10_000
+    return places.iloc[:n_tourist], places.iloc[n_tourist:]
+
+
+def places(itinerary):
+    return [s["name"] for s in itinerary if s["type"] == "place"]
+
+
+def ends_in_time(itinerary, start_hour, hours):
+    if not itinerary:
+        return True
+    day_start = itinerary[0]["arrival"].replace(hour=start_hour, minute=0)
+    return all((s["arrival"] - day_start).total_seconds() / 3600 + s["stay_duration_hr"] <= hours + 1e-9
+               for s in itinerary)
+
+
+@pytest.fixture
+def recorded_deadlines(monkeypatch):
+    calls = []
+
+    def record(solver):
+        def wrapper(*args, deadline_s, **kwargs):
+            now = time.perf_counter()
+            calls.append((solver.__name__, now, now + deadline_s))
+            return solver(*args, deadline_s=deadline_s, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(backendLogic, "solve_orienteering", record(backendLogic.solve_orienteering))
+    monkeypatch.setattr(backendLogic, "min_travel_route", record(backendLogic.min_travel_route))
+    return calls
+
+
+def test_variants_share_one_deadline(recorded_deadlines):
+    tourist, food = frames()
+    variants = create_itinerary_variants(CENTER, tourist, food, total_time_hr=9, deadline_s=0.2,
+                                         variants=backendLogic.ITINERARY_VARIANTS)
+    assert variants
+    names, starts, untils = zip(*recorded_deadlines)
+    assert max(untils) <= min(starts) + 0.2 + 0.01  # allowances are handed out a few microseconds early
+    # best-match is solved once; shortest-walking reuses its stop count
+    assert names == ("solve_orienteering", "solve_orienteering", "min_travel_route", "solve_orienteering")
+
+
+def test_variants_fit_the_day_and_differ():
+    tourist, food = frames()
+    result = create_itinerary_variants(CENTER, tourist, food, total_time_hr=9, start_time="09:00",
+                                       variants=backendLogic.ITINERARY_VARIANTS)
+    for plan in result:
+        assert plan["variant"] in backendLogic.ITINERARY_VARIANTS
+        assert ends_in_time(plan["itinerary"], 9, 9)
+        assert len(set(places(plan["itinerary"]))) == len(places(plan["itinerary"]))
+    for i, a in enumerate(result):
+        for b in result[:i]:
+            assert not backendLogic._similar(a["itinerary"], b["itinerary"])
+
+
+def test_shortest_walking_keeps_the_best_match_stop_count():
+    tourist, food = frames(n_food=0)
+    plans = {p["variant"]: p["itinerary"] for p in create_itinerary_variants(
+        CENTER, tourist, food, total_time_hr=6, variants=("best-match", "shortest-walking"))}
+    best = places(plans["best-match"])
+    if "shortest-walking" in plans:
+        assert 0 < len(places(plans["shortest-walking"])) <= len(best)
+
+
+def test_unknown_variant():
+    tourist, food = frames(10, 5)
+    with pytest.raises(ValueError, match="Unknown itinerary variant 'scenic'"):
+        create_itinerary_variants(CENTER, tourist, food, variants=("scenic",))
+
+
+def total_score(itinerary, tourist):
+    scores = dict(zip(tourist["name"], tourist["final_score"]))
+    return sum(scores[name] for name in places(itinerary))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_optimized_mode_scores_at_least_the_nearest_first_plan(seed):
+    tourist, food = frames(seed=seed, spread_deg=0.2)
+    fast = create_itinerary(CENTER, tourist, food, total_time_hr=8, mode="fast")
+    optimized = create_itinerary(CENTER, tourist, food, total_time_hr=8, mode="optimized")
+    assert ends_in_time(optimized, 10, 8)
+    assert total_score(optimized, tourist) >= total_score(fast, tourist) - 1e-9
+
+
+def test_unknown_mode():
+    tourist, food = frames(10, 5)
+    with pytest.raises(ValueError, match="Unknown itinerary mode 'scenic'"):
+        create_itinerary(CENTER, tourist, food, mode="scenic")
+
+
+def test_plan_trip_splits_the_places_over_days():
+    tourist, food = frames(90, 30, spread_deg=0.4)
+    trip = plan_trip(CENTER, tourist, food, days=3, hours_per_day=6)
+    assert 1 <= len(trip) <= 3
+    assert [d["day"] for d in trip] == list(range(1, len(trip) + 1))
+    seen = [s["name"] for d in trip for s in d["itinerary"]]
+    assert len(seen) == len(set(seen))  # no place on two days
+    for d in trip:
+        assert ends_in_time(d["itinerary"], 10, 6)
+    km = distances_km(CENTER, np.array([d["center"] for d in trip]))
+    assert (np.diff(km) >= 0).all()  # nearest day first
+
+
+def test_plan_trip_edge_cases():
+    tourist, food = frames(3, 2)
+    assert plan_trip(CENTER, tourist.iloc[:0], food, days=2) == []
+    assert len(plan_trip(CENTER, tourist.iloc[[0, 0, 0]], food, days=3)) == 1  # one distinct location
+    with pytest.raises(ValueError, match="days must be at least 1"):
+        plan_trip(CENTER, tourist, food, days=0)
+
+
+def food_stops(itinerary):
+    return [i for i, s in enumerate(itinerary) if s["type"] == "food"]
+
+
+@pytest.mark.parametrize("mode", ["fast", "optimized"])
+def test_lunch_follows_the_first_stop_ending_in_the_window(mode):
+    tourist, food = frames()
+    itinerary = create_itinerary(CENTER, tourist, food, total_time_hr=8, mode=mode)
+    lunch = food_stops(itinerary)
+    assert 1 <= len(lunch) <= backendLogic.LUNCH_STOPS
+    assert lunch == list(range(lunch[0], lunch[0] + len(lunch)))
+    before = itinerary[lunch[0] - 1]
+    ends = before["arrival"] + timedelta(hours=before["stay_duration_hr"])
+    assert backendLogic.LUNCH_WINDOW[0] <= ends.hour < backendLogic.LUNCH_WINDOW[1]
+    assert all(s["name"] in set(food["name"]) for s in itinerary if s["type"] == "food")
+
+
+def test_short_days_get_no_lunch():
+    tourist, food = frames()
+    assert not food_stops(create_itinerary(CENTER, tourist, food, total_time_hr=4))
+
+
+def test_catalogue_neighbours_fill_in_lunch(backend):
+    tourist, food = backend.recommend_places("", location_coords=CENTER, moods=["w3"], budget=100, time_hr=8)
+    itinerary = backend.create_itinerary(CENTER, tourist, food.iloc[:1], total_time_hr=8, budget=100)
+    lunch = [itinerary[i] for i in food_stops(itinerary)]
+    assert len(lunch) == backend.LUNCH_STOPS
+    neighbours = [s for s in lunch if s["name"] not in set(food["name"])]
+    assert neighbours
+    catalogue = backend.get_engine().place_index
+    for stop in neighbours:
+        assert stop["rating"] * 100 <= 100 + 200  # the query's budget cut
+        assert catalogue.rows([catalogue.position_of(stop["name"])])["place_category"].iloc[0] == "food"
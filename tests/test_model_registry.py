@@ -0,0 +1,97 @@
+import shutil
+
+import joblib
+import pytest
+
+import model_registry
+from model_registry import activate, active_version, publish, read_registry, rollback, verify, version_dir
+
+DISTILLED = "models/budget_distilled.pkl"
+
+
+@pytest.fixture
+def site(trained_dir, tmp_path, monkeypatch):
+    """A private copy of the trained directory, so publishing can't leak into other tests."""
+    root = tmp_path / "site"
+    shutil.copytree(trained_dir, root, ignore=shutil.ignore_patterns("cache", "registry"))
+    monkeypatch.chdir(root)
+    return root
+
+
+def retrain(shift=1.0):
+    # a new distilled model stands in for a training run that changed it
+    model = joblib.load(DISTILLED)
+    model.intercept_ += shift
+    joblib.dump(model, DISTILLED)
+
+
+def test_publish_snapshots_and_activates(site):
+    version, created = publish()
+    assert (version, created) == ("v0001", True)
+    files = read_registry()["versions"]["v0001"]["files"]
+    assert "budget_distilled.pkl" in files and any(name.startswith("compact/") for name in files)
+    assert publish() == ("v0001", False)
+
+    retrain()
+    assert publish() == ("v0002", True)
+    manifest = read_registry()
+    assert (manifest["active"], manifest["previous"]) == ("v0002", "v0001")
+    assert verify("v0001") == "v0001"
+
+
+def test_activate_and_rollback(site):
+    publish()
+    retrain()
+    publish(activate=False)
+    assert active_version() == "v0001"
+    assert activate("v0002") == "v0002"
+    assert rollback() == "v0001"
+    assert (read_registry()["active"], read_registry()["previous"]) == ("v0001", "v0002")
+    with pytest.raises(KeyError, match="v0009"):
+        activate("v0009")
+
+
+def test_corrupt_versions_are_refused(site):
+    publish()
+    retrain()
+    publish()
+    with open(f"{version_dir('v0001')}/budget_distilled.pkl", "ab") as fh:
+        fh.write(b"\0")
+    with pytest.raises(ValueError, match="v0001 is corrupt: budget_distilled.pkl"):
+        rollback()
+    assert active_version() == "v0002"
+
+
+def test_old_versions_are_pruned(site, monkeypatch):
+    monkeypatch.setattr(model_registry, "KEEP_VERSIONS", 2)
+    publish()
+    retrain()
+    publish()
+    for shift in (2.0, 3.0, 4.0):
+        retrain(shift)
+        publish(activate=False)
+    # the newest two, plus the active and the previous version
+    assert sorted(read_registry()["versions"]) == ["v0001", "v0002", "v0004", "v0005"]
+    assert sorted(p.name for p in (site / "models" / "registry").iterdir()) == \
+        ["manifest.json", "v0001", "v0002", "v0004", "v0005"]
+
+
+def test_serving_switches_versions_and_rolls_back(site, monkeypatch):
+    import backendLogic
+
+    monkeypatch.setattr(backendLogic, "_model_state", {"previous": None, "loading": None, "errors": {}, "swaps": 0})
+    publish()
+    first = backendLogic.RecommenderEngine(offline=True).load()
+    assert first.version == "v0001"
+    original = backendLogic._swap_engine(first)
+    try:
+        retrain(50.0)
+        publish()
+        backendLogic.reload_models(wait=True)
+        assert backendLogic.model_versions()["serving"] == "v0002"
+        assert backendLogic.get_engine().budget_model is not first.budget_model
+        assert backendLogic.rollback_models() == "v0001"
+        assert backendLogic.get_engine() is first
+        assert active_version() == "v0001"
+    finally:
+        backendLogic._swap_engine(original)
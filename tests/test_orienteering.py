@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from orienteering import min_travel_route, path_travel, route_duration, solve_orienteering
+
+
+def instance(n, seed, asymmetric=False):
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(0, 2, (n, 2))
+    travel = np.linalg.norm(points[:, None] - points[None, :], axis=2)
+    if asymmetric:
+        travel *= rng.uniform(1.0, 1.5, travel.shape)
+        np.fill_diagonal(travel, 0)
+    stay = rng.uniform(0.2, 1.0, n)
+    stay[0] = 0
+    return travel, stay, rng.uniform(0, 1, n)
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("asymmetric", [False, True])
+@pytest.mark.parametrize("budget", [0.5, 3.0, 8.0])
+def test_route_stays_within_budget(seed, asymmetric, budget):
+    travel, stay, scores = instance(40, seed, asymmetric)
+    route = solve_orienteering(travel, stay, scores, budget)
+    assert route_duration(route, travel, stay) <= budget + 1e-9
+    assert 0 not in route
+    assert len(route) == len(set(route))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_zero_deadline_still_builds_a_full_route(seed):
+    travel, stay, scores = instance(60, seed)
+    rushed = solve_orienteering(travel, stay, scores, 4.0, deadline_s=0)
+    assert rushed
+    assert route_duration(rushed, travel, stay) <= 4.0 + 1e-9
+    improved = solve_orienteering(travel, stay, scores, 4.0)
+    assert scores[improved].sum() >= scores[rushed].sum() - 1e-9
+
+
+def test_nothing_fits():
+    travel, stay, scores = instance(10, 0)
+    assert solve_orienteering(travel, stay, scores, 0.1) == []
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_min_travel_route_walks_less_per_stop(seed):
+    travel, stay, scores = instance(40, seed)
+    best = solve_orienteering(travel, stay, scores, 6.0)
+    route = min_travel_route(travel, stay, len(best), 6.0)
+    assert 0 < len(route) <= len(best)
+    assert route_duration(route, travel, stay) <= 6.0 + 1e-9
+    assert 0 not in route and len(route) == len(set(route))
+    assert path_travel(route, travel) / len(route) <= path_travel(best, travel) / len(best) + 1e-9
@@ -0,0 +1,20 @@
+import pytest
+
+
+def test_unknown_category_lists_the_valid_ones(backend):
+    with pytest.raises(ValueError, match=r"Unknown place category 'museum', expected one of \('attraction', 'food'\)"):
+        backend.similar_places(0, category="museum")
+
+
+@pytest.mark.parametrize("category", ["attraction", "food"])
+def test_category_restricts_the_results(backend, category):
+    rows = backend.similar_places(3, k=10, category=category)
+    assert len(rows) and (rows["place_category"] == category).all()
+    assert 3 not in rows.index
+    assert rows["similarity"].is_monotonic_decreasing
+
+
+def test_name_and_position_agree(backend):
+    by_position = backend.similar_places(5, k=8)
+    by_name = backend.similar_places("Place 5", k=8)
+    assert by_position.equals(by_name)
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from geo_distance import distances_km
+from spatial_index import RADIUS_PADDING, GridIndex
+
+
+def brute_force(coords, origin, radius_km, positions=None):
+    positions = np.arange(len(coords)) if positions is None else np.asarray(positions)
+    km = distances_km(origin, coords[positions])
+    return np.sort(positions[km <= radius_km * RADIUS_PADDING])
+
+
+@pytest.mark.parametrize("origin", [(23.02, 72.57), (0.01, 179.99), (-33.9, -179.98), (88.5, 10.0), (-89.9, 0.0)])
+@pytest.mark.parametrize("radius_km", [0.0, 1.0, 25.0, 300.0])
+def test_query_matches_brute_force(origin, radius_km):
+    rng = np.random.default_rng(0)
+    coords = np.column_stack([np.clip(origin[0] + rng.normal(0, 2, 3000), -90, 90),
+                              (origin[1] + rng.normal(0, 4, 3000) + 180) % 360 - 180])
+    index = GridIndex(coords)
+    np.testing.assert_array_equal(index.query(origin, radius_km), brute_force(coords, origin, radius_km))
+
+
+def test_subset_and_saved_state():
+    rng = np.random.default_rng(1)
+    coords = np.column_stack([23 + rng.uniform(-1, 1, 2000), 72.5 + rng.uniform(-1, 1, 2000)])
+    positions = np.flatnonzero(rng.random(2000) < 0.3)
+    index = GridIndex(coords, positions, cell_deg=0.1)
+    restored = GridIndex(coords, cell_deg=0.1, **index.state())
+    expected = brute_force(coords, (23.1, 72.4), 40, positions)
+    assert len(index) == len(positions)
+    np.testing.assert_array_equal(index.query((23.1, 72.4), 40), expected)
+    np.testing.assert_array_equal(restored.query((23.1, 72.4), 40), expected)
+
+
+def test_empty_results():
+    coords = np.array([[23.0, 72.0], [23.5, 72.5]])
+    index = GridIndex(coords)
+    assert index.query((23.0, 72.0), -1).size == 0
+    assert index.query((-23.0, -72.0), 50).size == 0
+    assert GridIndex(coords, positions=[]).query((23.0, 72.0), 50).size == 0
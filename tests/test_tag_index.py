@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from tag_index import TagIndex, place_tags, tag_matrix
+
+
+def descriptions(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    words = [f"w{i}" for i in range(40)]
+    return [" ".join(["the"] + list(rng.choice(words, rng.integers(0, 6)))) for _ in range(n)]
+
+
+def brute_force(texts, position, k, allowed=None):
+    binary, _ = tag_matrix([place_tags(t) for t in texts])
+    rows = binary.toarray()
+    norms = np.linalg.norm(rows, axis=1)
+    scores = rows @ rows[position] / np.where(norms > 0, norms, 1) / max(norms[position], 1)
+    keep = (np.arange(len(rows)) != position) & (scores > 1e-9)
+    if allowed is not None:
+        keep &= allowed
+    candidates = np.flatnonzero(keep)
+    order = np.lexsort((candidates, -np.round(scores[candidates], 5)))
+    return candidates[order][:k], scores[candidates[order][:k]]
+
+
+def test_tag_matrix_prunes_by_document_frequency():
+    tags = [["a", "b", "a"], ["a", "c"], ["a", "b", "d"], ["e"]]
+    matrix, vocabulary = tag_matrix(tags, min_df=2, max_df=0.5)
+    assert vocabulary.tolist() == ["b"]  # "a" is on 3 of 4 places, "c", "d", "e" on one
+    assert matrix.toarray().ravel().tolist() == [1, 0, 1, 0]
+    matrix, vocabulary = tag_matrix(tags, min_df=1, max_df=1.0)
+    assert vocabulary.tolist() == ["a", "b", "c", "d", "e"]
+    assert set(matrix.data) == {1}  # repeated tags count once
+
+
+def test_build_keeps_unit_rows_and_their_transpose():
+    index = TagIndex.build(descriptions())
+    norms = np.sqrt(np.asarray(index.matrix.multiply(index.matrix).sum(axis=1)).ravel())
+    np.testing.assert_allclose(norms[norms > 0], 1, rtol=1e-6)
+    _, vocabulary = tag_matrix([place_tags(t) for t in descriptions()])
+    assert "the" not in vocabulary  # on every place
+    assert index.n_tags == len(vocabulary)
+    assert (index.inverted != index.matrix.T).nnz == 0
+    assert len(index) == 300
+
+
+@pytest.mark.parametrize("position", [0, 7, 150])
+@pytest.mark.parametrize("k", [1, 10, 1000])
+def test_similar_matches_brute_force(position, k):
+    texts = descriptions()
+    index = TagIndex.build(texts)
+    allowed = np.random.default_rng(position).random(len(texts)) < 0.5
+    for mask in (None, allowed):
+        positions, scores = index.similar(position, k, allowed=mask)
+        expected_positions, expected_scores = brute_force(texts, position, k, mask)
+        np.testing.assert_array_equal(positions, expected_positions)
+        np.testing.assert_allclose(scores, expected_scores, rtol=1e-5)
+
+
+def test_places_without_kept_tags_have_no_neighbours():
+    index = TagIndex.build(["the w1", "the w1", "the", "the w2"], min_df=2, max_df=0.9)
+    assert index.similar(2, 5)[0].size == 0
+    assert index.similar(3, 5)[0].size == 0
+    assert index.similar(0, 5)[0].tolist() == [1]
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from topk import top_k, top_k_by_category
+
+
+def reference(scores, k):
+    return np.argsort(-np.asarray(scores), kind="stable")[:max(k, 0)]
+
+
+def test_ties_go_by_position():
+    assert top_k([1, 0, 1, 1, 0, 1], 2).tolist() == [0, 2]
+    assert top_k([0, 0, 0, 0, 5], 3).tolist() == [4, 0, 1]
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("k", [0, 1, 5, 50, 200, 300])
+def test_matches_a_stable_full_sort(seed, k):
+    scores = np.random.default_rng(seed).integers(0, 6, 200).astype(float)
+    np.testing.assert_array_equal(top_k(scores, k), reference(scores, k))
+
+
+def test_by_category_matches_per_group_sorts():
+    rng = np.random.default_rng(0)
+    scores, codes = rng.integers(0, 4, 500).astype(float), rng.integers(0, 3, 500)
+    picked = top_k_by_category(scores, codes, {0: 10, 2: 7, 5: 3})
+    for code, k in ((0, 10), (2, 7)):
+        group = np.flatnonzero(codes == code)
+        np.testing.assert_array_equal(picked[code], group[reference(scores[group], k)])
+    assert picked[5].size == 0
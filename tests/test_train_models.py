@@ -0,0 +1,131 @@
+import shutil
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+import train_models
+from conftest import CENTER
+from train_models import code_digest, full_stages
+
+
+def stage_keys():
+    keys = {}
+    for stage in full_stages(train_models.DATA_PATH):
+        keys[stage.name] = stage.key([keys[dep] for dep in stage.deps])
+    return keys
+
+
+def changed(before, after):
+    return {name for name in before if before[name] != after[name]}
+
+
+def test_stage_code_covers_the_helpers_it_calls(monkeypatch):
+    data, tfidf = code_digest(train_models.stage_data), code_digest(train_models.stage_tfidf)
+    monkeypatch.setattr(train_models, "MOODS", train_models.MOODS + ["Sleepy"])
+    assert code_digest(train_models.stage_data) != data
+    assert code_digest(train_models.stage_tfidf) == tfidf
+
+
+def test_tag_index_only_keys_the_tag_stage(in_trained_dir, monkeypatch):
+    import tag_index
+
+    before = stage_keys()
+    monkeypatch.setattr(tag_index, "tag_matrix", tag_index.place_tags)
+    assert changed(before, stage_keys()) == {"collab_knn"}
+
+
+def test_streaming_code_does_not_key_the_full_stages(in_trained_dir, monkeypatch):
+    before = stage_keys()
+    monkeypatch.setattr(train_models, "read_chunks", train_models.idf_from_counts)
+    monkeypatch.setattr(train_models, "CHUNK_SIZE", 10)
+    assert changed(before, stage_keys()) == set()
+
+
+def test_data_code_keys_every_stage(in_trained_dir, monkeypatch):
+    before = stage_keys()
+    monkeypatch.setattr(train_models, "budget_map", {**train_models.budget_map, "Premium": 900})
+    assert changed(before, stage_keys()) == set(before)
+
+
+def test_rerun_refits_nothing(in_trained_dir, capsys):
+    train_models.run_stages(full_stages(train_models.DATA_PATH, n_jobs=1), workers=1)
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == len(full_stages()) and all(line.split(": ")[1] == "cached" for line in lines)
+
+
+@pytest.fixture
+def site(trained_dir, tmp_path, monkeypatch):
+    root = tmp_path / "site"
+    shutil.copytree(trained_dir, root, ignore=shutil.ignore_patterns("cache", "registry"))
+    monkeypatch.chdir(root)
+    return root
+
+
+def streaming_state():
+    state = np.load(train_models.STREAMING_STATE_PATH)
+    return state["doc_freq"], int(state["n_docs"])
+
+
+def mood_model():
+    return joblib.load("models/mood_classifier.pkl")[-1]
+
+
+def test_streaming_matches_one_chunk(site):
+    # labelled places: the fallback labels are drawn chunk by chunk
+    catalogue = pd.read_csv(train_models.DATA_PATH)
+    catalogue["mood"] = np.resize(train_models.MOODS, len(catalogue))
+    catalogue["budget"] = np.resize(train_models.BUDGETS, len(catalogue))
+    catalogue.to_csv("labelled.csv", index=False)
+    train_models.train_streaming("labelled.csv", chunk_size=400)
+    doc_freq, n_docs = streaming_state()
+    mood = mood_model()
+
+    train_models.train_streaming("labelled.csv", chunk_size=64)
+    chunked_freq, chunked_docs = streaming_state()
+    assert (chunked_docs, n_docs) == (400, 400)
+    np.testing.assert_array_equal(chunked_freq, doc_freq)
+    np.testing.assert_allclose(mood_model().feature_count_, mood.feature_count_)
+    assert mood_model().class_count_.sum() == 400
+
+
+def test_streaming_models_serve(site, monkeypatch):
+    import backendLogic
+
+    train_models.train_streaming(chunk_size=100)
+    vectorizer = joblib.load("models/tfidf_vectorizer.pkl")
+    features = vectorizer.transform(["w1 w2 w3", "w250"])
+    assert features.shape == (2, train_models.HASH_FEATURES)
+    assert set(joblib.load("models/mood_classifier.pkl").predict(["w1 w2 w3"])) <= set(train_models.MOODS)
+    assert np.isfinite(joblib.load("models/budget_predictor.pkl").predict(features)).all()
+    monkeypatch.setattr(backendLogic, "MODEL_RELOAD", "manual")
+    engine = backendLogic.RecommenderEngine(offline=True, use_store=False, use_registry=False).load()
+    assert engine.mood_classifier is not None  # the mood model shares the streamed vectorizer
+    previous = backendLogic._swap_engine(engine)
+    try:
+        tourist, _ = backendLogic.recommend_places("", location_coords=CENTER, moods=["w3"], budget=500, time_hr=8)
+        assert len(tourist)
+    finally:
+        backendLogic._swap_engine(previous)
+
+
+def test_update_folds_in_new_places(site):
+    catalogue = pd.read_csv(train_models.DATA_PATH)
+    catalogue.iloc[:300].to_csv("first.csv", index=False)
+    catalogue.iloc[300:].to_csv("new.csv", index=False)
+    train_models.train_streaming(data_path="first.csv", chunk_size=128)
+    first_freq, _ = streaming_state()
+
+    train_models.update_streaming("new.csv", chunk_size=128)
+    doc_freq, n_docs = streaming_state()
+    assert n_docs == 400 and mood_model().class_count_.sum() == 400
+    hasher = train_models.hashing_vectorizer()
+    counts = hasher.transform(catalogue["description"].iloc[300:].fillna(""))
+    np.testing.assert_array_equal(doc_freq - first_freq,
+                                  np.bincount(counts.indices, minlength=train_models.HASH_FEATURES))
+
+
+def test_update_needs_streaming_state(site):
+    with pytest.raises(SystemExit, match="run python train_models.py --streaming first"):
+        train_models.update_streaming(train_models.DATA_PATH)
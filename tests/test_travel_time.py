@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.sparse.csgraph import dijkstra
+
+from travel_time import RoadGraphTravel, StraightLineTravel, build_graph, parse_oneway
+
+ORIGIN = (23.0, 72.5)
+STEP_DEG = 0.002
+
+
+def grid(n=30, seed=0):
+    """n x n street grid, some streets fast and some one-way."""
+    rng = np.random.default_rng(seed)
+    ii, jj = np.meshgrid(np.arange(n), np.arange(n), indexing="ij")
+    nodes = pd.DataFrame({"id": (ii * n + jj).ravel() + 1000,
+                          "lat": ORIGIN[0] + ii.ravel() * STEP_DEG,
+                          "lng": ORIGIN[1] + jj.ravel() * STEP_DEG})
+    right = (ii[:, :-1] * n + jj[:, :-1]).ravel() + 1000
+    down = (ii[:-1] * n + jj[:-1]).ravel() + 1000
+    edges = pd.DataFrame({"u": np.r_[right, down], "v": np.r_[right + 1, down + n]})
+    edges["length_m"] = 220.0
+    edges["speed_kmh"] = np.where(rng.random(len(edges)) < 0.2, 50.0, 20.0)
+    edges["oneway"] = np.where(rng.random(len(edges)) < 0.1, "yes", "no")
+    return nodes, edges
+
+
+@pytest.fixture(scope="module")
+def road(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("road") / "road_graph.npz")
+    build_graph(*grid(), out_path=path)
+    return RoadGraphTravel.load(path)
+
+
+def naive(graph, points):
+    nodes, snap_km = graph.snap(points)
+    access = snap_km / graph.access_speed_kmh
+    m = dijkstra(graph.graph, directed=True, indices=nodes)[:, nodes] + access[:, None] + access[None, :]
+    np.fill_diagonal(m, 0.0)
+    return m
+
+
+def test_parse_oneway():
+    assert parse_oneway(["yes", "No", " -1", "", None, "reversible", "true"]).tolist() == [1, 0, -1, 0, 0, 0, 1]
+    assert parse_oneway([True, False, None]).tolist() == [1, 0, 0]
+    with pytest.raises(ValueError, match="'sometimes'"):
+        parse_oneway(["yes", "sometimes"])
+
+
+def test_build_keeps_the_strong_component_and_the_fastest_arcs(tmp_path):
+    nodes = pd.DataFrame({"id": [10, 20, 30, 40], "lat": [0.0, 0.0, 0.01, 0.02], "lng": [0.0, 0.01, 0.0, 0.0]})
+    edges = pd.DataFrame({"u": [10, 10, 20, 30], "v": [20, 20, 10, 40], "length_m": [1000.0, 1000.0, 1000.0, 500.0],
+                          "speed_kmh": [10.0, 50.0, 20.0, 10.0], "oneway": ["yes", "yes", "yes", "-1"]})
+    path = str(tmp_path / "graph.npz")
+    assert build_graph(nodes, edges, out_path=path) == (2, 2)
+    graph = RoadGraphTravel.load(path)
+    np.testing.assert_allclose(graph.graph.toarray(), [[0, 1 / 50], [1 / 20, 0]], rtol=1e-6)
+
+
+@pytest.mark.parametrize("span_deg", [0.005, 0.02, 0.06])
+def test_matrix_matches_unbounded_searches(road, span_deg):
+    rng = np.random.default_rng(int(span_deg * 1000))
+    points = rng.uniform(ORIGIN, np.add(ORIGIN, span_deg), (25, 2))
+    points[3] = points[4]  # two places on one node
+    np.testing.assert_allclose(road.matrix(points), naive(road, points), rtol=1e-9)
+
+
+@pytest.mark.parametrize("limit_hr", [0.05, 0.2, 1.0])
+def test_limited_matrix_is_exact_within_the_limit(road, limit_hr):
+    points = np.random.default_rng(1).uniform(ORIGIN, np.add(ORIGIN, 0.06), (25, 2))
+    exact, limited = naive(road, points), road.matrix(points, limit_hr=limit_hr)
+    within = exact <= limit_hr
+    np.testing.assert_allclose(limited[within], exact[within], rtol=1e-9)
+    assert (limited[~within] >= limit_hr).all()
+
+
+def test_landmark_bounds_hold(road):
+    nodes = np.random.default_rng(2).choice(len(road), 40, replace=False)
+    exact = dijkstra(road.graph, directed=True, indices=nodes)[:, nodes]
+    lower, upper = road.bounds(nodes)
+    assert (lower <= exact + 1e-12).all() and (exact <= upper + 1e-12).all()
+
+
+def test_graph_files_without_landmarks_still_load(road, tmp_path):
+    path = str(tmp_path / "old.npz")
+    csr = road.graph
+    np.savez(path, lat=road.lat, lng=road.lng, indptr=csr.indptr, indices=csr.indices,
+             hours=csr.data.astype(np.float32))
+    old = RoadGraphTravel.load(path)
+    np.testing.assert_allclose(old.landmark_from, road.landmark_from)
+    points = np.random.default_rng(3).uniform(ORIGIN, np.add(ORIGIN, 0.05), (10, 2))
+    np.testing.assert_allclose(old.matrix(points), road.matrix(points))
+
+
+def test_points_off_the_road_use_the_fallback(road):
+    points = np.array([[ORIGIN[0] + 0.01, ORIGIN[1] + 0.01], [ORIGIN[0] + 0.02, ORIGIN[1] + 0.01],
+                       [ORIGIN[0] + 1.0, ORIGIN[1] + 1.0]])
+    matrix = road.matrix(points)
+    straight = StraightLineTravel().matrix(points)
+    np.testing.assert_allclose(matrix[2], straight[2])
+    np.testing.assert_allclose(matrix[:, 2], straight[:, 2])
+    assert matrix[0, 1] > 0 and matrix[0, 1] != straight[0, 1]
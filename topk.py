@@ -0,0 +1,46 @@
+# topk.py
+# Partial top-k selection (argpartition) instead of sorting whole score arrays.
+
+import numpy as np
+
+
+def top_k(scores, k):
+    """Indices of the k largest scores, best first; equal scores go by position. O(n + k log k)."""
+    scores = np.asarray(scores)
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        idx = np.argpartition(-scores, k - 1)[:k]
+        # argpartition keeps an arbitrary subset of the scores tied with the
+        # k-th; take the first ones by position instead
+        kth = scores[idx].min()
+        if kth == kth:  # not NaN
+            better = idx[scores[idx] > kth]
+            idx = np.concatenate([better, np.flatnonzero(scores == kth)[:k - len(better)]])
+    else:
+        idx = np.arange(n)
+    return idx[np.lexsort((idx, -scores[idx]))]
+
+
+def top_k_by_category(scores, codes, ks):
+    """Per-category top-k in one pass over the candidates.
+
+    `codes` holds a small integer category code per score and `ks` maps code -> k.
+    Returns {code: indices into scores, best first} for every code in `ks`.
+    """
+    scores = np.asarray(scores)
+    codes = np.asarray(codes)
+    if len(codes) == 0:
+        return {code: np.empty(0, dtype=np.int64) for code in ks}
+
+    # Group candidates by category with a stable (radix) sort on the small codes
+    order = np.argsort(codes, kind="stable")
+    counts = np.bincount(codes, minlength=max(ks, default=-1) + 1)
+    bounds = np.concatenate(([0], np.cumsum(counts)))
+
+    picked = {}
+    for code, k in ks.items():
+        group = order[bounds[code]:bounds[code + 1]] if code < len(counts) else order[:0]
+        picked[code] = group[top_k(scores[group], k)]
+    return picked
@@ -1,74 +1,530 @@
 # train_models.py
 # One-time model training script for Smart Tourism Recommender
+#
+#   python train_models.py                  full in-memory training (default)
+#   python train_models.py --force          ... ignoring the stage cache
+#   python train_models.py --export         write models/compact from the current pickles
+#   python train_models.py --streaming      out-of-core training in CSV chunks
+#   python train_models.py --update new.csv add places to the streaming models
+#
+# Full training is a DAG of stages (data -> TF-IDF -> content KNN / mood
+# classifier / budget forest -> distilled linear budget model, data ->
+# collaborative KNN over sparse, pruned description tags, see tag_index.py).
+# The mood and budget models share the TF-IDF vocabulary, so serving
+# tokenizes a query once for both. Every stage is cached under
+# cache/training/ by a hash of its inputs and of the training code, so a
+# rerun only refits what changed, and independent stages run in parallel
+# worker processes.
+#
+# Every mode finishes by exporting pickle-free copies of the serving models
+# to models/compact (see compact_models.py), which backendLogic maps at start,
+# and publishing the result as the active version in models/registry (see
+# model_registry.py), which running servers switch to without a restart.
+#
+# Streaming mode never holds more than one chunk: text is hashed into a fixed
+# feature space (no vocabulary to grow), document frequencies are summed over
+# a first pass to get the IDF, and the mood classifier (MultinomialNB) and the
+# budget regressor (SGDRegressor) are fitted with partial_fit on a second
+# pass, both on the same TF-IDF rows. The running document-frequency counts are saved, so --update can add
+# new places to the same models without a full refit. The artifacts keep the
+# names and interfaces backendLogic loads (vectorizer.transform(texts),
+# mood_model.predict(texts), budget_model.predict(vectors)).
 
-import pandas as pd
-import numpy as np
-import re
+import argparse
+import hashlib
+import importlib
+import inspect
+import json
 import os
+import re
+import resource
+import shutil
+import sys
+import time
+
 import joblib
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.preprocessing import MultiLabelBinarizer
-from sklearn.neighbors import NearestNeighbors
-from sklearn.model_selection import train_test_split
-from sklearn.naive_bayes import MultinomialNB
-from sklearn.pipeline import make_pipeline
-from sklearn.ensemble import RandomForestRegressor
+import numpy as np
+import pandas as pd
 
-# ----------------- Load & Prepare Dataset -----------------
-df = pd.read_csv('cleaned_tourism_dataset.csv')
-df.columns = df.columns.str.strip()
-df.dropna(subset=['name', 'rating', 'lat', 'lng', 'reviews'], inplace=True)
-df.fillna("", inplace=True)
-
-# Combine text fields for TF-IDF analysis
-df['combined'] = df['description']
-df['tags'] = df['description'].apply(lambda x: re.findall(r'\b\w+\b', str(x.lower())))
-
-# Fallback mood and budget columns
-if 'mood' not in df.columns:
-    df['mood'] = np.random.choice(['Relaxing', 'Adventurous', 'Romantic', 'Cultural', 'Spiritual'], len(df))
-if 'budget' not in df.columns:
-    df['budget'] = np.random.choice(['Free', 'Regular', 'Moderate', 'Premium'], len(df))
-
-# ----------------- Model Directory -----------------
-os.makedirs("models", exist_ok=True)
-
-# ----------------- TF-IDF Vectorizer -----------------
-tfidf = TfidfVectorizer(stop_words='english')
-tfidf_matrix = tfidf.fit_transform(df['combined'])
-joblib.dump(tfidf, 'models/tfidf_vectorizer.pkl')
-
-# ----------------- Content-Based KNN -----------------
-content_knn = NearestNeighbors(metric='cosine', algorithm='brute')
-content_knn.fit(tfidf_matrix)
-joblib.dump(content_knn, 'models/content_knn_model.pkl')
-
-# ----------------- Collaborative Filtering KNN -----------------
-mlb = MultiLabelBinarizer()
-tag_matrix = mlb.fit_transform(df['tags'])
-model_knn = NearestNeighbors(metric='cosine', algorithm='brute')
-model_knn.fit(tag_matrix)
-joblib.dump(model_knn, 'models/collab_knn_model.pkl')
-joblib.dump(mlb, 'models/multilabel_binarizer.pkl')
-
-# ----------------- Mood Classifier -----------------
-X_train, X_test, y_train, y_test = train_test_split(df['combined'], df['mood'], test_size=0.2)
-mood_model = make_pipeline(TfidfVectorizer(), MultinomialNB())
-mood_model.fit(X_train, y_train)
-joblib.dump(mood_model, 'models/mood_classifier.pkl')
-
-# ----------------- Budget Regressor -----------------
+from tag_index import TAG_MAX_DF, TAG_MIN_DF
+
+DATA_PATH = 'cleaned_tourism_dataset.csv'
+MOODS = ['Relaxing', 'Adventurous', 'Romantic', 'Cultural', 'Spiritual']
+BUDGETS = ['Free', 'Regular', 'Moderate', 'Premium']
 budget_map = {
     'Free': 0,
     'Regular': 300,
     'Moderate': 500,
     'Premium': 800
 }
-df['budget_numeric'] = df['budget'].map(budget_map)
-X_budget = tfidf_matrix
-y_budget = df['budget_numeric']
-budget_model = RandomForestRegressor(n_estimators=100, random_state=42)
-budget_model.fit(X_budget, y_budget)
-joblib.dump(budget_model, 'models/budget_predictor.pkl')
-
-print("All models trained and saved successfully.")
+REQUIRED_COLUMNS = ['name', 'rating', 'lat', 'lng', 'reviews']
+
+CHUNK_SIZE = 20_000
+HASH_FEATURES = 2 ** 18  # hashed term buckets; fixed, so models never grow with the data
+STREAMING_STATE_PATH = 'models/streaming_state.npz'
+TRAIN_CACHE_DIR = os.path.join('cache', 'training')
+DISTILL_ALPHA = 1.0  # ridge penalty of the linear budget model distilled from the forest
+STAGE_MANIFEST = 'stages.json'  # in models/: which cache entry each model file came from
+
+
+# ----------------- Load & Prepare Dataset -----------------
+def prepare(df, rng=np.random):
+    df.columns = df.columns.str.strip()
+    df = df.dropna(subset=REQUIRED_COLUMNS)
+    df = df.fillna("")
+
+    # Combine text fields for TF-IDF analysis
+    df['combined'] = df['description']
+    df['tags'] = df['description'].apply(lambda x: re.findall(r'\b\w+\b', str(x.lower())))
+
+    # Fallback mood and budget columns
+    if 'mood' not in df.columns:
+        df['mood'] = rng.choice(MOODS, len(df))
+    if 'budget' not in df.columns:
+        df['budget'] = rng.choice(BUDGETS, len(df))
+    df['budget_numeric'] = df['budget'].map(budget_map)
+    return df
+
+
+# ----------------- Stage Pipeline -----------------
+# Full training as a small DAG. A stage's cache key hashes the CSV bytes (for
+# the data stage), its parameters, its code (code_digest: the stage function
+# and the repo functions and constants it reaches, e.g. prepare and MOODS for
+# the data stage, tag_matrix for collab_knn) and the keys of the stages it
+# reads, so only stages whose inputs changed are refitted; a rerun on
+# unchanged data just checks the cache and copies nothing. Each cache
+# entry is a directory with the stage's value (read by later stages) and the
+# model files it produces. Independent stages run in separate processes.
+class Stage:
+    """`fn(*dep_values, **params, **files, **options)` -> (value, {model file: object}).
+
+    `params`, the contents of `files` (name -> path) and the code `fn` runs
+    go into the cache key; `options` only affect speed (e.g. n_jobs), so they
+    do not.
+    """
+
+    def __init__(self, name, fn, deps=(), params=None, files=None, options=None):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.params = params or {}
+        self.files = files or {}
+        self.options = options or {}
+
+    def key(self, dep_keys):
+        import sklearn
+
+        blob = json.dumps({
+            "stage": self.name,
+            "code": code_digest(self.fn),
+            "params": self.params,
+            "files": {name: file_digest(path) for name, path in self.files.items()},
+            "deps": list(dep_keys),
+            "sklearn": sklearn.__version__,
+        }, sort_keys=True)
+        return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def file_digest(path, block=1 << 20):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(block):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def code_digest(fn):
+    """Hash of fn's source plus the functions, classes and constants of this repo it reaches.
+
+    Names are followed through fn's globals and through the repo modules it
+    imports (also inside the function), recursively; library code is left
+    out, the sklearn version stands for it.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    def in_repo(obj):
+        try:
+            path = inspect.getsourcefile(obj)
+        except TypeError:
+            return False
+        return path is not None and os.path.dirname(os.path.abspath(path)) == here
+
+    def names(code):
+        yield from code.co_names
+        for const in code.co_consts:
+            if inspect.iscode(const):
+                yield from names(const)
+
+    parts, seen = {}, set()
+
+    def visit(fn):
+        if fn in seen:
+            return
+        seen.add(fn)
+        parts[fn.__qualname__] = inspect.getsource(fn)
+        found = set(names(fn.__code__))
+        spaces = [fn.__globals__] + [vars(importlib.import_module(name)) for name in sorted(found)
+                                     if os.path.exists(os.path.join(here, f"{name}.py"))]
+        for name in sorted(found):
+            for space in spaces:
+                if name not in space:
+                    continue
+                value = space[name]
+                if inspect.isfunction(value) and in_repo(value):
+                    visit(value)
+                elif inspect.isclass(value) and in_repo(value):
+                    parts[value.__qualname__] = inspect.getsource(value)
+                    for method in vars(value).values():
+                        if inspect.isfunction(method):
+                            visit(method)
+                elif isinstance(value, (bool, int, float, str, tuple, list, dict, re.Pattern)):
+                    parts[name] = repr(value)
+                break
+
+    visit(fn)
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+def _entry(name, key):
+    return os.path.join(TRAIN_CACHE_DIR, f"{name}-{key[:16]}")
+
+
+def _run_stage(stage, key, dep_entries):
+    # Runs in a worker process: reads upstream values from their cache
+    # entries and writes its own entry atomically (tmp dir, then rename)
+    inputs = [joblib.load(os.path.join(entry, 'value.joblib')) for entry in dep_entries]
+    started = time.perf_counter()
+    value, artifacts = stage.fn(*inputs, **stage.params, **stage.files, **stage.options)
+    entry = _entry(stage.name, key)
+    tmp = f"{entry}.tmp{os.getpid()}"
+    os.makedirs(tmp, exist_ok=True)
+    if value is not None:
+        joblib.dump(value, os.path.join(tmp, 'value.joblib'))
+    for filename, obj in artifacts.items():
+        joblib.dump(obj, os.path.join(tmp, filename))
+    shutil.rmtree(entry, ignore_errors=True)
+    os.replace(tmp, entry)
+    return time.perf_counter() - started
+
+
+def _publish(entry, key, manifest, models_dir):
+    # Copy the stage's model files into models/ unless they are already there
+    published = []
+    for filename in sorted(os.listdir(entry)):
+        if filename == 'value.joblib':
+            continue
+        target = os.path.join(models_dir, filename)
+        if manifest.get(filename) == key and os.path.exists(target):
+            continue
+        shutil.copyfile(os.path.join(entry, filename), target + '.tmp')
+        os.replace(target + '.tmp', target)
+        manifest[filename] = key
+        published.append(filename)
+    return published
+
+
+def run_stages(stages, workers=None, force=False, models_dir="models"):
+    """Run `stages` (listed in dependency order), skipping every cached one."""
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    os.makedirs(TRAIN_CACHE_DIR, exist_ok=True)
+    os.makedirs(models_dir, exist_ok=True)
+    manifest_path = os.path.join(models_dir, STAGE_MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    keys = {}
+    for stage in stages:
+        keys[stage.name] = stage.key(keys[d] for d in stage.deps)
+    pending = [s for s in stages if force or not os.path.isdir(_entry(s.name, keys[s.name]))]
+    status = {s.name: "cached" for s in stages}
+
+    done = {s.name for s in stages} - {s.name for s in pending}
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        running = {}
+        while pending or running:
+            for stage in [s for s in pending if all(d in done for d in s.deps)]:
+                dep_entries = [_entry(d, keys[d]) for d in stage.deps]
+                running[pool.submit(_run_stage, stage, keys[stage.name], dep_entries)] = stage
+                pending.remove(stage)
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = running.pop(future)
+                status[stage.name] = f"trained in {future.result():.1f}s"
+                done.add(stage.name)
+
+    for stage in stages:
+        published = _publish(_entry(stage.name, keys[stage.name]), keys[stage.name], manifest, models_dir)
+        print(f"{stage.name:>12}: {status[stage.name]}" + (f" -> {', '.join(published)}" if published else ""))
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+
+# ----------------- Full Training Stages -----------------
+# Each stage returns (value for later stages, {model file: object}).
+def stage_data(data_path, seed):
+    df = prepare(pd.read_csv(data_path), np.random.RandomState(seed))
+    return df[['combined', 'tags', 'mood', 'budget_numeric']], {}
+
+
+def stage_tfidf(df):
+    # The shared vocabulary: the mood classifier, the budget models and the
+    # place index all consume these rows, so a query is tokenized once
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    tfidf = TfidfVectorizer(stop_words='english')
+    tfidf_matrix = tfidf.fit_transform(df['combined'])
+    return (tfidf, tfidf_matrix), {'tfidf_vectorizer.pkl': tfidf}
+
+
+def stage_content_knn(tfidf):
+    from sklearn.neighbors import NearestNeighbors
+
+    _, tfidf_matrix = tfidf
+    content_knn = NearestNeighbors(metric='cosine', algorithm='brute')
+    content_knn.fit(tfidf_matrix)
+    return None, {'content_knn_model.pkl': content_knn}
+
+
+def stage_collab_knn(df, min_df, max_df):
+    # Sparse place x tag matrix over the pruned tag vocabulary (tag_index.py);
+    # serving builds the same matrix over its catalogue for similar_places
+    from sklearn.neighbors import NearestNeighbors
+    from sklearn.preprocessing import MultiLabelBinarizer
+
+    from tag_index import tag_matrix
+
+    tags, vocabulary = tag_matrix(df['tags'].tolist(), min_df, max_df)
+    mlb = MultiLabelBinarizer(classes=vocabulary, sparse_output=True).fit([])
+    model_knn = NearestNeighbors(metric='cosine', algorithm='brute')
+    model_knn.fit(tags)
+    return None, {'collab_knn_model.pkl': model_knn, 'multilabel_binarizer.pkl': mlb}
+
+
+def stage_mood(df, tfidf, seed):
+    from sklearn.model_selection import train_test_split
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.pipeline import make_pipeline
+
+    # Fitted on the shared TF-IDF rows; the pickled pipeline still takes
+    # raw texts, with the shared vectorizer as its first step
+    vectorizer, tfidf_matrix = tfidf
+    train_rows, test_rows = train_test_split(np.arange(len(df)), test_size=0.2, random_state=seed)
+    classifier = MultinomialNB().fit(tfidf_matrix[train_rows], df['mood'].iloc[train_rows])
+    return None, {'mood_classifier.pkl': make_pipeline(vectorizer, classifier)}
+
+
+def stage_budget(df, tfidf, seed, n_jobs):
+    from sklearn.ensemble import RandomForestRegressor
+
+    _, tfidf_matrix = tfidf
+    budget_model = RandomForestRegressor(n_estimators=100, random_state=seed, n_jobs=n_jobs)
+    budget_model.fit(tfidf_matrix, df['budget_numeric'])
+    # the forest's own outputs are what the distilled model learns
+    return budget_model.predict(tfidf_matrix), {'budget_predictor.pkl': budget_model}
+
+
+def stage_budget_distilled(tfidf, forest_outputs, alpha):
+    # Ridge on the same TF-IDF rows: one sparse dot product per batch at
+    # serving time instead of 100 tree walks (BUDGET_MODEL in backendLogic)
+    from sklearn.linear_model import Ridge
+
+    _, tfidf_matrix = tfidf
+    student = Ridge(alpha=alpha)
+    student.fit(tfidf_matrix, forest_outputs)
+    return None, {'budget_distilled.pkl': student}
+
+
+def full_stages(data_path=DATA_PATH, seed=42, n_jobs=-1):
+    return [
+        Stage('data', stage_data, params={'seed': seed}, files={'data_path': data_path}),
+        Stage('tfidf', stage_tfidf, deps=['data']),
+        Stage('content_knn', stage_content_knn, deps=['tfidf']),
+        Stage('collab_knn', stage_collab_knn, deps=['data'], params={'min_df': TAG_MIN_DF, 'max_df': TAG_MAX_DF}),
+        Stage('mood', stage_mood, deps=['data', 'tfidf'], params={'seed': seed}),
+        Stage('budget', stage_budget, deps=['data', 'tfidf'], params={'seed': seed},
+              options={'n_jobs': n_jobs}),
+        Stage('distilled', stage_budget_distilled, deps=['tfidf', 'budget'], params={'alpha': DISTILL_ALPHA}),
+    ]
+
+
+def train_full(data_path=DATA_PATH, workers=None, force=False):
+    started = time.perf_counter()
+    run_stages(full_stages(data_path), workers=workers, force=force)
+    export()
+    publish()
+    print(f"All models trained and saved successfully ({time.perf_counter() - started:.1f}s).")
+
+
+# ----------------- Compact Export & Registry -----------------
+def export(force=False):
+    """Refresh models/compact (compact_models.py) from the pickles in models/."""
+    from compact_models import COMPACT_DIR, export_compact
+
+    started = time.perf_counter()
+    if export_compact(force=force):
+        print(f"Compact models written to {COMPACT_DIR} ({time.perf_counter() - started:.1f}s)")
+
+
+def publish():
+    """Snapshot the serving models as the active registry version (model_registry.py)."""
+    from model_registry import publish as publish_version
+
+    version, created = publish_version()
+    print(f"Model version {version} " + ("published and activated" if created else "unchanged"))
+
+
+# ----------------- Streaming Training -----------------
+def hashing_vectorizer():
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    # Raw term counts; the IDF weighting is applied separately (TfidfTransformer)
+    # so the document frequencies can be counted from the same pass
+    return HashingVectorizer(n_features=HASH_FEATURES, stop_words='english',
+                             alternate_sign=False, norm=None)
+
+
+def read_chunks(data_path, chunk_size, rng):
+    for chunk in pd.read_csv(data_path, chunksize=chunk_size):
+        yield prepare(chunk, rng)
+
+
+def idf_from_counts(doc_freq, n_docs):
+    # Same smoothed IDF as TfidfVectorizer(smooth_idf=True)
+    return np.log((1 + n_docs) / (1 + doc_freq)) + 1
+
+
+def tfidf_vectorizer(doc_freq, n_docs):
+    from sklearn.feature_extraction.text import TfidfTransformer
+    from sklearn.pipeline import make_pipeline
+
+    transformer = TfidfTransformer()
+    transformer.idf_ = idf_from_counts(doc_freq, n_docs)
+    return make_pipeline(hashing_vectorizer(), transformer)
+
+
+class StreamingReport:
+    """Rows/s per pass and peak resident memory."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.passes = []
+
+    def end_pass(self, name, rows):
+        elapsed = time.perf_counter() - self.started
+        self.passes.append((name, rows, elapsed))
+        self.started = time.perf_counter()
+
+    def __str__(self):
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        lines = [f"{name}: {rows:,} rows in {secs:.1f}s ({rows / max(secs, 1e-9):,.0f} rows/s)"
+                 for name, rows, secs in self.passes]
+        lines.append(f"peak RSS: {peak_mb:,.0f} MB")
+        return "\n".join(lines)
+
+
+def _fit_pass(data_path, chunk_size, hasher, vectorizer, mood_clf, budget_reg, classes, seed):
+    # Second pass: partial_fit both models chunk by chunk on the same TF-IDF
+    # rows (final IDF), hashing every chunk once
+    rng = np.random.RandomState(seed)
+    rows = 0
+    for chunk in read_chunks(data_path, chunk_size, rng):
+        features = vectorizer[-1].transform(hasher.transform(chunk['combined']))
+        mood_clf.partial_fit(features, chunk['mood'], classes=classes)
+        y = chunk['budget_numeric'].to_numpy(dtype=float)
+        ok = ~np.isnan(y)
+        if ok.any():
+            budget_reg.partial_fit(features[ok], y[ok])
+        rows += len(chunk)
+    return rows
+
+
+def _save_streaming(vectorizer, mood_clf, budget_reg, doc_freq, n_docs):
+    from sklearn.pipeline import make_pipeline
+
+    os.makedirs("models", exist_ok=True)
+    joblib.dump(vectorizer, 'models/tfidf_vectorizer.pkl')
+    joblib.dump(make_pipeline(vectorizer, mood_clf), 'models/mood_classifier.pkl')
+    joblib.dump(budget_reg, 'models/budget_predictor.pkl')
+    np.savez(STREAMING_STATE_PATH, doc_freq=doc_freq, n_docs=n_docs)
+
+
+def train_streaming(data_path=DATA_PATH, chunk_size=CHUNK_SIZE, seed=42):
+    from sklearn.linear_model import SGDRegressor
+    from sklearn.naive_bayes import MultinomialNB
+
+    report = StreamingReport()
+    hasher = hashing_vectorizer()
+
+    # First pass: document frequencies and label set
+    doc_freq = np.zeros(HASH_FEATURES, dtype=np.int64)
+    n_docs, classes = 0, set()
+    for chunk in read_chunks(data_path, chunk_size, np.random.RandomState(seed)):
+        counts = hasher.transform(chunk['combined'])
+        doc_freq += np.bincount(counts.indices, minlength=HASH_FEATURES)
+        n_docs += len(chunk)
+        classes.update(chunk['mood'])
+    report.end_pass("document frequencies", n_docs)
+
+    vectorizer = tfidf_vectorizer(doc_freq, n_docs)
+    mood_clf = MultinomialNB()
+    budget_reg = SGDRegressor(random_state=seed)
+    rows = _fit_pass(data_path, chunk_size, hasher, vectorizer, mood_clf, budget_reg, sorted(classes), seed)
+    report.end_pass("partial_fit", rows)
+
+    _save_streaming(vectorizer, mood_clf, budget_reg, doc_freq, n_docs)
+    export()
+    publish()
+    print("Streaming models trained and saved.")
+    print(report)
+
+
+def update_streaming(data_path, chunk_size=CHUNK_SIZE, seed=42):
+    """Fold new places into models trained with --streaming, without a refit."""
+    if not os.path.exists(STREAMING_STATE_PATH):
+        sys.exit("No streaming state found; run python train_models.py --streaming first")
+    report = StreamingReport()
+    hasher = hashing_vectorizer()
+    state = np.load(STREAMING_STATE_PATH)
+    doc_freq, n_docs = state['doc_freq'].copy(), int(state['n_docs'])
+
+    for chunk in read_chunks(data_path, chunk_size, np.random.RandomState(seed)):
+        doc_freq += np.bincount(hasher.transform(chunk['combined']).indices, minlength=HASH_FEATURES)
+        n_docs += len(chunk)
+    report.end_pass("document frequencies", n_docs - int(state['n_docs']))
+
+    mood_clf = joblib.load('models/mood_classifier.pkl')[-1]
+    budget_reg = joblib.load('models/budget_predictor.pkl')
+    vectorizer = tfidf_vectorizer(doc_freq, n_docs)
+    rows = _fit_pass(data_path, chunk_size, hasher, vectorizer, mood_clf, budget_reg, mood_clf.classes_, seed)
+    report.end_pass("partial_fit", rows)
+
+    _save_streaming(vectorizer, mood_clf, budget_reg, doc_freq, n_docs)
+    export()
+    publish()
+    print(f"Models updated with {rows:,} places ({n_docs:,} in total).")
+    print(report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the recommender models")
+    parser.add_argument("--streaming", action="store_true", help="out-of-core training in CSV chunks")
+    parser.add_argument("--update", metavar="CSV", help="add the places in CSV to the streaming models")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, help="parallel training stages (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="refit every stage, ignoring the cache")
+    parser.add_argument("--export", action="store_true", help="only write models/compact from the current pickles")
+    args = parser.parse_args()
+
+    if args.export:
+        export(force=True)
+    elif args.update:
+        update_streaming(args.update, args.chunk_size)
+    elif args.streaming:
+        train_streaming(args.data, args.chunk_size)
+    else:
+        train_full(args.data, workers=args.workers, force=args.force)
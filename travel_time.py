@@ -0,0 +1,266 @@
+# travel_time.py
+# Travel-time models for the itinerary builder.
+#
+# StraightLineTravel is the default: great-circle distance at a constant
+# speed. RoadGraphTravel answers the same many-to-many queries on a local
+# road graph, e.g. an OSM extract exported as node and edge CSVs and packed
+# once with `python travel_time.py nodes.csv edges.csv`:
+#
+#   nodes.csv  id, lat, lng
+#   edges.csv  u, v, length_m[, speed_kmh][, oneway]
+#
+# oneway follows OSM: yes/true/1 is one-way from u to v, -1 one-way from v to
+# u, no/false/0 (or empty) two-way; reversible and alternating roads count as
+# two-way.
+#
+# The build keeps the largest strongly connected component (so every snapped
+# point can reach every other) and stores the graph as CSR arrays with edge
+# weights in hours, plus travel times from and to a few landmark nodes
+# spread over the graph (farthest-point picks, as in ALT). At query time
+# points are snapped to their nearest node through a KD-tree, and one
+# bounded Dijkstra per distinct source node (C code in scipy) fills a row of
+# the matrix. The landmark tables bound every pair from both sides by the
+# triangle inequality, with no search, and the upper bounds are tightened
+# through the most central target: a search stops once its farthest target
+# is certainly settled or at the time limit, and is skipped when every
+# target is certainly beyond the limit. On a 90k-node grid
+# (benchmarks/bench_travel_time.py) that is ~40x faster than unbounded
+# searches for places within 2 km, ~4x within 11 km, but only ~1.1x for
+# places spread over 33 km, where the searches must cover most of the graph
+# anyway; a time limit shorter than the trip across town (the itinerary's
+# hops pass the time left) makes that ~2x. Points too far from any road
+# fall back to the straight-line model.
+
+import os
+import sys
+
+import numpy as np
+
+from geo_distance import EARTH_RADIUS_KM, pairwise_km
+
+ROAD_GRAPH_PATH = os.path.join("models", "road_graph.npz")
+DEFAULT_ROAD_SPEED_KMH = 25
+ONEWAY_VALUES = {"yes": 1, "true": 1, "1": 1, "-1": -1, "reverse": -1,
+                 "no": 0, "false": 0, "0": 0, "": 0, "reversible": 0, "alternating": 0}
+ACCESS_SPEED_KMH = 5      # walking from a place to its nearest road node
+MAX_SNAP_KM = 1.0
+LANDMARKS = 16            # nodes whose travel times from/to every node are stored with the graph
+_BOUND_SLACK = 1e-6       # of the longest landmark time: room for the float32 rounding of the tables
+
+
+class StraightLineTravel:
+    def __init__(self, speed_kmh=30, method="haversine"):
+        self.speed_kmh = speed_kmh
+        self.method = method
+
+    def matrix(self, points, limit_hr=None):
+        """(n, n) travel hours between (lat, lng) points."""
+        return pairwise_km(points, method=self.method) / self.speed_kmh
+
+
+def _unit_vectors(lat, lng):
+    phi, lmb = np.radians(lat), np.radians(lng)
+    return np.column_stack([np.cos(phi) * np.cos(lmb), np.cos(phi) * np.sin(lmb), np.sin(phi)])
+
+
+def _csr_graph(n, indptr, indices, hours):
+    import scipy.sparse as sp
+
+    # float64 up front, otherwise every dijkstra call would convert a copy
+    return sp.csr_matrix((np.asarray(hours, dtype=float), indices, indptr), shape=(n, n))
+
+
+def landmark_tables(graph, count=LANDMARKS):
+    """(hours from each landmark, hours to each landmark), both (count, n) float32.
+
+    Landmarks are picked farthest-first: each is the node worst covered by
+    the ones before it.
+    """
+    from scipy.sparse.csgraph import dijkstra
+
+    reverse = graph.T.tocsr()
+    count = min(count, graph.shape[0])
+    from_l, to_l = np.empty((2, count, graph.shape[0]), dtype=np.float32)
+    start = dijkstra(graph, directed=True, indices=0)
+    node = int(np.argmax(np.where(np.isfinite(start), start, -1)))
+    nearest = np.full(graph.shape[0], np.inf)
+    for k in range(count):
+        from_l[k] = dijkstra(graph, directed=True, indices=node)
+        to_l[k] = dijkstra(reverse, directed=True, indices=node)
+        nearest = np.minimum(nearest, from_l[k].astype(float) + to_l[k])
+        node = int(np.argmax(nearest))
+    return from_l, to_l
+
+
+class RoadGraphTravel:
+    def __init__(self, lat, lng, indptr, indices, hours, fallback=None,
+                 access_speed_kmh=ACCESS_SPEED_KMH, max_snap_km=MAX_SNAP_KM, landmarks=None):
+        from scipy.spatial import cKDTree
+
+        self.lat, self.lng = lat, lng
+        self.graph = _csr_graph(len(lat), indptr, indices, hours)
+        self.reverse = self.graph.T.tocsr()
+        # (from, to) tables as build_graph stores them; computed here for older files
+        self.landmark_from, self.landmark_to = landmarks if landmarks is not None else landmark_tables(self.graph)
+        finite = self.landmark_from[np.isfinite(self.landmark_from)]
+        self.bound_slack = _BOUND_SLACK * float(finite.max()) if finite.size else 0.0
+        self.tree = cKDTree(_unit_vectors(lat, lng))
+        self.fallback = fallback or StraightLineTravel()
+        self.access_speed_kmh = access_speed_kmh
+        self.max_snap_km = max_snap_km
+
+    @classmethod
+    def load(cls, path=ROAD_GRAPH_PATH, **kwargs):
+        with np.load(path) as z:
+            landmarks = (z["landmark_from"], z["landmark_to"]) if "landmark_from" in z else None
+            return cls(z["lat"], z["lng"], z["indptr"], z["indices"], z["hours"], landmarks=landmarks, **kwargs)
+
+    def __len__(self):
+        return len(self.lat)
+
+    def snap(self, points):
+        """(node, km to that node) for every (lat, lng) point."""
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        chord, nodes = self.tree.query(_unit_vectors(points[:, 0], points[:, 1]))
+        return nodes, 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord / 2, 1.0))
+
+    def bounds(self, nodes):
+        """(lower, upper) bounds on the hours between every pair of `nodes`, from the landmark tables.
+
+        d(s, t) >= d(L, t) - d(L, s) and d(s, L) - d(t, L);  d(s, t) <= d(s, L) + d(L, t).
+        """
+        frm = self.landmark_from[:, nodes].astype(float)
+        to = self.landmark_to[:, nodes].astype(float)
+        with np.errstate(invalid="ignore"):
+            # inf - inf (a landmark reaching neither node) is nan: no information, fmax skips it
+            lower = np.fmax.reduce(np.fmax(frm[:, None, :] - frm[:, :, None], to[:, :, None] - to[:, None, :]))
+        upper = (to[:, :, None] + frm[:, None, :]).min(axis=0)
+        lower = np.maximum(np.nan_to_num(lower, nan=0.0, posinf=np.inf) - self.bound_slack, 0.0)
+        return lower, upper + self.bound_slack
+
+    def matrix(self, points, limit_hr=None):
+        """(n, n) travel hours; searches stop at `limit_hr` when given."""
+        from scipy.sparse.csgraph import dijkstra
+
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        result = self.fallback.matrix(points)
+        nodes, snap_km = self.snap(points)
+        on_road = np.flatnonzero(snap_km <= self.max_snap_km)
+        if len(on_road) < 2:
+            return result
+
+        access = snap_km / self.access_speed_kmh
+        targets, inverse = np.unique(nodes[on_road], return_inverse=True)
+        limit = np.inf if limit_hr is None else float(limit_hr)
+
+        # Each search only has to settle the targets that may lie within the
+        # limit, and can stop at the farthest one's upper bound. The landmark
+        # bounds are tightened through the most central target p: one search
+        # out of it and one into it give d(s, t) <= d(s, p) + d(p, t).
+        lower, upper = self.bounds(targets)
+        hours = np.full((len(targets), len(targets)), np.inf)
+        centre = points[on_road].mean(axis=0)
+        p = int(inverse[np.argmin(((points[on_road] - centre) ** 2).sum(axis=1))])
+        to_p = dijkstra(self.reverse, directed=True, indices=int(targets[p]),
+                        limit=min(limit, float(upper[:, p].max())))[targets]
+        hours[p] = dijkstra(self.graph, directed=True, indices=int(targets[p]),
+                            limit=min(limit, float(upper[p].max())))[targets]
+        upper = np.minimum(upper, to_p[:, None] + hours[p][None, :])
+        for i, node in enumerate(targets):
+            if i == p:
+                continue
+            wanted = lower[i] <= limit
+            wanted[i] = False
+            if wanted.any():
+                bound = min(limit, float(upper[i, wanted].max()))
+                hours[i] = dijkstra(self.graph, directed=True, indices=int(node), limit=bound)[targets]
+        np.fill_diagonal(hours, 0.0)
+        block = hours[np.ix_(inverse, inverse)]
+        block += access[on_road][:, None] + access[on_road][None, :]
+        np.fill_diagonal(block, 0.0)
+
+        sub = np.ix_(on_road, on_road)
+        # not reached within the limit: longer than the limit, so never schedulable
+        result[sub] = np.where(np.isfinite(block), block, np.maximum(result[sub], limit))
+        return result
+
+
+# --------- Build ---------
+def parse_oneway(values):
+    """Direction per edge: 1 one-way u -> v, -1 one-way v -> u, 0 two-way."""
+    import pandas as pd
+
+    values = pd.Series(values)
+    if pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values):
+        return np.sign(values.fillna(0).to_numpy(dtype=float)).astype(np.int8)
+    text = values.fillna("").astype(str).str.strip().str.lower()
+    unknown = sorted(set(text) - ONEWAY_VALUES.keys())
+    if unknown:
+        raise ValueError(f"Unknown oneway values: {', '.join(map(repr, unknown[:10]))}")
+    return text.map(ONEWAY_VALUES).to_numpy(dtype=np.int8)
+
+
+def _largest_component(n, u, v):
+    import scipy.sparse as sp
+    from scipy.sparse.csgraph import connected_components
+
+    adj = sp.csr_matrix((np.ones(len(u)), (u, v)), shape=(n, n))
+    _, labels = connected_components(adj, directed=True, connection="strong")
+    return labels == np.bincount(labels).argmax()
+
+
+def build_graph(nodes, edges, out_path=ROAD_GRAPH_PATH):
+    """Pack node/edge tables (DataFrames) into the CSR file RoadGraphTravel loads."""
+    ids = nodes["id"].to_numpy()
+    order = np.argsort(ids, kind="stable")
+    u = order[np.searchsorted(ids, edges["u"].to_numpy(), sorter=order)]
+    v = order[np.searchsorted(ids, edges["v"].to_numpy(), sorter=order)]
+    speed = edges["speed_kmh"].fillna(DEFAULT_ROAD_SPEED_KMH).to_numpy(dtype=float) \
+        if "speed_kmh" in edges else np.full(len(edges), float(DEFAULT_ROAD_SPEED_KMH))
+    hours = edges["length_m"].to_numpy(dtype=float) / 1000.0 / speed
+    direction = parse_oneway(edges["oneway"]) if "oneway" in edges else np.zeros(len(edges), np.int8)
+
+    # reversed one-ways run v -> u; two-way roads become two arcs
+    reverse, twoway = direction < 0, direction == 0
+    u, v = np.where(reverse, v, u), np.where(reverse, u, v)
+    u, v, hours = (np.concatenate([u, v[twoway]]), np.concatenate([v, u[twoway]]),
+                   np.concatenate([hours, hours[twoway]]))
+
+    keep = _largest_component(len(ids), u, v)
+    remap = np.cumsum(keep) - 1
+    arcs = keep[u] & keep[v]
+    u, v, hours = remap[u[arcs]], remap[v[arcs]], hours[arcs]
+
+    # parallel arcs: keep the fastest (a CSR build would otherwise sum them)
+    order = np.lexsort((hours, v, u))
+    u, v, hours = u[order], v[order], hours[order]
+    first = np.r_[True, (u[1:] != u[:-1]) | (v[1:] != v[:-1])]
+    u, v, hours = u[first], v[first], hours[first]
+
+    n = int(keep.sum())
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(u, minlength=n), out=indptr[1:])
+    landmark_from, landmark_to = landmark_tables(_csr_graph(n, indptr, v, hours.astype(np.float32)))
+    folder = os.path.dirname(out_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    np.savez(
+        out_path,
+        lat=nodes["lat"].to_numpy(dtype=float)[keep],
+        lng=nodes["lng"].to_numpy(dtype=float)[keep],
+        indptr=indptr,
+        indices=v.astype(np.int32),
+        hours=hours.astype(np.float32),
+        landmark_from=landmark_from,
+        landmark_to=landmark_to,
+    )
+    return n, len(u)
+
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    if len(sys.argv) != 3:
+        sys.exit("usage: python travel_time.py nodes.csv edges.csv")
+    n_nodes, n_arcs = build_graph(pd.read_csv(sys.argv[1]), pd.read_csv(sys.argv[2]))
+    print(f"Road graph with {n_nodes} nodes and {n_arcs} arcs saved to {ROAD_GRAPH_PATH}")